@@ -1,17 +1,21 @@
-from flask import request, jsonify, Flask
+import json
+import asyncio
+from flask import request, jsonify, Flask, Response, stream_with_context
 from flask_cors import CORS
 from pathlib import Path
-from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName
-from datetime import datetime, timedelta
-from src.finance_sql_pipeline import SQLFinanceQuery
-from dateutil.relativedelta import relativedelta
-from src.insights_engine import enrich_with_forecast_and_anomalies
+from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName, RowFormat, get_connection_pool
+from src.datamodel.finance_db import TableVersionCache, encode_cursor, decode_cursor
+from src.datamodel.schema import SchemaManager
+from src.config import load_app_config
+from src.engine_registry import get_engine_registry
+from src.chart_insights import get_insight_service
+from src.insight_precompute import InsightPrecomputer
+from src.dashboard import DashboardBuilder, income_vs_expenses_panel, accounts_panel, expense_summary_panel
+from src.dashboard import budgets_panel, goals_panel, goal_forecast_panel
 
 app = Flask(__name__)
 CORS(app)
 
-INSIGHT_CACHE = {}
-
 
 @app.route("/", methods=["GET"])
 def home():
@@ -21,8 +25,8 @@ def home():
 def chat_response():
     prompt = request.json['prompt']
     resp = None
-    eq = SQLFinanceQuery()
     try:
+        eq = ENGINES.get_engine()
         resp = eq.ask(question=prompt)
     except Exception as e:
         return jsonify({
@@ -31,6 +35,45 @@ def chat_response():
         }), 500
     return jsonify({"assistant_message": resp}), 200
 
+@app.route('/api/message/stream', methods=['GET', 'POST'])
+def chat_stream():
+    # Server-Sent Events: entities, sql and rows as each step finishes, then the answer token by token.
+    # GET ?prompt=... is for EventSource, which cannot POST
+    prompt = request.json['prompt'] if request.method == 'POST' else request.args.get('prompt')
+    if not prompt:
+        return jsonify({"error": "prompt is required"}), 400
+    return Response(stream_with_context(_stream_answer(prompt)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _stream_answer(prompt):
+    try:
+        eq = ENGINES.get_engine()
+        for event in _iter_async(eq.astream_ask(question=prompt)):
+            yield _sse(event['event'], event['data'])
+    except Exception as e:
+        print(f"Error streaming answer: {e}")
+        yield _sse('error', {
+            "error": "An internal error occoured. Please try again later.",
+            "details": str(e)
+        })
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _iter_async(agen):
+    # Flask handlers are synchronous: drive the async generator on a loop owned by this request
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
 @app.route('/api/insights', methods=['POST'])
 def get_insights():
     try:
@@ -40,7 +83,7 @@ def get_insights():
         query_params = req_data.get('query_params')
         query_output = req_data.get('query_output')
         
-        fq = SQLFinanceQuery()
+        fq = ENGINES.get_engine()
         insight = _get_insight(fq, chart_title, sql_query, query_params, query_output)
         
         return jsonify({"insight": insight})
@@ -48,28 +91,156 @@ def get_insights():
         print(f"Error generating insight: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/insights/batch', methods=['POST'])
+def get_insights_batch():
+    # Body: {"charts": [{"chart_title", "sql_query", "query_params", "query_output"}, ...]}
+    # Streams one NDJSON line {"index", "chart_title", "insight"} per chart as soon as it is ready
+    charts = (request.json or {}).get('charts')
+    if not isinstance(charts, list):
+        return jsonify({"error": "charts must be a list"}), 400
+    try:
+        fq = ENGINES.get_engine()
+    except Exception as e:
+        print(f"Error generating insights: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    chart_requests = [(c.get('chart_title'), c.get('sql_query'), c.get('query_params'), c.get('query_output'))
+                for c in charts]
+    return Response(stream_with_context(_stream_insights(fq, chart_requests)), mimetype='application/x-ndjson')
+
+@app.route('/api/insights/cache', methods=['GET'])
+def get_insight_cache_stats():
+    stats = _insights().cache.stats()
+    if PRECOMPUTER is not None:
+        stats['precompute'] = PRECOMPUTER.stats()
+    return jsonify(stats)
+
+def _stream_insights(fq, chart_requests):
+    for index, future in _insights().get_many(fq, chart_requests):
+        line = {"index": index, "chart_title": chart_requests[index][0]}
+        try:
+            line["insight"] = future.result()
+        except Exception as e:
+            print(f"Error generating insight for {line['chart_title']}: {e}")
+            line["error"] = str(e)
+        yield json.dumps(line) + "\n"
+
 # Path to the database file in the root directory
 DB_PATH = Path(__file__).parent / 'data/personal_finance/finance.db'
 
+POOL_CONFIG = load_app_config()['db']['sqlite'].get('pool', {})
+
+# Long-lived connections shared by all request threads, instead of a connect per request
+DB_POOL = get_connection_pool(str(DB_PATH), **POOL_CONFIG)
+
+# Loaded once up front, FinanceDB.run_named_query looks queries up by FinanceQueryName
+SQLQueryRepository(queries_file='sql_queries.json')
+
+# One query engine (LLM client, compiled chains) for all requests, rebuilt when config or prompts change.
+# Built by the first request, or ahead of it by start_background_services()
+ENGINES = get_engine_registry()
+
+# Chart insights: cached (insights.cache), coalesced and limited to insights.max_concurrency LLM calls at once.
+# Created on first use, see _insights()
+INSIGHTS = None
+
+# Dashboard insights regenerated off the request path whenever the transactions change
+PRECOMPUTER = None
+
+
+def _insights():
+    global INSIGHTS
+    if INSIGHTS is None:
+        INSIGHTS = get_insight_service()
+    return INSIGHTS
+
+
+def upgrade_schema():
+    """
+    Brings a finance.db built by older setup scripts up to date (idempotent). Run once before serving,
+    gunicorn.conf.py does it in the master process. Uses its own connection, not the pool, so no
+    connection is inherited by forked workers.
+    """
+    if DB_PATH.exists():
+        with FinanceDB(str(DB_PATH)) as db:
+            SchemaManager().upgrade(db.conn)
+
+
+def start_background_services():
+    """
+    Builds the query engine ahead of the first request and starts the insight precomputer if
+    insights.precompute.enabled. Run once per serving process, gunicorn.conf.py does it in each worker.
+    """
+    global PRECOMPUTER
+    ENGINES.warm_up()
+    precompute_config = dict(load_app_config().get('insights', {}).get('precompute', {}))
+    if precompute_config.pop('enabled', False) and DB_PATH.exists() and PRECOMPUTER is None:
+        PRECOMPUTER = InsightPrecomputer(DB_POOL, _insights(), ENGINES.get_engine, **precompute_config)
+        PRECOMPUTER.start()
+
+
+def _count_transactions(db):
+    res = db.run_named_query(FinanceQueryName.GET_TOTAL_TRANSACTIONS_COUNT)
+    return res[0]['count'] if res else 0
+
+
+# Page size of a keyset request (?cursor=) that does not pass limit
+KEYSET_DEFAULT_LIMIT = 100
+
+# COUNT(*) is only re-run once the transactions table has changed
+TRANSACTION_COUNT_CACHE = TableVersionCache('transactions', _count_transactions)
+
+# /api/dashboard fans panels out over read-only connections
+DASHBOARD = DashboardBuilder(get_connection_pool(str(DB_PATH), readonly=True, **POOL_CONFIG))
+
 @app.route('/api/transactions', methods=['GET'])
 def get_transactions():
     try:
         page = request.args.get('page', type=int)
         limit = request.args.get('limit', type=int)
+        # 'rows' / 'columnar' return column names once instead of a dict per transaction
+        row_format = request.args.get('format', RowFormat.DICT)
+        if row_format not in RowFormat.ALL:
+            return jsonify({"error": f"Unsupported format: {row_format}"}), 400
 
         # Initialize repository to get the SQL query
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
+        SQLQueryRepository(queries_file='sql_queries.json')
+
+        if request.args.get('stream', type=int):
+            # NDJSON, one transaction per line, produced while the cursor is read
+            if row_format == RowFormat.COLUMNAR:
+                return jsonify({"error": "format=columnar cannot be streamed, use dict or rows"}), 400
+            return Response(stream_with_context(_stream_transactions(row_format)), mimetype='application/x-ndjson')
         
-        with FinanceDB(str(DB_PATH)) as db:
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            if 'cursor' in request.args:
+                # Keyset pagination on (date, id): cost does not grow with page depth
+                if limit is None:
+                    limit = KEYSET_DEFAULT_LIMIT
+                cursor = request.args.get('cursor')
+                if cursor:
+                    try:
+                        last_date, last_id = decode_cursor(cursor)
+                    except ValueError as e:
+                        return jsonify({"error": str(e)}), 400
+                    transactions = db.run_named_query(FinanceQueryName.GET_TRANSACTIONS_KEYSET_AFTER,
+                                                      (last_date, last_id, limit), row_format)
+                else:
+                    transactions = db.run_named_query(FinanceQueryName.GET_TRANSACTIONS_KEYSET_FIRST, (limit,), row_format)
+
+                last_key = _last_keyset(transactions, row_format)
+                return jsonify({
+                    "data": transactions,
+                    "next_cursor": encode_cursor(*last_key) if last_key and _row_count(transactions, row_format) == limit else None,
+                    "total": TRANSACTION_COUNT_CACHE.get(db),
+                    "limit": limit
+                })
+
             if page is not None and limit is not None:
                 # Pagination logic
                 offset = (page - 1) * limit
-                query = repo.get_query(FinanceQueryName.GET_TRANSACTIONS_PAGINATED)
-                count_query = repo.get_query(FinanceQueryName.GET_TOTAL_TRANSACTIONS_COUNT)
-                
-                transactions = db.run_query(query, (limit, offset))
-                total_count_res = db.run_query(count_query)
-                total_count = total_count_res[0]['count'] if total_count_res else 0
+                transactions = db.run_named_query(FinanceQueryName.GET_TRANSACTIONS_PAGINATED, (limit, offset), row_format)
+                total_count = TRANSACTION_COUNT_CACHE.get(db)
                 
                 return jsonify({
                     "data": transactions,
@@ -79,55 +250,58 @@ def get_transactions():
                 })
             else:
                 # Default behavior (or simple limit for dashboard)
-                query = repo.get_query(FinanceQueryName.GET_TRANSACTIONS_PAGINATED if limit else FinanceQueryName.GET_ALL_TRANSACTIONS)
+                query_name = FinanceQueryName.GET_TRANSACTIONS_PAGINATED if limit else FinanceQueryName.GET_ALL_TRANSACTIONS
                 params = (limit, 0) if limit else None
-                transactions = db.run_query(query, params)
+                transactions = db.run_named_query(query_name, params, row_format)
                 return jsonify(transactions)
             
     except Exception as e:
         print(f"Error fetching transactions: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _stream_transactions(row_format=RowFormat.DICT):
+    # 'rows': a {"columns": [...]} line first, then one array of values per transaction
+    with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+        query = SQLQueryRepository().get_query(FinanceQueryName.GET_TRANSACTIONS_STREAM)
+        chunk, columns = [], None
+        for row in db.iter_query(query):
+            if row_format == RowFormat.ROWS:
+                if columns is None:
+                    columns = list(row)
+                    chunk.append(json.dumps({"columns": columns}))
+                row = list(row.values())
+            chunk.append(json.dumps(row))
+            if len(chunk) == 500:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+def _row_count(transactions, row_format):
+    if row_format == RowFormat.DICT:
+        return len(transactions)
+    if row_format == RowFormat.ROWS:
+        return len(transactions['rows'])
+    return len(transactions['values'][0]) if transactions['values'] else 0
+
+def _last_keyset(transactions, row_format):
+    """(date, id) of the last row in any RowFormat, None for an empty page"""
+    if not _row_count(transactions, row_format):
+        return None
+    if row_format == RowFormat.DICT:
+        return transactions[-1]['date'], transactions[-1]['id']
+    date_idx, id_idx = transactions['columns'].index('date'), transactions['columns'].index('id')
+    if row_format == RowFormat.ROWS:
+        last = transactions['rows'][-1]
+        return last[date_idx], last[id_idx]
+    return transactions['values'][date_idx][-1], transactions['values'][id_idx][-1]
+
 @app.route('/api/analytics/income-vs-expenses', methods=['GET'])
 def get_income_vs_expenses():
     try:
         period = request.args.get('period', 'month')
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
-        today = datetime.now().date()
-
-        if period == 'week':
-            start_date = today - timedelta(days=7)
-            query = repo.get_query(FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE)
-            params = (start_date.strftime("%Y-%m-%d"),)
-            granularity = "daily"
-            horizon = 2
-        else:
-            start_date = today - timedelta(days=30)
-            query = repo.get_query(FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE)
-            params = (start_date.strftime("%Y-%m-%d"),)
-            granularity = "daily"
-            horizon = 14
-
-        with FinanceDB(str(DB_PATH)) as db:
-            raw_data = db.run_query(query, params)
-
-        enriched_data = enrich_with_forecast_and_anomalies(
-            data=raw_data,
-            date_key="date",
-            value_keys=("income", "expense"),
-            granularity=granularity,
-            horizon=horizon
-        )
-
-        return jsonify({
-            "data": enriched_data,
-            "insight_input": {
-                "chart_title": "Income Vs Expenses",
-                "sql_query": query,
-                "query_params": params,
-                "query_output": enriched_data
-            }
-        })
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            return jsonify(income_vs_expenses_panel(db, period))
 
     except Exception as e:
         print(f"Error fetching income vs expenses: {e}")
@@ -136,63 +310,8 @@ def get_income_vs_expenses():
 @app.route('/api/accounts', methods=['GET'])
 def get_accounts():
     try:
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
-        query = repo.get_query(FinanceQueryName.GET_ALL_ACCOUNTS)
-        activity_query = repo.get_query(FinanceQueryName.GET_ACCOUNT_ACTIVITY_BY_MONTH)
-        
-        current_month_str = datetime.now().strftime('%Y-%m')
-        
-        with FinanceDB(str(DB_PATH)) as db:
-            accounts = db.run_query(query) # List of dicts
-            activity = db.run_query(activity_query, (current_month_str,))
-            
-            # Convert activity to a dict for easier lookup
-            activity_map = {row['account_name'].lower(): row for row in activity}
-            
-            enriched_accounts = []
-            for acc in accounts:
-                acc_dict = dict(acc)
-                name_key = acc_dict['name'].lower()
-                
-                # Default activity
-                credits = 0.0
-                debits = 0.0
-                
-                if name_key in activity_map:
-                    credits = activity_map[name_key]['credits']
-                    debits = activity_map[name_key]['debits']
-                
-                # Calculate Net Change for this month based on account type
-                # Depository (Checking): Credits increase, Debits decrease
-                # Credit (Cards): Debits increase balance (debt), Credits decrease balance
-                if acc_dict['type'] == 'depository':
-                    net_change = credits - debits
-                else:
-                    net_change = debits - credits
-                
-                current_balance = acc_dict['balance']
-                prev_balance = current_balance - net_change
-                
-                if prev_balance == 0:
-                    percent_change = 100.0 if current_balance != 0 else 0.0
-                else:
-                    percent_change = ((current_balance - prev_balance) / prev_balance * 100)
-                
-                # DEMO MODE: If trend is 0% (e.g. fresh DB), generate deterministic dummy data
-                if percent_change == 0:
-                    # Create a seed from the account name
-                    seed = sum(ord(c) for c in acc_dict['name'])
-                    # Generate a float between 1.5 and 11.5
-                    dummy_val = (seed % 100) / 10.0 + 1.5
-                    # Flip sign based on seed parity to show variety
-                    if seed % 2 == 1:
-                        dummy_val = -dummy_val
-                    percent_change = dummy_val
-                
-                acc_dict['trend'] = percent_change
-                enriched_accounts.append(acc_dict)
-                
-            return jsonify(enriched_accounts)
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            return jsonify(accounts_panel(db))
     except Exception as e:
         print(f"Error fetching accounts: {e}")
         return jsonify({"error": str(e)}), 500
@@ -201,65 +320,8 @@ def get_accounts():
 def get_expense_summary():
     try:
         period = request.args.get('period', 'month')
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
-        params = None
-        today = datetime.now().date()
-
-        if period == 'week':
-            start_date = today - timedelta(days=7)
-            query = repo.get_query(FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY_FILTERED)
-            params = (start_date.strftime("%Y-%m-%d"),)
-        else:
-            # Default to month
-            start_date = today - timedelta(days=30)
-        
-        start_date_str = start_date.strftime("%Y-%m-%d")
-        params = (start_date_str,)
-
-        query_category = repo.get_query(FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY_FILTERED)
-        query_day = repo.get_query(FinanceQueryName.GET_SPENDING_BY_DAY_OF_WEEK)
-        query_desc = repo.get_query(FinanceQueryName.GET_TOP_EXPENSE_DESCRIPTIONS)
-
-        # Daily spending always uses month start, ignoring the toggle
-        day_params = ((today - timedelta(days=30)).strftime("%Y-%m-%d"),)
-        
-        with FinanceDB(str(DB_PATH)) as db:
-            data_category = db.run_query(query_category, params)
-            data_day = db.run_query(query_day, day_params)
-            data_desc = db.run_query(query_desc, params)
-            
-            # Process day data to map 0-6 to names (0 is Sunday in strftime %w)
-            days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
-            day_map = {int(row['day_index']): row['total'] for row in data_day}
-            processed_days = [{'day': days[i], 'value': day_map.get(i, 0)} for i in range(7)]
-
-            insight_inputs = {
-                "by_category": {
-                    "chart_title": "Expense by category",
-                    "sql_query": query_category,
-                    "query_params": params,
-                    "query_output": data_category
-                },
-                "by_day": {
-                    "chart_title": "Expense by day of the week",
-                    "sql_query": query_day,
-                    "query_params": day_params,
-                    "query_output": processed_days
-                },
-                "top_descriptions": {
-                    "chart_title": "Top 3 Expenses",
-                    "sql_query": query_desc,
-                    "query_params": params,
-                    "query_output": data_desc
-                }
-            }
-
-            return jsonify({
-                "by_category": data_category,
-                "by_day": processed_days,
-                "top_descriptions": data_desc,
-                "insight_inputs": insight_inputs
-            })
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            return jsonify(expense_summary_panel(db, period))
     except Exception as e:
         print(f"Error fetching expense summary: {e}")
         return jsonify({"error": str(e)}), 500
@@ -267,38 +329,8 @@ def get_expense_summary():
 @app.route('/api/budgets', methods=['GET'])
 def get_budgets():
     try:
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
-        budget_query = repo.get_query(FinanceQueryName.GET_ALL_BUDGETS)
-        spending_query = repo.get_query(FinanceQueryName.GET_MONTHLY_SPENDING_BY_CATEGORY)
-        
-        month_param = request.args.get('month')
-        if month_param:
-            current_month = month_param
-        else:
-            current_month = datetime.now().strftime('%Y-%m')
-        
-        with FinanceDB(str(DB_PATH)) as db:
-            budgets = db.run_query(budget_query)
-            spending = db.run_query(spending_query, (current_month,))
-            
-            spending_map = {row['category']: row['total'] for row in spending}
-            
-            result = []
-            for b in budgets:
-                cat = b['category']
-                limit = b['amount_limit']
-                spent = spending_map.get(cat, 0)
-                if spent is None: spent = 0
-                
-                result.append({
-                    "id": b['id'],
-                    "category": cat,
-                    "limit": limit,
-                    "spent": spent,
-                    "percentage": min((spent / limit) * 100, 100) if limit > 0 else 0
-                })
-            
-            return jsonify(result)
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            return jsonify(budgets_panel(db, request.args.get('month')))
     except Exception as e:
         print(f"Error fetching budgets: {e}")
         return jsonify({"error": str(e)}), 500
@@ -306,21 +338,8 @@ def get_budgets():
 @app.route('/api/goals', methods=['GET'])
 def get_goals():
     try:
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
-        query = repo.get_query(FinanceQueryName.GET_ALL_GOALS)
-        
-        with FinanceDB(str(DB_PATH)) as db:
-            goals = db.run_query(query)
-            
-        results = []
-        for g in goals:
-            g_dict = dict(g)
-            # Map saved_amount to current_amount for frontend compatibility
-            g_dict['current_amount'] = g_dict.pop('saved_amount', 0)
-            g_dict['id'] = str(g_dict['id'])
-            results.append(g_dict)
-            
-        return jsonify(results)
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            return jsonify(goals_panel(db))
     except Exception as e:
         print(f"Error fetching goals: {e}")
         return jsonify({"error": str(e)}), 500
@@ -328,106 +347,43 @@ def get_goals():
 @app.route('/api/analytics/goal-forecast', methods=['GET'])
 def get_goal_forecast():
     try:
-        goal_id = request.args.get('goal_id')
-        
-        with FinanceDB(str(DB_PATH)) as db:
-            if goal_id:
-                goals = db.run_query("SELECT * FROM financial_goals WHERE id = ?", (goal_id,))
-            else:
-                goals = db.run_query("SELECT * FROM financial_goals LIMIT 1")
-        
-        if not goals:
+        with FinanceDB(str(DB_PATH), pool=DB_POOL) as db:
+            forecast = goal_forecast_panel(db, request.args.get('goal_id'))
+
+        if forecast is None:
              return jsonify({"error": "No goals found"}), 404
 
-        goal = dict(goals[0])
-        goal['current_amount'] = goal.pop('saved_amount', 0)
-        goal['id'] = str(goal['id'])
-        
-        # 1. Calculate Actual Monthly Savings Rate from last 90 days
-        repo = SQLQueryRepository(queries_file='sql_queries.json')
-        query = repo.get_query(FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE)
-        start_date_90 = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
-        
-        with FinanceDB(str(DB_PATH)) as db:
-            # Re-using the daily income/expense query to calculate aggregate savings
-            data_90 = db.run_query(query, (start_date_90,))
-            
-        total_income = sum(d['income'] for d in data_90)
-        total_expense = sum(d['expense'] for d in data_90)
-        # Simple average monthly savings (90 days approx 3 months)
-        avg_monthly_savings = (total_income - total_expense) / 3
-        
-        # 2. Generate Chart Data
-        chart_data = []
-        today = datetime.now()
-        target_date = datetime.strptime(goal['target_date'], "%Y-%m-%d")
-        
-        # History (Simulated for the past 6 months to reach current_amount)
-        # We assume a somewhat linear progression to current amount for visualization
-        for i in range(6, -1, -1):
-            date = (today - relativedelta(months=i)).strftime("%Y-%m")
-            # Simulate history: Current - (Avg * i), but don't go below 0
-            simulated_past = max(0, goal['current_amount'] - (avg_monthly_savings * i))
-            chart_data.append({
-                "date": date,
-                "actual": int(simulated_past),
-                "forecast": None,
-                "ideal": None
-            })
-
-        # Future (Forecast vs Ideal)
-        months_left = (target_date.year - today.year) * 12 + target_date.month - today.month
-        months_left = max(1, months_left)
-        
-        ideal_monthly_rate = (goal['target_amount'] - goal['current_amount']) / months_left
-        
-        # Add the "Today" point to start the future lines
-        chart_data[-1]["forecast"] = goal['current_amount']
-        chart_data[-1]["ideal"] = goal['current_amount']
-        
-        for i in range(1, months_left + 1):
-            future_date = (today + relativedelta(months=i)).strftime("%Y-%m")
-            forecast_val = goal['current_amount'] + (avg_monthly_savings * i)
-            ideal_val = goal['current_amount'] + (ideal_monthly_rate * i)
-            
-            chart_data.append({
-                "date": future_date,
-                "actual": None,
-                "forecast": int(forecast_val),
-                "ideal": int(ideal_val)
-            })
-
-        insight_input = {
-            "chart_title": f"Goal Forecast: {goal['name']}",
-            "sql_query": "N/A (Derived from Aggregated Savings Rate)",
-            "query_params": {"goal": goal['name'], "current_savings_rate": round(avg_monthly_savings, 2)},
-            "query_output": {
-                "goal_target": goal['target_amount'],
-                "current_amount": goal['current_amount'],
-                "months_to_target": months_left,
-                "projected_amount_at_target_date": chart_data[-1]['forecast'],
-                "status": "On Track" if chart_data[-1]['forecast'] >= goal['target_amount'] else "At Risk"
-            }
-        }
-
-        return jsonify({"data": chart_data, "goal": goal, "insight_input": insight_input})
+        return jsonify(forecast)
 
     except Exception as e:
         print(f"Error generating goal forecast: {e}")
         return jsonify({"error": str(e)}), 500
+
+@app.route('/api/dashboard', methods=['GET'])
+def get_dashboard():
+    """
+    Every dashboard panel in one round trip, with per-panel timings in `timings_ms`.
+    Accepts the query params of the single-panel endpoints: period, month, goal_id.
+    """
+    try:
+        return jsonify(DASHBOARD.build(
+            period=request.args.get('period', 'month'),
+            month=request.args.get('month'),
+            goal_id=request.args.get('goal_id')
+        ))
+    except Exception as e:
+        print(f"Error building dashboard: {e}")
+        return jsonify({"error": str(e)}), 500
     
 def _get_insight(fq, title, query, p, data):
-    key = f"{title}_{str(p)}"
-    if key in INSIGHT_CACHE:
-        return INSIGHT_CACHE[key]
     try:
-        res = fq.generate_chart_insight(title, query, str(p), data)
-        INSIGHT_CACHE[key] = res
-        return res
+        return _insights().get(fq, title, query, p, data)
     except Exception as e:
         print(f"Error generating insight for {title}: {e}")
         return ""
 
 if __name__ == '__main__':
+    upgrade_schema()
+    start_background_services()
     print("Starting Flask server on http://localhost:8080")
     app.run(debug=True, port=8080)
@@ -0,0 +1,13 @@
+# Startup work kept out of `import backend_server`, so importing the app (tests, tools) has no side effects
+
+
+def on_starting(server):
+    # Once, in the master, before any worker is forked
+    import backend_server
+    backend_server.upgrade_schema()
+
+
+def post_worker_init(worker):
+    # In every worker: build the query engine and start the insight precomputer before serving
+    import backend_server
+    backend_server.start_background_services()
@@ -0,0 +1,81 @@
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName
+from src.analytics_snapshot import TransactionSnapshot, pa
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.analytics_snapshot').setLevel(logging.WARNING)
+
+
+def _median_ms(fn, calls: int) -> float:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def sql_aggregations(db: FinanceDB, start: str) -> None:
+    db.run_named_query(FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE, (start,))
+    db.run_named_query(FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY_FILTERED, (start,))
+    db.run_named_query(FinanceQueryName.GET_SPENDING_BY_DAY_OF_WEEK, (start,))
+    db.run_named_query(FinanceQueryName.GET_TOP_EXPENSE_DESCRIPTIONS, (start,))
+
+
+def snapshot_aggregations(snapshot: TransactionSnapshot, db: FinanceDB, start: str) -> None:
+    columns = snapshot.get(db)
+    columns.daily_income_vs_expense(start)
+    columns.expense_category_summary(start)
+    columns.spending_by_day_of_week(start)
+    columns.top_expense_descriptions(start)
+
+
+def benchmark(sizes, days: int, calls: int) -> None:
+    """
+    The four dashboard aggregations over the last `days` days: SQL (daily_rollups / transactions) vs a warm
+    snapshot (including its data version check), plus the cost of a snapshot refresh: a build from SQL,
+    and with pyarrow, mapping the Arrow file another worker already wrote.
+    """
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+    start = (datetime.now().date() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    print(f"last {days} days, pyarrow {'installed' if pa is not None else 'not installed (memory snapshot)'}")
+    print(f"{'rows':>9} {'SQL ms':>8} {'snapshot ms':>12} {'build ms':>9} {'map ms':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            db_path = create_synthetic_db(Path(tmp) / f'history_{size}.db', size)
+            arrow_path = str(Path(tmp) / f'transactions_{size}.arrow')
+            with FinanceDB(str(db_path)) as db:
+                sql_ms = _median_ms(lambda: sql_aggregations(db, start), calls)
+                snapshot = TransactionSnapshot(path=arrow_path)
+                build_start = time.perf_counter()
+                snapshot.get(db)
+                build_ms = (time.perf_counter() - build_start) * 1000
+                snapshot_ms = _median_ms(lambda: snapshot_aggregations(snapshot, db, start), calls)
+                map_ms = _median_ms(lambda: TransactionSnapshot(path=arrow_path).get(db), calls) \
+                    if pa is not None else float('nan')
+            print(f"{size:>9} {sql_ms:>8.2f} {snapshot_ms:>12.2f} {build_ms:>9.0f} {map_ms:>7.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Dashboard aggregations: SQL vs the columnar analytics snapshot')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--calls', type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.rows, args.days, args.calls)
@@ -0,0 +1,81 @@
+import sys
+import time
+import argparse
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.anomalies import AnomalyDetector
+from src.insights_engine import _with_anomalies
+
+VALUE_KEYS = ('income', 'expense')
+
+
+def synthetic_points(n_points: int, seed: int = 42):
+    """
+    Daily income/expense points shaped like get_daily_income_vs_expense rows, with ~0.5% spikes.
+    Dates are datetime64[D] since a million consecutive days does not fit in pandas' nanosecond timestamps.
+    """
+    rng = np.random.default_rng(seed)
+    dates = np.datetime64('1000-01-01') + np.arange(n_points)
+    weekday = (dates.astype(np.int64) + 3) % 7
+    expense = rng.gamma(2.0, 40.0, n_points) * np.where(weekday >= 5, 1.8, 1.0)
+    income = np.where(weekday == 4, 2500.0, 0.0) + rng.normal(0, 5, n_points).clip(0)
+    spikes = rng.random(n_points) < 0.005
+    expense[spikes] *= 20
+    data = [{'date': d, 'income': round(float(i), 2), 'expense': round(float(e), 2)}
+            for d, i, e in zip(np.datetime_as_string(dates).tolist(), income, expense)]
+    return data, dates, np.column_stack([income, expense]), spikes
+
+
+def legacy(data):
+    """
+    The previous implementation: a global z-score per key, written back into a deepcopy row by row.
+    """
+    df = pd.DataFrame(data)
+    enriched = deepcopy(data)
+    for key in VALUE_KEYS:
+        z = (df[key] - df[key].mean()) / df[key].std()
+        for i, is_anomaly in enumerate(z.abs() > 3.0):
+            if is_anomaly:
+                enriched[i].setdefault('anomaly', {})[key] = True
+    return enriched
+
+
+def current(data, dates, values, detector):
+    return _with_anomalies(data, VALUE_KEYS, detector.detect(dates, values, 'D'))
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def benchmark(sizes, window: int) -> None:
+    detector = AnomalyDetector(window=window)
+    print(f"{'points':>10} {'legacy ms':>12} {'detect ms':>12} {'detect+rows ms':>16} {'spike recall':>14} {'legacy recall':>14}")
+    for n_points in sizes:
+        data, dates, values, spikes = synthetic_points(n_points)
+        legacy_s = _time(lambda: legacy(data))
+        detect_s = _time(lambda: detector.detect(dates, values, 'D'))
+        full_s = _time(lambda: current(data, dates, values, detector))
+
+        flags = detector.detect(dates, values, 'D')[:, 1]
+        legacy_flags = np.array(['expense' in p.get('anomaly', {}) for p in legacy(data)])
+        print(f"{n_points:>10} {legacy_s * 1000:>12.1f} {detect_s * 1000:>12.1f} {full_s * 1000:>16.1f} "
+              f"{flags[spikes].mean():>14.2f} {legacy_flags[spikes].mean():>14.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Anomaly detection: rolling robust detector vs the global z-score')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--window', type=int, default=28)
+    args = parser.parse_args()
+    benchmark(args.sizes, args.window)
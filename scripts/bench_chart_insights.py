@@ -0,0 +1,102 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import backend_server
+from src.chart_insights import ChartInsightService
+from src.engine_registry import EngineRegistry
+from src.finance_sql_pipeline import SQLFinanceQuery
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.finance_sql_pipeline').setLevel(logging.WARNING)
+
+LLM_CALLS = [0]
+LLM_CALLS_LOCK = threading.Lock()
+
+
+class CountingChatModel(FakeFinanceChatModel):
+    def _generate(self, *args, **kwargs):
+        with LLM_CALLS_LOCK:
+            LLM_CALLS[0] += 1
+        return super()._generate(*args, **kwargs)
+
+
+def _charts(count: int):
+    return [{'chart_title': f'Chart {i}', 'sql_query': 'SELECT 1', 'query_params': {'period': 'month'},
+             'query_output': [{'value': i}]} for i in range(count)]
+
+
+def _reset(max_concurrency: int) -> None:
+    backend_server.INSIGHTS = ChartInsightService(max_concurrency=max_concurrency)
+    LLM_CALLS[0] = 0
+
+
+def benchmark(charts: int, clients: int, latency: float, max_concurrency: int) -> None:
+    """
+    Dashboard insights with a fake chat model taking `latency` seconds per call:
+    one /api/insights request per chart vs one /api/insights/batch request, and `clients`
+    dashboards loading the same charts at once (coalesced into one LLM call per chart).
+    """
+    llm = CountingChatModel(latency=latency)
+    backend_server.ENGINES = EngineRegistry(engine_factory=lambda: SQLFinanceQuery(llm=llm), hot_reload=False)
+    backend_server.ENGINES.get_engine()
+    client = backend_server.app.test_client()
+    payload = _charts(charts)
+
+    print(f"{charts} charts, {latency * 1000:.0f} ms per LLM call, max_concurrency {max_concurrency}")
+    print(f"{'':<34} {'total ms':>9} {'first ms':>9} {'LLM calls':>10}")
+
+    _reset(max_concurrency)
+    start = time.perf_counter()
+    first = None
+    for chart in payload:
+        client.post('/api/insights', json=chart).get_data()
+        first = first or time.perf_counter() - start
+    print(f"{'sequential /api/insights':<34} {(time.perf_counter() - start) * 1000:>9.0f} {first * 1000:>9.0f} "
+          f"{LLM_CALLS[0]:>10}")
+
+    _reset(max_concurrency)
+    start = time.perf_counter()
+    first = None
+    response = client.post('/api/insights/batch', json={'charts': payload}, buffered=False)
+    lines = 0
+    for chunk in response.response:
+        first = first or time.perf_counter() - start
+        lines += chunk.count(b'\n')
+    response.close()
+    assert lines == charts, lines
+    print(f"{'/api/insights/batch':<34} {(time.perf_counter() - start) * 1000:>9.0f} {first * 1000:>9.0f} "
+          f"{LLM_CALLS[0]:>10}")
+
+    _reset(max_concurrency)
+
+    def dashboard(_):
+        body = client.post('/api/insights/batch', json={'charts': payload}).get_data(as_text=True)
+        return [json.loads(line) for line in body.splitlines()]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(dashboard, range(clients)))
+    assert all(len(r) == charts for r in results)
+    label = f'{clients} concurrent batches'
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000:>9.0f} {'':>9} {LLM_CALLS[0]:>10}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Chart insights: sequential vs batched, coalesced LLM calls')
+    parser.add_argument('--charts', type=int, default=6)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds of simulated latency per LLM call')
+    parser.add_argument('--max-concurrency', type=int, default=4)
+    args = parser.parse_args()
+    benchmark(args.charts, args.clients, args.latency, args.max_concurrency)
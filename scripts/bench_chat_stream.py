@@ -0,0 +1,74 @@
+import sys
+import time
+import logging
+import argparse
+import statistics
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import backend_server
+from src.engine_registry import EngineRegistry
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.question_cache import QuestionCache
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.finance_sql_pipeline').setLevel(logging.WARNING)
+
+# Every question goes through the whole chain
+NO_QUESTION_CACHE = QuestionCache(max_entries=0)
+
+QUESTION = 'How much did I spend on groceries last month?'
+
+
+def _blocking(client):
+    start = time.perf_counter()
+    client.post('/api/message', json={'prompt': QUESTION}).get_data()
+    total = time.perf_counter() - start
+    return total, total, total
+
+
+def _streaming(client):
+    # (first event, first answer token, last byte) as the client receives them
+    start = time.perf_counter()
+    response = client.post('/api/message/stream', json={'prompt': QUESTION}, buffered=False)
+    first_event = first_token = None
+    for chunk in response.response:
+        now = time.perf_counter() - start
+        first_event = first_event or now
+        if first_token is None and b'event: token' in chunk:
+            first_token = now
+    response.close()
+    return first_event, first_token, time.perf_counter() - start
+
+
+def benchmark(calls: int, latency: float, token_latency: float) -> None:
+    """
+    Time to first byte of /api/message vs /api/message/stream with a fake chat model that takes
+    `latency` seconds per call and streams its answer a word every `token_latency` seconds.
+    """
+    llm = FakeFinanceChatModel(latency=latency, token_latency=token_latency)
+    backend_server.ENGINES = EngineRegistry(
+        engine_factory=lambda: SQLFinanceQuery(llm=llm, question_cache=NO_QUESTION_CACHE), hot_reload=False
+    )
+    client = backend_server.app.test_client()
+    _streaming(client)  # build the engine and the entity index
+
+    print(f"{calls} questions, {latency * 1000:.0f} ms per LLM call, {token_latency * 1000:.0f} ms per answer token")
+    print(f"{'endpoint':<22} {'first byte ms':>14} {'first token ms':>15} {'total ms':>10}")
+    for label, run in (('/api/message', _blocking), ('/api/message/stream', _streaming)):
+        samples = [run(client) for _ in range(calls)]
+        first_byte, first_token, total = (statistics.median(s) * 1000 for s in zip(*samples))
+        print(f"{label:<22} {first_byte:>14.1f} {first_token:>15.1f} {total:>10.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time to first byte: blocking vs streaming chat endpoint')
+    parser.add_argument('--calls', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds of simulated latency per LLM call')
+    parser.add_argument('--token-latency', type=float, default=0.03, help='seconds between streamed answer tokens')
+    args = parser.parse_args()
+    benchmark(args.calls, args.latency, args.token_latency)
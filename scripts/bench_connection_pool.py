@@ -0,0 +1,62 @@
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import backend_server
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ['/api/transactions?page=1&limit=50', '/api/transactions', '/api/budgets']
+
+
+def _run(endpoint: str, requests: int, threads: int) -> float:
+    """
+    Fires `requests` GETs at the endpoint from `threads` workers and returns requests/sec.
+    """
+    client = backend_server.app.test_client()
+
+    def _call(_):
+        resp = client.get(endpoint)
+        if resp.status_code != 200:
+            raise RuntimeError(f'{endpoint} returned {resp.status_code}: {resp.get_data(as_text=True)}')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(_call, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def benchmark(requests: int, threads: int) -> None:
+    if not backend_server.DB_PATH.exists():
+        logger.error(f"Database not found at {backend_server.DB_PATH}. Please run 'python scripts/setup_sqlite.py' first.")
+        return
+
+    pool = backend_server.DB_POOL
+    print(f"{'endpoint':<40} {'connect/request':>16} {'pooled':>10} {'speedup':>8}")
+    for endpoint in ENDPOINTS:
+        # Today's behaviour: FinanceDB opens and closes a sqlite3 connection per request
+        backend_server.DB_POOL = None
+        _run(endpoint, threads, threads)  # warm up
+        baseline = _run(endpoint, requests, threads)
+
+        backend_server.DB_POOL = pool
+        _run(endpoint, threads, threads)
+        pooled = _run(endpoint, requests, threads)
+
+        print(f"{endpoint:<40} {baseline:>12.1f} r/s {pooled:>6.1f} r/s {pooled / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare connect-per-request vs pooled SQLite connections')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+    benchmark(args.requests, args.threads)
@@ -0,0 +1,80 @@
+import sys
+import time
+import logging
+import argparse
+import statistics
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import SQLQueryRepository
+from src.engine_registry import EngineRegistry
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.pipeline.abstract_query_engine import PromptRepository
+from src.question_cache import QuestionCache
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.finance_sql_pipeline').setLevel(logging.WARNING)
+
+# Every question goes through the whole chain
+NO_QUESTION_CACHE = QuestionCache(max_entries=0)
+
+QUESTIONS = [
+    'How much did I spend on groceries last month?',
+    'What are my top expense categories?',
+    'How much did I spend at starbucks this year?',
+]
+
+
+def _latencies(ask, calls: int):
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        ask(QUESTIONS[i % len(QUESTIONS)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(label: str, samples) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<34} median {statistics.median(samples) * 1000:>8.1f} ms   p95 {p95 * 1000:>8.1f} ms")
+
+
+def benchmark(calls: int, latency: float) -> None:
+    """
+    ask() with a local fake chat model, so only the pipeline's own overhead is measured
+    (plus `latency` seconds per LLM call, three calls per question).
+    """
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    PromptRepository(prompts_file=sqlite_cfg['prompts_file'])
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+
+    def new_engine():
+        return SQLFinanceQuery(llm=FakeFinanceChatModel(latency=latency), question_cache=NO_QUESTION_CACHE)
+
+    def cold(question):
+        # What /api/message did per request: config, DB reflection, LLM client and chain from scratch
+        return new_engine().ask(question)
+
+    registry = EngineRegistry(engine_factory=new_engine)
+    registry.get_engine()
+
+    def warm(question):
+        return registry.get_engine().ask(question)
+
+    print(f"{calls} questions, {latency * 1000:.0f} ms simulated latency per LLM call")
+    _report('cold (new SQLFinanceQuery)', _latencies(cold, calls))
+    _report('warm (EngineRegistry)', _latencies(warm, calls))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cold vs warm SQLFinanceQuery.ask() latency with a fake chat model')
+    parser.add_argument('--calls', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds of simulated latency per LLM call')
+    args = parser.parse_args()
+    benchmark(args.calls, args.latency)
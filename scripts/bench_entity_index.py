@@ -0,0 +1,103 @@
+import sys
+import time
+import random
+import sqlite3
+import logging
+import argparse
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, SQLQueryRepository, ConnectionPool
+from src.datamodel.entity_index import FuzzyEntityIndex
+from src.datamodel.entity_resolver import EntityResolver
+
+logging.basicConfig(level=logging.WARNING)
+
+DEFAULT_DB = root_path / 'data' / 'personal_finance' / 'finance.db'
+
+# Words a question contains that are not entities, a match for them is a false positive
+NEGATIVES = ['last', 'month', 'how much', 'spend', 'total', 'this year', 'average', 'week', 'compare', 'budget']
+
+
+def make_queries(values, seed: int = 7):
+    """
+    (query, expected original_text) pairs: exact, upper case, singular/plural, one-character typo
+    and first-word-only variants of every indexed value.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for value in values:
+        queries.append(('exact', value, value))
+        queries.append(('case', value.upper(), value))
+        queries.append(('plural', value[:-1] if value.endswith('s') else value + 's', value))
+        if len(value) > 4:
+            i = rng.randrange(1, len(value) - 1)
+            queries.append(('typo', value[:i] + value[i + 1:], value))
+        if ' ' in value:
+            queries.append(('word', value.split()[0], value))
+    return queries
+
+
+def _timed(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return results, (time.perf_counter() - start) / max(len(items), 1)
+
+
+def benchmark(db_path: Path) -> None:
+    SQLQueryRepository(queries_file='sql_queries.json')
+    pool = ConnectionPool(str(db_path), size=1, readonly=True)
+    with FinanceDB(str(db_path), pool=pool) as db:
+        values = sorted({row[0] for row in db.conn.execute('SELECT original_text FROM global_search_index')})
+        index = FuzzyEntityIndex()
+        start = time.perf_counter()
+        index.refresh(db)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        fts_query = SQLQueryRepository().get_query(FinanceQueryName.ENTITY_FULLTEXT_SEARCH)
+
+        def fts(term):
+            # The query map_to_database used to run per entity (raw term as the MATCH expression)
+            try:
+                row = db.conn.execute(fts_query, {'value': term}).fetchone()
+            except sqlite3.Error:
+                return None
+            return row[0] if row else None
+
+        def memory(term):
+            match = index.lookup(term)
+            return match[0] if match else None
+
+        queries = make_queries(values)
+        print(f"{len(values)} indexed values, memory index built in {build_ms:.1f} ms, {len(queries)} queries\n")
+        kinds = sorted({kind for kind, _, _ in queries})
+        print(f"{'backend':<8} {'us/lookup':>10} " + ' '.join(f"{kind:>8}" for kind in kinds) + f" {'false +':>8}")
+        for name, fn in (('fts', fts), ('memory', memory)):
+            results, per_lookup = _timed(fn, [q for _, q, _ in queries])
+            recall = []
+            for kind in kinds:
+                hits = [res == expected for (k, _, expected), res in zip(queries, results) if k == kind]
+                recall.append(sum(hits) / len(hits))
+            negatives = sum(fn(term) is not None for term in NEGATIVES)
+            print(f"{name:<8} {per_lookup * 1e6:>10.1f} " + ' '.join(f"{r:>8.2f}" for r in recall)
+                  + f" {negatives:>5}/{len(NEGATIVES)}")
+
+    # A whole question's entities through the resolver (batched FTS vs memory), LRU disabled
+    terms = [q for _, q, _ in queries[:5]]
+    print()
+    for label, resolver in (('fts batch', EntityResolver(pool, cache_size=0)),
+                            ('memory', EntityResolver(pool, cache_size=0, index=FuzzyEntityIndex()))):
+        resolver.resolve(terms)
+        _, per_call = _timed(resolver.resolve, [terms] * 200)
+        print(f"EntityResolver.resolve({len(terms)} terms), {label:<9}: {per_call * 1e6:>8.1f} us")
+    pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Entity lookup recall and latency: FTS5 bm25 vs the in-memory fuzzy index')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB)
+    args = parser.parse_args()
+    benchmark(args.db)
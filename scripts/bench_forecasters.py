@@ -0,0 +1,105 @@
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.forecasting import ForecasterFactory, ParallelForecaster, shutdown_process_pool
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+VALUE_KEYS = ['income', 'expense']
+
+
+def load_daily_series() -> pd.DataFrame:
+    """
+    Daily income / expense totals from personal_finance.csv, the shape of get_daily_income_vs_expense.
+    """
+    csv_path = root_path / 'data' / 'personal_finance' / 'personal_finance.csv'
+    df = pd.read_csv(csv_path)
+    df['ds'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+    df['income'] = np.where(df['Transaction_Type'] == 'credit', df['Amount'], 0.0)
+    df['expense'] = np.where(df['Transaction_Type'] == 'debit', df['Amount'], 0.0)
+    return df.groupby('ds', as_index=False)[VALUE_KEYS].sum()
+
+
+def make_forecaster(backend: str, workers: int):
+    if workers:
+        return ParallelForecaster(backend, max_workers=workers)
+    return ForecasterFactory().get_forecaster(backend)
+
+
+def evaluate(backend: str, daily: pd.DataFrame, history_days: int, horizon: int, origins: int, workers: int = 0):
+    """
+    Rolling-origin evaluation: fit on `history_days` of history (like the dashboard), score the next `horizon` days.
+    Days without transactions count as 0 in the actuals.
+    """
+    forecaster = make_forecaster(backend, workers)
+    actuals = daily.set_index('ds')[VALUE_KEYS].asfreq('D', fill_value=0.0)
+    last_origin = actuals.index.max() - pd.Timedelta(days=horizon)
+    cutoffs = [last_origin - pd.Timedelta(days=30 * i) for i in range(origins)]
+
+    errors, elapsed = [], 0.0
+    for cutoff in cutoffs:
+        window = daily[(daily['ds'] > cutoff - pd.Timedelta(days=history_days)) & (daily['ds'] <= cutoff)]
+        start = time.perf_counter()
+        dates, yhat = forecaster.forecast(window['ds'], window[VALUE_KEYS].to_numpy(dtype=float), horizon, 'D')
+        elapsed += time.perf_counter() - start
+        truth = actuals.reindex(dates, fill_value=0.0).to_numpy()
+        errors.append(np.abs(yhat - truth).mean(axis=0))
+
+    mae = np.mean(errors, axis=0)
+    return elapsed / len(cutoffs), dict(zip(VALUE_KEYS, mae))
+
+
+def benchmark_batch(backend: str, history_days: int, horizon: int, workers: int) -> float:
+    """
+    Wall time of one forecast_batch over every per-category expense series (the fan-out a per-category view needs).
+    """
+    csv_path = root_path / 'data' / 'personal_finance' / 'personal_finance.csv'
+    df = pd.read_csv(csv_path)
+    df['ds'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+    df = df[df['ds'] > df['ds'].max() - pd.Timedelta(days=history_days)]
+    by_category = df.groupby(['Category', 'ds'], as_index=False)['Amount'].sum()
+    series = {c: (g['ds'], g['Amount'].to_numpy()) for c, g in by_category.groupby('Category') if len(g) > 1}
+
+    forecaster = make_forecaster(backend, workers)
+    if workers:
+        forecaster.forecast_batch(dict(list(series.items())[:workers]), horizon, 'D')  # start the workers
+    start = time.perf_counter()
+    forecaster.forecast_batch(series, horizon, 'D')
+    return len(series), time.perf_counter() - start
+
+
+def benchmark(backends, history_days: int, horizon: int, origins: int, workers: int) -> None:
+    daily = load_daily_series()
+    mode = f'process x{workers}' if workers else 'inline'
+    print(f"{'backend':<10} {'mode':<12} {'ms/call':>10} " + " ".join(f"{'MAE ' + k:>14}" for k in VALUE_KEYS))
+    for backend in backends:
+        per_call, mae = evaluate(backend, daily, history_days, horizon, origins, workers)
+        print(f"{backend:<10} {mode:<12} {per_call * 1000:>10.1f} " + " ".join(f"{mae[k]:>14.2f}" for k in VALUE_KEYS))
+
+    print()
+    for backend in backends:
+        n_series, elapsed = benchmark_batch(backend, history_days, horizon, workers)
+        print(f"{backend:<10} {mode:<12} forecast_batch of {n_series} category series: {elapsed * 1000:.1f} ms")
+    shutdown_process_pool()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Speed and accuracy of the forecasting backends on personal_finance.csv')
+    parser.add_argument('--backends', nargs='+', default=['numpy', 'prophet'])
+    parser.add_argument('--history-days', type=int, default=30)
+    parser.add_argument('--horizon', type=int, default=14)
+    parser.add_argument('--origins', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=0, help='fit in a process pool of this size (0: inline)')
+    args = parser.parse_args()
+    benchmark(args.backends, args.history_days, args.horizon, args.origins, args.workers)
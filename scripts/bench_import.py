@@ -0,0 +1,42 @@
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from synthetic_data import create_synthetic_db, write_synthetic_csv
+from import_statements import import_statement
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('import_statements').setLevel(logging.WARNING)
+
+
+def benchmark(history_sizes, new_rows: int) -> None:
+    """
+    Time to append the same `new_rows` statement to databases with more and more history,
+    then to import it again (every row a duplicate).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        statement = write_synthetic_csv(Path(tmp) / 'statement.csv', new_rows, days=30, seed=7)
+        print(f"statement of {new_rows} rows")
+        print(f"{'history rows':>12} {'import s':>9} {'inserted':>9} {'re-import s':>12} {'duplicates':>11}")
+        for size in history_sizes:
+            db_path = create_synthetic_db(Path(tmp) / f'history_{size}.db', size)
+            first = import_statement(statement, db_path)
+            again = import_statement(statement, db_path)
+            print(f"{size:>12} {first['seconds']:>9.2f} {first['inserted']:>9} {again['seconds']:>12.2f} "
+                  f"{again['duplicates']:>11}")
+            db_path.unlink()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Incremental statement import time vs size of the history')
+    parser.add_argument('--history', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--new-rows', type=int, default=20_000)
+    args = parser.parse_args()
+    benchmark(args.history, args.new_rows)
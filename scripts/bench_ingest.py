@@ -0,0 +1,74 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import sqlite3
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import setup_sqlite
+from synthetic_data import write_synthetic_csv
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('setup_sqlite').setLevel(logging.WARNING)
+
+
+def run_child(mode: str, csv_path: Path, db_path: Path) -> None:
+    """
+    One setup_db() load in this process, prints seconds, rows and peak RSS as JSON for the parent.
+    """
+    db_path.unlink(missing_ok=True)
+    start = time.perf_counter()
+    setup_sqlite.setup_db(ingest_mode=mode, data_path=csv_path, db_path=db_path)
+    seconds = time.perf_counter() - start
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    # ru_maxrss is in KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'seconds': seconds, 'rows': rows, 'peak_rss_mb': peak_mb}))
+
+
+def benchmark(rows: int, modes, csv_path: Path = None) -> None:
+    """
+    Loads a synthetic CSV of `rows` transactions with each ingest mode, each in its own process so the
+    peak RSS is that mode's alone.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if csv_path is None:
+            csv_path = Path(tmp) / 'transactions.csv'
+            start = time.perf_counter()
+            write_synthetic_csv(csv_path, rows)
+            print(f"Wrote {rows} rows ({csv_path.stat().st_size / 2**20:.0f} MiB) in {time.perf_counter() - start:.1f} s")
+
+        print(f"{'mode':<10} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'peak RSS MiB':>13}")
+        for mode in modes:
+            result = subprocess.run([sys.executable, __file__, '--child-mode', mode, '--csv', str(csv_path),
+                                     '--db', str(Path(tmp) / f'{mode}.db')], capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"{mode:<10} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{mode:<10} {stats['rows']:>10} {stats['seconds']:>9.1f} {stats['rows'] / stats['seconds']:>10.0f} "
+                  f"{stats['peak_rss_mb']:>13.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='setup_db ingest modes: time and peak memory on a synthetic CSV')
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--modes', nargs='+', default=['stream'], choices=setup_sqlite.INGEST_MODES,
+                        help='rowwise and columnar hold the whole file in memory, only try them on small --rows')
+    parser.add_argument('--csv', type=Path, help='existing CSV to load instead of generating one')
+    parser.add_argument('--db', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--child-mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child_mode:
+        run_child(args.child_mode, args.csv, args.db)
+    else:
+        benchmark(args.rows, args.modes, args.csv)
@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from synthetic_data import write_synthetic_csv
+from ingest_files import ingest_files
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('ingest_files').setLevel(logging.WARNING)
+logging.getLogger('setup_sqlite').setLevel(logging.WARNING)
+
+
+def write_corpus(folder: Path, files: int, rows_per_file: int):
+    """`files` statements of a month each, like one export per account and month."""
+    return [write_synthetic_csv(folder / f'statement_{i:03d}.csv', rows_per_file, days=30, seed=i)
+            for i in range(files)]
+
+
+def benchmark(files: int, rows_per_file: int, worker_counts) -> None:
+    """
+    Wall time of ingest_files() on the same corpus with the parsing done in this process (0 workers)
+    and in process pools of each size.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_corpus(Path(tmp), files, rows_per_file)
+        print(f"{files} files x {rows_per_file} rows, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>8} {'rows/s':>9} {'speedup':>8} {'median file rows/s':>19}")
+        baseline = None
+        for workers in worker_counts:
+            db_path = Path(tmp) / f'workers_{workers}.db'
+            start = time.perf_counter()
+            stats = ingest_files(paths, db_path, workers=workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            per_file = sorted(s['rows_per_second'] for s in stats)
+            total = sum(s['rows'] for s in stats)
+            print(f"{workers:>8} {seconds:>8.2f} {total / seconds:>9.0f} {baseline / seconds:>7.2f}x "
+                  f"{per_file[len(per_file) // 2]:>19.0f}")
+            db_path.unlink()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Multi-file ingest: serial parsing vs a process pool')
+    parser.add_argument('--files', type=int, default=96)
+    parser.add_argument('--rows-per-file', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    args = parser.parse_args()
+    benchmark(args.files, args.rows_per_file, args.workers)
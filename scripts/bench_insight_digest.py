@@ -0,0 +1,88 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import SQLQueryRepository
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.insight_digest import PayloadDigester, estimate_tokens
+from src.insights_engine import enrich_with_forecast_and_anomalies
+from src.pipeline.abstract_query_engine import PromptRepository
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.finance_sql_pipeline').setLevel(logging.WARNING)
+
+
+def make_window(days: int, seed: int = 3):
+    """
+    `days` of daily income/expense shaped like GET_DAILY_INCOME_VS_EXPENSE, enriched like the income-vs-expenses panel.
+    """
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-01') + days)
+    expense = rng.gamma(2.0, 60.0, days) * (1 + 0.3 * (dates.astype('datetime64[D]').view('int64') % 7 >= 5))
+    expense[rng.choice(days, max(1, days // 40), replace=False)] *= 8
+    income = np.where(np.arange(days) % 14 == 0, 2250.0, 0.0) + rng.gamma(0.3, 50.0, days)
+    rows = [{'date': str(d), 'income': float(i), 'expense': float(e)} for d, i, e in zip(dates, income, expense)]
+    return enrich_with_forecast_and_anomalies(rows, date_key='date', value_keys=('income', 'expense'),
+                                              granularity='daily', horizon=14)
+
+
+def _median_ms(fn, calls: int) -> float:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def benchmark(windows, calls: int, latency: float, prompt_token_latency: float, max_tokens: int) -> None:
+    """
+    Prompt size of query_output and generate_chart_insight() latency, every row (json.dumps) vs the digest,
+    with a fake chat model whose latency grows with the prompt (`prompt_token_latency` s per token).
+    """
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    PromptRepository(prompts_file=sqlite_cfg['prompts_file'])
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+    engine = SQLFinanceQuery(llm=FakeFinanceChatModel(latency=latency, prompt_token_latency=prompt_token_latency))
+    digester = PayloadDigester(max_tokens=max_tokens)
+
+    print(f"{latency * 1000:.0f} ms per LLM call + {prompt_token_latency * 1e6:.0f} us per prompt token, "
+          f"budget {max_tokens} tokens")
+    print(f"{'days':>6} {'raw tokens':>11} {'digest tokens':>14} {'digest ms':>10} {'raw call ms':>12} "
+          f"{'digest call ms':>15}")
+    for days in windows:
+        output = make_window(days)
+        raw_tokens = estimate_tokens(json.dumps(output, default=str))
+        digest_tokens = estimate_tokens(digester.serialize(output))
+        digest_ms = _median_ms(lambda: digester.serialize(output), calls)
+
+        def call(serializer):
+            engine.insight_digester = serializer
+            return _median_ms(lambda: engine.generate_chart_insight('Income Vs Expenses', 'SELECT ...',
+                                                                   ['2024-01-01'], output), calls)
+        raw_ms, digest_call_ms = call(None), call(digester)
+        print(f"{days:>6} {raw_tokens:>11} {digest_tokens:>14} {digest_ms:>10.2f} {raw_ms:>12.1f} "
+              f"{digest_call_ms:>15.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Chart insight prompt size and latency: full query_output vs digest')
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 90, 365, 1095])
+    parser.add_argument('--calls', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds of simulated latency per LLM call')
+    parser.add_argument('--prompt-token-latency', type=float, default=0.0002, help='seconds per prompt token')
+    parser.add_argument('--max-tokens', type=int, default=400)
+    args = parser.parse_args()
+    benchmark(args.days, args.calls, args.latency, args.prompt_token_latency, args.max_tokens)
@@ -0,0 +1,92 @@
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+from datetime import date
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.chart_insights import ChartInsightService
+from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, ConnectionPool
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.insight_cache import InsightCache
+from src.insight_precompute import InsightPrecomputer, PANELS
+from src.pipeline.abstract_query_engine import PromptRepository
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.finance_sql_pipeline').setLevel(logging.WARNING)
+
+DEFAULT_DB = root_path / 'data' / 'personal_finance' / 'finance.db'
+
+
+def _dashboard_insights(pool, service, engine, periods):
+    """
+    What the first dashboard load waits for: every chart's insight, one after the other like the UI's requests.
+    """
+    start = time.perf_counter()
+    with FinanceDB(pool.db_path, pool=pool) as db:
+        payloads = [p for panel, inputs in PANELS.items() for period in periods[:1] for p in inputs(db, period)]
+    for p in payloads:
+        service.get(engine, p['chart_title'], p['sql_query'], p['query_params'], p['query_output'])
+    return len(payloads), (time.perf_counter() - start) * 1000
+
+
+def benchmark(db_path: Path, latency: float) -> None:
+    """
+    Dashboard insight latency with lazy generation vs background precomputation, on a copy of the
+    database and with a fake chat model taking `latency` seconds per call.
+    """
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    PromptRepository(prompts_file=sqlite_cfg['prompts_file'])
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+    engine = SQLFinanceQuery(llm=FakeFinanceChatModel(latency=latency))
+    periods = ('month', 'week')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / 'finance.db'
+        with sqlite3.connect(str(db_path)) as src, sqlite3.connect(str(copy)) as dst:
+            src.backup(dst)
+        pool = ConnectionPool(str(copy), size=4)
+
+        service = ChartInsightService(cache=InsightCache())
+        charts, lazy_ms = _dashboard_insights(pool, service, engine, periods)
+        print(f"{charts} chart insights, {latency * 1000:.0f} ms per LLM call")
+        print(f"{'lazy (first load after a change)':<40} {lazy_ms:>9.0f} ms")
+
+        service = ChartInsightService(cache=InsightCache())
+        precomputer = InsightPrecomputer(pool, service, lambda: engine, poll_interval=3600, periods=periods)
+        start = time.perf_counter()
+        precomputer.start()
+        precomputer.check()  # no-op if the watcher thread got there first
+        precomputer.wait_idle()
+        background_ms = (time.perf_counter() - start) * 1000
+        _, warm_ms = _dashboard_insights(pool, service, engine, periods)
+        print(f"{'background precompute (off request path)':<40} {background_ms:>9.0f} ms")
+        print(f"{'first load after precompute':<40} {warm_ms:>9.1f} ms")
+
+        # New transaction: the next check notices the version change and regenerates
+        with sqlite3.connect(str(copy)) as conn:
+            conn.execute("INSERT INTO transactions (date, description, amount, transaction_type, category, account_name) "
+                         "VALUES (?, 'Bench Coffee', 4.5, 'debit', 'Coffee Shops', 'Checking')", (date.today().isoformat(),))
+        assert precomputer.check()
+        precomputer.wait_idle()
+        _, changed_ms = _dashboard_insights(pool, service, engine, periods)
+        print(f"{'first load after a new transaction':<40} {changed_ms:>9.1f} ms")
+        print(precomputer.stats())
+        precomputer.stop()
+        pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Dashboard insights: lazy generation vs background precomputation')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds of simulated latency per LLM call')
+    args = parser.parse_args()
+    benchmark(args.db, args.latency)
@@ -0,0 +1,63 @@
+import sys
+import time
+import logging
+import argparse
+import statistics
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import SQLQueryRepository
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.pipeline.abstract_query_engine import PromptRepository
+from src.question_cache import QuestionCache
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.WARNING)
+logging.getLogger('src.finance_sql_pipeline').setLevel(logging.WARNING)
+
+# Every question goes through the whole chain
+NO_QUESTION_CACHE = QuestionCache(max_entries=0)
+
+QUESTION = 'How much did I spend on groceries last month?'
+
+
+def _median_ms(fn, calls: int) -> float:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def benchmark(calls: int) -> None:
+    """
+    Per-question cost of the prompt context (schema text + few-shot examples) and of a whole ask()
+    with a fake chat model, so everything measured is pipeline overhead rather than LLM time.
+    """
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    PromptRepository(prompts_file=sqlite_cfg['prompts_file'])
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+
+    print(f"{'':<12} {'schema ms':>10} {'examples ms':>12} {'ask() ms':>10}")
+    for cached in (False, True):
+        engine = SQLFinanceQuery(llm=FakeFinanceChatModel(), cache_prompt_context=cached,
+                                 question_cache=NO_QUESTION_CACHE)
+        engine.ask(QUESTION)  # compile the chain and fill the caches
+
+        schema = _median_ms(engine.get_schema_text, calls)
+        examples = _median_ms(engine.get_examples_text, calls)
+        ask = _median_ms(lambda: engine.ask(QUESTION), calls)
+        label = 'cached' if cached else 'uncached'
+        print(f"{label:<12} {schema:>10.2f} {examples:>12.2f} {ask:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Schema / few-shot prompt cache: non-LLM overhead per question')
+    parser.add_argument('--calls', type=int, default=50)
+    args = parser.parse_args()
+    benchmark(args.calls)
@@ -0,0 +1,75 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName, RowFormat, ConnectionPool
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_row_formats(pool: ConnectionPool) -> None:
+    """
+    Fetch + JSON serialisation of get_all_transactions in each RowFormat.
+    """
+    with FinanceDB(pool.db_path, pool=pool) as db:
+        for row_format in RowFormat.ALL:
+            fetch = _time(lambda: db.run_named_query(FinanceQueryName.GET_ALL_TRANSACTIONS, row_format=row_format))
+            result = db.run_named_query(FinanceQueryName.GET_ALL_TRANSACTIONS, row_format=row_format)
+            dump = _time(lambda: json.dumps(result))
+            print(f"  {row_format:<10} fetch {fetch * 1000:>9.1f} ms   json {dump * 1000:>9.1f} ms")
+
+
+def bench_statement_cache(db_path: str, calls: int = 5000) -> None:
+    """
+    Small repeated analytics query with and without the per-connection statement cache.
+    """
+    for cached_statements in (0, 256):
+        pool = ConnectionPool(db_path, size=1, cached_statements=cached_statements)
+        with FinanceDB(db_path, pool=pool) as db:
+            def _calls():
+                for _ in range(calls):
+                    db.run_named_query(FinanceQueryName.GET_BUDGET_BY_CATEGORY, ('groceries',))
+            elapsed = _time(_calls, repeat=1)
+        pool.close()
+        print(f"  cached_statements={cached_statements:<4} {calls / elapsed:>10.0f} queries/s")
+
+
+def benchmark(sizes) -> None:
+    SQLQueryRepository(queries_file='sql_queries.json')
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            db_path = Path(tmp) / f'finance_{n_rows}.db'
+            logger.info(f"Building synthetic database with {n_rows} transactions...")
+            create_synthetic_db(db_path, n_rows)
+
+            print(f"\n--- {n_rows} transactions ---")
+            pool = ConnectionPool(str(db_path), size=1)
+            bench_row_formats(pool)
+            pool.close()
+            bench_statement_cache(str(db_path))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for FinanceDB.run_query row formats and statement cache')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    benchmark(args.sizes)
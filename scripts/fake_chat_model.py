@@ -0,0 +1,84 @@
+import re
+import json
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Local stand-in for the Gemini chat model used by the benchmark and demo scripts.
+# It answers the three pipeline steps without a network call:
+# the entity tool call, a SQL query (the step bound with stop=["\nSQLResult:"]) and a text answer.
+
+STOP_WORDS = {'what', 'how', 'much', 'did', 'spend', 'spent', 'on', 'in', 'the', 'my', 'last', 'this',
+              'month', 'year', 'week', 'show', 'me', 'is', 'was', 'are', 'for', 'a', 'i', 'of', 'to'}
+
+DEFAULT_SQL = "SELECT category, SUM(amount) AS total FROM transactions WHERE transaction_type = 'debit' " \
+              "GROUP BY category ORDER BY total DESC LIMIT 5"
+
+
+class FakeFinanceChatModel(BaseChatModel):
+    """
+    Deterministic chat model; `latency` seconds of sleep per call stand in for the API round trip.
+    Streamed text answers arrive word by word, `token_latency` seconds apart.
+    `prompt_token_latency` seconds per prompt token (~4 characters) model the time to read a long prompt.
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    prompt_token_latency: float = 0.0
+    sql: str = DEFAULT_SQL
+
+    @property
+    def _llm_type(self) -> str:
+        return 'fake-finance'
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any):
+        return self.bind(tools=tools, **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self._sleep_for(messages)
+        reply = self._reply(messages, stop, **kwargs)
+        if self.token_latency and not (reply.tool_calls or stop):
+            # Generating the whole answer takes as long as streaming it
+            time.sleep(self.token_latency * (len(reply.content.split()) - 1))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _sleep_for(self, messages: List[BaseMessage]) -> None:
+        delay = self.latency
+        if self.prompt_token_latency:
+            delay += self.prompt_token_latency * sum(len(str(m.content)) for m in messages) / 4
+        if delay:
+            time.sleep(delay)
+
+    def _reply(self, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs: Any) -> AIMessage:
+        text = messages[-1].content if messages else ''
+        if kwargs.get('tools'):
+            names = [w for w in re.findall(r'[a-z&]+', text.lower()) if w not in STOP_WORDS and len(w) > 2]
+            return AIMessage(content='', tool_calls=[{'name': 'Entities', 'args': {'names': names}, 'id': 'call_0'}])
+        if stop:
+            return AIMessage(content=f'```sql\n{self.sql}\n```')
+        return AIMessage(content='Your top spending categories were groceries and restaurants.')
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self._sleep_for(messages)
+        reply = self._reply(messages, stop, **kwargs)
+        if reply.tool_calls:
+            call = reply.tool_calls[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(content='', tool_call_chunks=[{
+                'name': call['name'], 'args': json.dumps(call['args']), 'id': call['id'], 'index': 0
+            }]))
+            return
+        if stop:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=reply.content))
+            return
+        for i, word in enumerate(re.findall(r'\S+\s*', reply.content)):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
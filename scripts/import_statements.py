@@ -0,0 +1,182 @@
+import sys
+import csv
+import time
+import sqlite3
+import logging
+import argparse
+import itertools
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+# Add the project root to sys.path to allow imports from src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.datamodel.schema import SchemaManager, transaction_row_hash
+from setup_sqlite import get_paths, parse_rows, apply_to_balance, DEFAULT_BATCH_SIZE, STARTING_BALANCES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Transaction columns that feed global_search_index, as build_search_index names them
+SEARCH_COLUMNS = {
+    'description': 'transaction_description',
+    'category': 'transaction_category',
+    'transaction_type': 'transaction_type',
+}
+
+HASH_COLUMNS = ('date', 'description', 'amount', 'account_name')
+
+# Staged rows whose hash was imported before: looked up one by one through the unique row_hash index
+DROP_KNOWN_ROWS_SQL = ("DELETE FROM import_staging WHERE EXISTS (SELECT 1 FROM transaction_hashes "
+                       "WHERE transaction_hashes.row_hash = import_staging.row_hash)")
+# The last id AUTOINCREMENT handed out, deleted rows included, so an id is never reused
+NEXT_ID_SQL = ("SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence WHERE name = 'transactions'), 0), "
+               "IFNULL((SELECT MAX(id) FROM transactions), 0))")
+INSERT_HASHES_SQL = ("INSERT INTO transaction_hashes (transaction_id, row_hash) "
+                     "SELECT :base_id + ROW_NUMBER() OVER (ORDER BY rowid), row_hash FROM import_staging")
+
+
+def get_import_state(conn: sqlite3.Connection, key: str, default: Any = None) -> Any:
+    row = conn.execute("SELECT value FROM import_state WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _search_values(conn: sqlite3.Connection) -> Set[Tuple[str, str]]:
+    # (original_text, column_name) pairs already indexed, one row per distinct value (not per transaction)
+    return set(conn.execute("SELECT original_text, column_name FROM global_search_index "
+                            "WHERE table_name = 'transactions'").fetchall())
+
+
+def _shifted(rows, date_idx: int, shift_days: int):
+    """Applies the database's demo date shift (see setup_sqlite.record_date_shift) to parsed ISO dates."""
+    if not shift_days or date_idx is None:
+        yield from rows
+        return
+    shifted = {}
+    for row in rows:
+        iso = row[date_idx]
+        new = shifted.get(iso)
+        if new is None:
+            try:
+                new = (datetime.strptime(iso, "%Y-%m-%d") + timedelta(days=shift_days)).strftime("%Y-%m-%d")
+            except (ValueError, TypeError):
+                new = iso
+            shifted[iso] = new
+        yield row[:date_idx] + (new,) + row[date_idx + 1:]
+
+
+def import_statement(csv_path: Path, db_path: Path = None, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Appends one CSV statement (personal_finance.csv layout) to an existing database.
+
+    Rows already present, by transaction_row_hash, are skipped, so overlapping or repeated statements
+    are safe to import. Each batch inserts its new rows, adds their amounts to accounts.balance and indexes
+    their unseen description / category / type values in one transaction. The work done depends on the
+    size of the statement: lookups go through the unique transaction_hashes.row_hash index, nothing scans the history.
+    """
+    db_path = db_path or get_paths()[0]
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        SchemaManager().upgrade(conn)
+        shift_days = int(get_import_state(conn, 'date_shift_days', 0))
+        table_columns = {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}
+
+        with open(csv_path, mode='r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            original_headers = next(reader, None)
+            if not original_headers:
+                raise ValueError(f"{csv_path} is empty or missing headers")
+
+            sanitized_headers = [h.strip().replace(' ', '_').lower() for h in original_headers]
+            unknown = [h for h in sanitized_headers if h not in table_columns]
+            if unknown:
+                raise ValueError(f"{csv_path} has columns the transactions table does not: {unknown}")
+            missing = [h for h in HASH_COLUMNS if h not in sanitized_headers]
+            if missing:
+                raise ValueError(f"{csv_path} is missing the columns needed to identify rows: {missing}")
+
+            columns = ', '.join(sanitized_headers)
+            conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS import_staging ({columns}, row_hash TEXT)")
+            staging_sql = f"INSERT INTO import_staging ({columns}, row_hash) VALUES ({', '.join('?' * (len(sanitized_headers) + 1))})"
+            returned = [c for c in ('amount', 'transaction_type', 'account_name', *SEARCH_COLUMNS) if c in sanitized_headers]
+            # Ids are given explicitly so each new row's hash can be stored under the id it gets
+            insert_sql = (f"INSERT INTO transactions (id, {columns}) "
+                          f"SELECT :base_id + ROW_NUMBER() OVER (ORDER BY rowid), {columns} FROM import_staging "
+                          f"ORDER BY rowid RETURNING {', '.join(returned)}")
+
+            hash_idx = [sanitized_headers.index(c) for c in HASH_COLUMNS]
+            date_idx = sanitized_headers.index('date')
+            rows = _shifted(parse_rows(reader, original_headers, sanitized_headers, None, {}), date_idx, shift_days)
+            occurrences = Counter()
+            indexed = _search_values(conn)
+            stats = {'rows': 0, 'inserted': 0, 'duplicates': 0, 'new_search_values': 0}
+
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                staged = []
+                for row in batch:
+                    key = tuple(row[i] for i in hash_idx)
+                    ordinal = occurrences[key]
+                    occurrences[key] += 1
+                    staged.append(row + (transaction_row_hash(*key, ordinal),))
+
+                with conn:
+                    conn.execute("DELETE FROM import_staging")
+                    conn.executemany(staging_sql, staged)
+                    conn.execute(DROP_KNOWN_ROWS_SQL)
+                    base_id = {'base_id': conn.execute(NEXT_ID_SQL).fetchone()[0]}
+                    new_rows = [dict(zip(returned, r)) for r in conn.execute(insert_sql, base_id).fetchall()]
+                    conn.execute(INSERT_HASHES_SQL, base_id)
+                    _apply_balance_deltas(conn, new_rows)
+                    stats['new_search_values'] += _index_new_values(conn, new_rows, indexed)
+
+                stats['rows'] += len(batch)
+                stats['inserted'] += len(new_rows)
+                stats['duplicates'] += len(batch) - len(new_rows)
+
+        conn.execute("DROP TABLE IF EXISTS temp.import_staging")
+    finally:
+        conn.close()
+
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    logger.info(f"Imported {csv_path}: {stats}")
+    return stats
+
+
+def _apply_balance_deltas(conn: sqlite3.Connection, new_rows: List[Dict[str, Any]]) -> None:
+    deltas = dict.fromkeys(STARTING_BALANCES, 0.0)
+    for row in new_rows:
+        if isinstance(row.get('amount'), (int, float)):
+            apply_to_balance(deltas, (row.get('account_name') or '').lower(), row['amount'],
+                             (row.get('transaction_type') or '').lower())
+    conn.executemany("INSERT INTO accounts (name, type, balance) VALUES (?, ?, ?) "
+                     "ON CONFLICT (name) DO UPDATE SET balance = balance + excluded.balance",
+                     [(name, 'depository' if name == 'checking' else 'credit', delta)
+                      for name, delta in deltas.items() if delta])
+
+
+def _index_new_values(conn: sqlite3.Connection, new_rows: List[Dict[str, Any]], indexed: Set[Tuple[str, str]]) -> int:
+    values = []
+    for row in new_rows:
+        for column, column_name in SEARCH_COLUMNS.items():
+            value = row.get(column)
+            if value and (value, column_name) not in indexed:
+                indexed.add((value, column_name))
+                values.append((value, column_name, 'transactions'))
+    conn.executemany("INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)", values)
+    return len(values)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Append CSV statements to an existing finance.db, skipping rows already imported')
+    parser.add_argument('csv', type=Path, nargs='+')
+    parser.add_argument('--db', type=Path, help='defaults to data/personal_finance/finance.db')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    for path in args.csv:
+        import_statement(path, args.db, args.batch_size)
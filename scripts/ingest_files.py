@@ -0,0 +1,296 @@
+import os
+import sys
+import csv
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Add the project root to sys.path to allow imports from src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.datamodel.schema import SchemaManager
+from setup_sqlite import (get_paths, get_db_connection, create_tables, load_goals_and_budgets, build_search_index,
+                          bulk_load_pragmas, parse_rows, shift_dates, insert_accounts, record_date_shift,
+                          DEFAULT_BATCH_SIZE, STARTING_BALANCES)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Parsed batches a file's queue, and the writer's, hold before their producer blocks. With two files per
+# worker in flight, at most about (2 * workers + 1) * queue_size * batch_size parsed rows are in memory.
+DEFAULT_QUEUE_SIZE = 8
+
+
+def sanitize_headers(headers: List[str]) -> List[str]:
+    return [h.strip().replace(' ', '_').lower() for h in headers]
+
+
+def read_headers(path: Path) -> List[str]:
+    with open(path, mode='r', encoding='utf-8-sig', newline='') as f:
+        headers = next(csv.reader(f), None)
+    if not headers:
+        raise ValueError(f"{path} is empty or missing headers")
+    return headers
+
+
+def parse_statement(path: Path, columns: List[str], emit: Callable[[List[Sequence[Any]]], None],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Parses one CSV the way setup_db does (sanitized headers, ISO dates, float amounts), passing the rows to
+    `emit` in `batch_size` lists with their values in `columns` order as soon as each batch is full.
+
+    Returns the row count, the balance change per account, the latest ISO date and the seconds spent parsing
+    (not waiting in `emit`).
+    """
+    start = time.perf_counter()
+    waited = 0.0
+    rows = 0
+    with open(path, mode='r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        original_headers = next(reader, None)
+        if not original_headers:
+            raise ValueError(f"{path} is empty or missing headers")
+        sanitized_headers = sanitize_headers(original_headers)
+        if sorted(sanitized_headers) != sorted(columns):
+            raise ValueError(f"{path} columns {sanitized_headers} do not match {columns}")
+        order = [sanitized_headers.index(c) for c in columns]
+        reorder = order != list(range(len(columns)))
+
+        balances = dict.fromkeys(STARTING_BALANCES, 0.0)
+        state = {}
+        batch = []
+        for row in parse_rows(reader, original_headers, sanitized_headers, balances, state):
+            batch.append(tuple(row[i] for i in order) if reorder else row)
+            if len(batch) == batch_size:
+                rows += len(batch)
+                emit_start = time.perf_counter()
+                emit(batch)
+                waited += time.perf_counter() - emit_start
+                batch = []
+        if batch:
+            rows += len(batch)
+            emit(batch)
+
+    return {
+        'rows': rows,
+        'balances': balances,
+        'max_date': state.get('max_date'),
+        'unparsed_iso_dates': state.get('unparsed_iso_dates', []),
+        'parse_seconds': time.perf_counter() - start - waited,
+    }
+
+
+def parse_statement_to_queue(path: Path, columns: List[str], batches: Any,
+                             batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    parse_statement in a pool worker: the batches go through `batches`, a bounded Manager queue, so the
+    worker blocks instead of piling up a whole file while the writer is behind. A None ends the file,
+    also when parsing fails. Runs in a child process, so everything returned must pickle.
+    """
+    try:
+        return parse_statement(path, columns, batches.put, batch_size)
+    finally:
+        batches.put(None)
+
+
+def _drain(batches: Any, future: Any) -> Any:
+    # Batches of the file `future` parses until its None; a worker that died without sending one raises
+    while True:
+        try:
+            batch = batches.get(timeout=1.0)
+        except queue.Empty:
+            if future.done():
+                future.result()
+                raise RuntimeError('Parse worker stopped without finishing its file')
+            continue
+        if batch is None:
+            return
+        yield batch
+
+
+class BatchWriter(threading.Thread):
+    """
+    The only thread that writes to SQLite: takes (file index, rows) batches off a bounded queue and inserts each
+    in its own transaction, with the journal and fsyncs off for the load. A None item ends the thread.
+
+    On an insert error it keeps draining the queue so producers never block on a full queue, and the error is
+    raised from close().
+    """
+
+    def __init__(self, db_path: Path, columns: List[str], queue_size: int = DEFAULT_QUEUE_SIZE) -> None:
+        super().__init__(name='sqlite-batch-writer', daemon=True)
+        self.db_path = db_path
+        self.insert_sql = (f"INSERT INTO transactions ({', '.join(columns)}) "
+                           f"VALUES ({', '.join('?' * len(columns))})")
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.write_seconds: Dict[int, float] = {}
+        self.error: Optional[BaseException] = None
+
+    def put(self, file_index: int, batch: List[Sequence[Any]]) -> None:
+        self.queue.put((file_index, batch))
+
+    def run(self) -> None:
+        conn = get_db_connection(self.db_path)
+        try:
+            with bulk_load_pragmas(conn):
+                while True:
+                    item = self.queue.get()
+                    if item is None:
+                        break
+                    if self.error is not None:
+                        continue
+                    file_index, batch = item
+                    start = time.perf_counter()
+                    try:
+                        with conn:
+                            conn.executemany(self.insert_sql, batch)
+                    except Exception as e:
+                        logger.error(f"Batch insert failed: {e}")
+                        self.error = e
+                    self.write_seconds[file_index] = self.write_seconds.get(file_index, 0.0) \
+                        + time.perf_counter() - start
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+def ingest_files(csv_paths: Sequence[Path], db_path: Path = None, workers: int = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, queue_size: int = DEFAULT_QUEUE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Builds a new finance.db from many statement CSVs (one per account and month, say) with the same columns.
+
+    Files are parsed in a pool of `workers` processes (os.cpu_count() by default, 0 parses in this process) and
+    their batches stream, in file order, through bounded queues to a single writer thread: at most two files
+    per worker are being parsed, each up to `queue_size` batches ahead of the writer. After the load the dates are shifted so the latest one is today and
+    accounts, the search index and the SchemaManager objects are created, as setup_db does for one file.
+
+    Returns per-file stats: rows, parse and write seconds and rows per second.
+    """
+    if not csv_paths:
+        raise ValueError("No CSV files to ingest")
+    default_db_path, _, goals_path, budgets_path = get_paths()
+    db_path = Path(db_path or default_db_path)
+    if db_path.exists():
+        raise ValueError(f"{db_path} already exists: delete it first or append with import_statements.py")
+    workers = os.cpu_count() if workers is None else workers
+    csv_paths = [Path(p) for p in csv_paths]
+    columns = sanitize_headers(read_headers(csv_paths[0]))
+    start = time.perf_counter()
+
+    conn = get_db_connection(db_path)
+    try:
+        cursor = conn.cursor()
+        create_tables(cursor, columns)
+        load_goals_and_budgets(cursor, goals_path, budgets_path)
+        conn.commit()
+    finally:
+        conn.close()
+
+    writer = BatchWriter(db_path, columns, queue_size)
+    writer.start()
+    results: List[Dict[str, Any]] = []
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    manager = Manager() if pool is not None else None
+    try:
+        if pool is None:
+            for index, path in enumerate(csv_paths):
+                parsed = parse_statement(path, columns, lambda batch: writer.put(index, batch), batch_size)
+                results.append({'path': path, **parsed})
+                if writer.error is not None:
+                    break
+        else:
+            pending: deque = deque()
+            paths = iter(enumerate(csv_paths))
+
+            def submit_next() -> bool:
+                index, path = next(paths, (None, None))
+                if path is None:
+                    return False
+                batches = manager.Queue(maxsize=queue_size)
+                future = pool.submit(parse_statement_to_queue, path, columns, batches, batch_size)
+                pending.append((index, path, batches, future))
+                return True
+
+            for _ in range(max(1, workers * 2)):
+                if not submit_next():
+                    break
+            # Files are written in order, later ones parse ahead until their queues fill up
+            while pending:
+                index, path, batches, future = pending.popleft()
+                for batch in _drain(batches, future):
+                    writer.put(index, batch)
+                parsed = future.result()
+                if writer.error is not None:
+                    break
+                submit_next()
+                results.append({'path': path, **parsed})
+    finally:
+        if manager is not None:
+            # Workers still blocked on a full queue (after an error) fail instead of hanging the pool
+            manager.shutdown()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        writer.close()
+
+    account_balances = dict(STARTING_BALANCES)
+    for result in results:
+        for account, delta in result.pop('balances').items():
+            account_balances[account] += delta
+    max_date = max((r['max_date'] for r in results if r['max_date']), default=None)
+    # Ids follow the file order from 1, the database is new
+    keep, first_id = [], 1
+    for result in results:
+        keep += [(first_id + ordinal, date) for ordinal, date in result.pop('unparsed_iso_dates')]
+        first_id += result['rows']
+
+    conn = get_db_connection(db_path)
+    try:
+        cursor = conn.cursor()
+        with bulk_load_pragmas(conn):
+            shift_days = shift_dates(cursor, max_date, keep)
+            insert_accounts(cursor, account_balances)
+            build_search_index(cursor)
+        # Installed after the bulk load so the version triggers don't fire once per imported row
+        SchemaManager().upgrade(conn)
+        record_date_shift(conn, shift_days)
+    finally:
+        conn.close()
+
+    total_rows = 0
+    for index, result in enumerate(results):
+        result['write_seconds'] = writer.write_seconds.get(index, 0.0)
+        result['rows_per_second'] = result['rows'] / max(result['parse_seconds'] + result['write_seconds'], 1e-9)
+        total_rows += result['rows']
+        logger.debug(f"{result['path'].name}: {result['rows']} rows, parse {result['parse_seconds']:.2f} s, "
+                     f"write {result['write_seconds']:.2f} s, {result['rows_per_second']:.0f} rows/s")
+    seconds = time.perf_counter() - start
+    logger.info(f"Ingested {total_rows} rows from {len(results)} files with {workers} parse workers in "
+                f"{seconds:.1f} s ({total_rows / seconds:.0f} rows/s)")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build finance.db from many statement CSVs, parsing them in parallel')
+    parser.add_argument('csv', type=Path, nargs='+')
+    parser.add_argument('--db', type=Path, help='defaults to data/personal_finance/finance.db')
+    parser.add_argument('--workers', type=int, help='parse processes, defaults to the CPU count, 0 for none')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE)
+    args = parser.parse_args()
+    stats = ingest_files(args.csv, args.db, args.workers, args.batch_size, args.queue_size)
+    print(f"{'file':<40} {'rows':>8} {'parse s':>8} {'write s':>8} {'rows/s':>9}")
+    for s in stats:
+        print(f"{s['path'].name:<40} {s['rows']:>8} {s['parse_seconds']:>8.2f} {s['write_seconds']:>8.2f} "
+              f"{s['rows_per_second']:>9.0f}")
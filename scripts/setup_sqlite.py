@@ -1,13 +1,43 @@
+import re
+import sys
 import sqlite3
 import csv
 import logging
+import itertools
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
+# Add the project root to sys.path to allow imports from src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.datamodel.schema import SchemaManager
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# rowwise: the whole CSV in memory, one pass each for the date shift, balances and rows
+# stream: one pass over a generator, fixed-size batches, memory independent of the file size
+# columnar: the whole CSV as pandas columns, dates, shift, amounts and balances as array operations
+INGEST_MODES = ('rowwise', 'stream', 'columnar')
+
+DEFAULT_BATCH_SIZE = 50000
+
+# The dates shift_dates moves, as a regex
+ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+
+# Mock starting balances: Checking has cash, Cards start at 0 debt
+STARTING_BALANCES = {
+    'checking': 5000.00,
+    'platinumcard': 0.00,
+    'silvercard': 0.00
+}
+
 
 def get_paths():
     """
@@ -44,9 +74,389 @@ def clean_up() -> None:
         logger.info("Database file does not exist, nothing to clean.")
 
 
-def setup_db() -> None:
+def create_tables(cursor: sqlite3.Cursor, sanitized_headers: List[str]) -> None:
+    """Creates the transactions, goals, budgets and accounts tables."""
+    # Create Table dynamically based on CSV headers
+    # We default to TEXT for simplicity in this setup script
+    # But for finance data, we want Amount to be REAL and Date to be sortable
+    column_defs = []
+    for col in sanitized_headers:
+        data_type = "REAL" if col == "amount" else "TEXT"
+        column_defs.append(f"{col} {data_type}")
+    
+    columns_def = ", ".join(column_defs)
+    create_table_sql = f"CREATE TABLE IF NOT EXISTS transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns_def})"
+    
+    cursor.execute(create_table_sql)
+
+    # Create Financial Goals Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS financial_goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            target_amount REAL NOT NULL,
+            target_date TEXT NOT NULL,
+            saved_amount REAL DEFAULT 0,
+            status TEXT DEFAULT 'on_track',
+            last_updated TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Create Monthly Budgets Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL UNIQUE,
+            amount_limit REAL NOT NULL
+        )
+    """)
+
+    # Create Accounts Table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            type TEXT NOT NULL,
+            balance REAL NOT NULL
+        )
+    """)
+
+
+def build_search_index(cursor: sqlite3.Cursor) -> None:
+    """Creates the FTS5 global_search_index and fills it with the distinct entity values."""
+    # Create a global search index on text fields for faster lookups
+    logger.info("Creating global search index...")
+    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS global_search_index USING fts5(original_text, column_name, table_name, tokenize = 'porter')")
+
+    # Populate the search index from multiple tables
+    index_queries = {
+        "transaction_description": ("SELECT DISTINCT Description, 'transaction_description', 'transactions' FROM transactions", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
+        "transaction_category": ("SELECT DISTINCT Category, 'transaction_category', 'transactions' FROM transactions", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
+        "transaction_type": ("SELECT DISTINCT transaction_type, 'transaction_type', 'transactions' FROM transactions", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
+        "goal_name": ("SELECT DISTINCT name, 'goal_name', 'financial_goals' FROM financial_goals", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
+        "account_name": ("SELECT DISTINCT name, 'account_name', 'accounts' FROM accounts", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)")
+    }
+
+    for entity_type, (query, insert_sql) in index_queries.items():
+        try:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            cursor.executemany(insert_sql, rows)
+            logger.info(f"Indexed {len(rows)} records for entity type '{entity_type}'.")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to index '{entity_type}': {e}")
+
+
+def apply_to_balance(account_balances: Dict[str, float], account: str, amount: float, t_type: str) -> None:
+    """Adds one transaction to the running balance of its account."""
+    if account == 'checking':
+        # Asset: Credit adds, Debit subtracts
+        account_balances[account] += amount if t_type == 'credit' else -amount
+    elif account in ['platinumcard', 'silvercard']:
+        # Liability: Debit increases debt, Credit reduces debt
+        account_balances[account] += amount if t_type == 'debit' else -amount
+
+
+@lru_cache(maxsize=65536)
+def csv_date_to_iso(value: str) -> Optional[str]:
+    """MM/DD/YYYY -> YYYY-MM-DD, None if the value is not a date. Cached: exports repeat the same few thousand dates."""
+    try:
+        return datetime.strptime(value, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except (ValueError, TypeError):
+        return None
+
+
+@contextmanager
+def bulk_load_pragmas(conn: sqlite3.Connection):
+    """
+    No rollback journal and no fsyncs while a fresh database is loaded, the previous settings are restored after.
+    A crash mid-load leaves a database to delete and rebuild, which is what setup does anyway.
+    """
+    conn.commit()
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    try:
+        yield
+    finally:
+        conn.commit()
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+
+
+def load_goals_and_budgets(cursor: sqlite3.Cursor, goals_path: Path, budgets_path: Path) -> None:
+    """Loads financial_goals and monthly_budgets from their CSVs."""
+    # Load Financial Goals from CSV
+    if goals_path.exists():
+        with open(goals_path, mode='r', encoding='utf-8-sig') as gf:
+            goals_reader = csv.DictReader(gf)
+            goals_rows = []
+            for row in goals_reader:
+                # Convert date from MM/DD/YYYY to YYYY-MM-DD
+                t_date = row['Target_Date']
+                try:
+                    t_date = datetime.strptime(t_date, "%m/%d/%Y").strftime("%Y-%m-%d")
+                except ValueError:
+                    pass
+                goals_rows.append((
+                    row['Name'], float(row['Target_Amount']), t_date, float(row['Saved_Amount']), row['Status']
+                ))
+            cursor.executemany("INSERT INTO financial_goals (name, target_amount, target_date, saved_amount, status) VALUES (?, ?, ?, ?, ?)", goals_rows)
+            logger.info(f"Inserted {len(goals_rows)} goals from CSV.")
+    else:
+        logger.warning(f"Goals file not found at {goals_path}")
+
+    # Load Monthly Budgets from CSV
+    if budgets_path.exists():
+        with open(budgets_path, mode='r', encoding='utf-8-sig') as bf:
+            budgets_reader = csv.DictReader(bf)
+            budget_rows = []
+            for row in budgets_reader:
+                budget_rows.append((row['Category'], float(row['Amount_Limit'])))
+            cursor.executemany("INSERT INTO monthly_budgets (category, amount_limit) VALUES (?, ?)", budget_rows)
+            logger.info(f"Inserted {len(budget_rows)} budgets from CSV.")
+    else:
+        logger.warning(f"Budgets file not found at {budgets_path}")
+
+
+def insert_accounts(cursor: sqlite3.Cursor, account_balances: Dict[str, float]) -> None:
+    cursor.executemany("INSERT INTO accounts (name, type, balance) VALUES (?, ?, ?)",
+                       [(k, 'depository' if k == 'checking' else 'credit', v) for k, v in account_balances.items()])
+
+
+def ingest_rowwise(cursor: sqlite3.Cursor, reader: csv.DictReader, original_headers: List[str],
+                   sanitized_headers: List[str]) -> Tuple[int, int]:
+    """The original loader: reads every row into memory, then scans it three times. Returns (rows, days shifted)."""
+    # Prepare Insert Statement
+    placeholders = ", ".join(["?" for _ in sanitized_headers])
+    insert_sql = f"INSERT INTO transactions ({', '.join(sanitized_headers)}) VALUES ({placeholders})"
+
+    # Read all rows to memory to calculate date shift
+    all_rows = list(reader)
+
+    # Calculate date shift to bring data to current time
+    max_date = None
+    date_header = next((h for h, s in zip(original_headers, sanitized_headers) if s == 'date'), None)
+
+    if date_header:
+        for row in all_rows:
+            try:
+                dt = datetime.strptime(row[date_header], "%m/%d/%Y")
+                if max_date is None or dt > max_date:
+                    max_date = dt
+            except ValueError:
+                pass
+
+    shift_delta = datetime.now() - max_date if max_date else timedelta(0)
+
+    # Calculate Balances for Accounts Table
+    account_balances = dict(STARTING_BALANCES)
+
+    for row in all_rows:
+        acc = row.get('Account_Name', '').lower()
+        try:
+            amt = float(row.get('Amount', 0))
+        except ValueError:
+            continue
+
+        apply_to_balance(account_balances, acc, amt, row.get('Transaction_Type', '').lower())
+
+    # Insert Accounts
+    insert_accounts(cursor, account_balances)
+
+    # Insert Data
+    rows_to_insert = []
+    for row in all_rows:
+        # Ensure values are ordered correctly according to headers
+        row_data = []
+        for h, sanitized_h in zip(original_headers, sanitized_headers):
+            val = row[h]
+            if sanitized_h == "date":
+                try:
+                    d = datetime.strptime(val, "%m/%d/%Y")
+                    val = (d + shift_delta).strftime("%Y-%m-%d")
+                except ValueError:
+                    pass
+            elif sanitized_h == "amount":
+                try:
+                    val = float(val)
+                except ValueError:
+                    pass
+            row_data.append(val)
+        rows_to_insert.append(row_data)
+
+    cursor.executemany(insert_sql, rows_to_insert)
+    return len(rows_to_insert), shift_delta.days
+
+
+def parse_rows(reader: Iterator[List[str]], original_headers: List[str], sanitized_headers: List[str],
+               account_balances: Optional[Dict[str, float]], state: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+    """
+    One pass over the CSV rows: yields insert-ready tuples with ISO dates (not shifted yet), adds each
+    row to `account_balances` (unless None) and keeps the latest (ISO) date seen in state['max_date'].
+    Dates that are not MM/DD/YYYY are kept as they are, those that look ISO anyway go to
+    state['unparsed_iso_dates'] as (row number, value) so shift_dates can leave them alone.
+    """
+    date_idx = sanitized_headers.index('date') if 'date' in sanitized_headers else None
+    amount_idx = sanitized_headers.index('amount') if 'amount' in sanitized_headers else None
+    account_idx = original_headers.index('Account_Name') \
+        if 'Account_Name' in original_headers and account_balances is not None else None
+    type_idx = original_headers.index('Transaction_Type') if 'Transaction_Type' in original_headers else None
+    width = len(sanitized_headers)
+    max_date = state.get('max_date')
+
+    ordinal = -1
+    for row in reader:
+        if not row:
+            # Blank line, DictReader skips these too
+            continue
+        ordinal += 1
+        if len(row) != width:
+            # Short or long line, pad/trim like DictReader would
+            row = (row + [None] * width)[:width]
+
+        if date_idx is not None:
+            iso = csv_date_to_iso(row[date_idx])
+            if iso is not None:
+                row[date_idx] = iso
+                # ISO dates order as strings
+                if max_date is None or iso > max_date:
+                    max_date = state['max_date'] = iso
+            elif isinstance(row[date_idx], str) and ISO_DATE.fullmatch(row[date_idx]):
+                state.setdefault('unparsed_iso_dates', []).append((ordinal, row[date_idx]))
+
+        if amount_idx is not None:
+            try:
+                amount = float(row[amount_idx])
+            except (ValueError, TypeError):
+                amount = None
+            else:
+                row[amount_idx] = amount
+            if amount is not None and account_idx is not None:
+                apply_to_balance(account_balances, (row[account_idx] or '').lower(), amount,
+                                 (row[type_idx] or '').lower() if type_idx is not None else '')
+
+        yield tuple(row)
+
+
+def shift_dates(cursor: sqlite3.Cursor, max_date: Optional[str], keep: Sequence[Tuple[int, str]] = ()) -> int:
+    """
+    Moves every ISO date forward so the latest transaction (`max_date`) is today, in one UPDATE after the load.
+    `keep` lists the (id, date) of rows whose date was already ISO in the CSV: they get it back, unshifted,
+    like the row-wise loader leaves them. Returns the number of days shifted.
+    """
+    if max_date is None:
+        return 0
+    days = (datetime.now() - datetime.strptime(max_date, "%Y-%m-%d")).days
+    if days:
+        cursor.execute("UPDATE transactions SET date = date(date, ?) "
+                       "WHERE date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'", (f"{days:+d} days",))
+        cursor.executemany("UPDATE transactions SET date = ? WHERE id = ?", [(date, row_id) for row_id, date in keep])
+    return days
+
+
+def last_transaction_id(cursor: sqlite3.Cursor) -> int:
+    """The id AUTOINCREMENT handed out last, the next insert gets the one after it."""
+    return cursor.execute("SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence WHERE name = 'transactions'), 0), "
+                          "IFNULL((SELECT MAX(id) FROM transactions), 0))").fetchone()[0]
+
+
+def record_date_shift(conn: sqlite3.Connection, days: int) -> None:
+    """Remembers the demo date shift so import_statements.py can shift appended statements the same way."""
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO import_state (key, value) VALUES ('date_shift_days', ?)", (str(days),))
+
+
+def ingest_stream(conn: sqlite3.Connection, reader: Iterator[List[str]], original_headers: List[str],
+                  sanitized_headers: List[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Streams the CSV into transactions in `batch_size` row transactions with the journal and fsyncs off,
+    then shifts the dates and inserts the account balances accumulated on the way. Returns (rows, days shifted).
+    """
+    placeholders = ", ".join(["?" for _ in sanitized_headers])
+    insert_sql = f"INSERT INTO transactions ({', '.join(sanitized_headers)}) VALUES ({placeholders})"
+    account_balances = dict(STARTING_BALANCES)
+    state = {}
+    rows = parse_rows(reader, original_headers, sanitized_headers, account_balances, state)
+
+    total = 0
+    cursor = conn.cursor()
+    first_id = last_transaction_id(cursor) + 1
+    with bulk_load_pragmas(conn):
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            cursor.executemany(insert_sql, batch)
+            conn.commit()
+            total += len(batch)
+            logger.debug(f"Inserted {total} rows")
+
+        keep = [(first_id + ordinal, date) for ordinal, date in state.get('unparsed_iso_dates', ())]
+        shift_days = shift_dates(cursor, state.get('max_date'), keep)
+        insert_accounts(cursor, account_balances)
+    return total, shift_days
+
+
+def ingest_columnar(conn: sqlite3.Connection, f, original_headers: List[str], sanitized_headers: List[str],
+                    batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Reads the rest of the CSV into columns and converts each one in a single vectorized operation: dates parsed
+    and shifted as datetime64 arrays, amounts cast with to_numeric, bad values caught by masks and kept as the
+    original text, like the row-wise loader does. Returns (rows, days shifted).
+    """
+    # usecols trims long lines, short ones are padded with '' (the row loaders use None)
+    df = pd.read_csv(f, header=None, names=sanitized_headers, usecols=range(len(sanitized_headers)),
+                     dtype=str, keep_default_na=False)
+    columns = {h: df[h].to_numpy(dtype=object) for h in sanitized_headers}
+    n_rows = len(df)
+
+    shift_days = 0
+    if 'date' in columns:
+        dates = pd.to_datetime(df['date'], format="%m/%d/%Y", errors='coerce').to_numpy(dtype='datetime64[D]')
+        valid = ~np.isnat(dates)
+        if valid.any():
+            shift_days = int((np.datetime64(datetime.now().date(), 'D') - dates[valid].max()).astype(int))
+            iso = np.datetime_as_string(dates[valid] + np.timedelta64(shift_days, 'D'), unit='D')
+            columns['date'][valid] = iso
+
+    account_balances = dict(STARTING_BALANCES)
+    if 'amount' in columns:
+        amounts = pd.to_numeric(df['amount'], errors='coerce').to_numpy(dtype=float)
+        valid = ~np.isnan(amounts)
+        columns['amount'][valid] = amounts[valid]
+
+        if 'Account_Name' in original_headers:
+            accounts = df[sanitized_headers[original_headers.index('Account_Name')]].str.lower().to_numpy()
+            t_types = df[sanitized_headers[original_headers.index('Transaction_Type')]].str.lower().to_numpy() \
+                if 'Transaction_Type' in original_headers else np.full(n_rows, '', dtype=object)
+            # Same signs as apply_to_balance: checking is an asset, the cards are liabilities
+            for account in account_balances:
+                increases = 'credit' if account == 'checking' else 'debit'
+                signed = np.where(t_types == increases, amounts, -amounts)
+                account_balances[account] += float(signed[valid & (accounts == account)].sum())
+
+    placeholders = ", ".join(["?" for _ in sanitized_headers])
+    insert_sql = f"INSERT INTO transactions ({', '.join(sanitized_headers)}) VALUES ({placeholders})"
+    cursor = conn.cursor()
+    with bulk_load_pragmas(conn):
+        for start in range(0, n_rows, batch_size):
+            cursor.executemany(insert_sql, zip(*(columns[h][start:start + batch_size].tolist()
+                                                 for h in sanitized_headers)))
+            conn.commit()
+        insert_accounts(cursor, account_balances)
+    return n_rows, shift_days
+
+
+def setup_db(ingest_mode: str = 'stream', data_path: Path = None, db_path: Path = None,
+             batch_size: int = DEFAULT_BATCH_SIZE) -> None:
     """Reads the CSV and populates the SQLite database."""
-    db_path, data_path, goals_path, budgets_path = get_paths()
+    if ingest_mode not in INGEST_MODES:
+        raise ValueError(f"Unknown ingest_mode '{ingest_mode}', expected one of {INGEST_MODES}")
+    default_db_path, default_data_path, goals_path, budgets_path = get_paths()
+    db_path = db_path or default_db_path
+    data_path = data_path or default_data_path
 
     if not data_path.exists():
         logger.error(f"Data file not found at: {data_path}")
@@ -57,195 +467,40 @@ def setup_db() -> None:
         return
 
     try:
-        with open(data_path, mode='r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            
-            if not reader.fieldnames:
+        with open(data_path, mode='r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            original_headers = next(reader, None)
+
+            if not original_headers:
                 logger.error("CSV file is empty or missing headers.")
                 return
 
             # Sanitize headers for SQL column names
-            original_headers = reader.fieldnames
             sanitized_headers = [h.strip().replace(' ', '_').lower() for h in original_headers]
-            
-            # Create Table dynamically based on CSV headers
-            # We default to TEXT for simplicity in this setup script
-            # But for finance data, we want Amount to be REAL and Date to be sortable
-            column_defs = []
-            for col in sanitized_headers:
-                data_type = "REAL" if col == "amount" else "TEXT"
-                column_defs.append(f"{col} {data_type}")
-            
-            columns_def = ", ".join(column_defs)
-            create_table_sql = f"CREATE TABLE IF NOT EXISTS transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns_def})"
-            
+
             cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-
-            # Create Financial Goals Table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS financial_goals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    target_amount REAL NOT NULL,
-                    target_date TEXT NOT NULL,
-                    saved_amount REAL DEFAULT 0,
-                    status TEXT DEFAULT 'on_track',
-                    last_updated TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create Monthly Budgets Table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS monthly_budgets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category TEXT NOT NULL UNIQUE,
-                    amount_limit REAL NOT NULL
-                )
-            """)
-
-            # Create Accounts Table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS accounts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    type TEXT NOT NULL,
-                    balance REAL NOT NULL
-                )
-            """)
-
-            # Load Financial Goals from CSV
-            if goals_path.exists():
-                with open(goals_path, mode='r', encoding='utf-8-sig') as gf:
-                    goals_reader = csv.DictReader(gf)
-                    goals_rows = []
-                    for row in goals_reader:
-                        # Convert date from MM/DD/YYYY to YYYY-MM-DD
-                        t_date = row['Target_Date']
-                        try:
-                            t_date = datetime.strptime(t_date, "%m/%d/%Y").strftime("%Y-%m-%d")
-                        except ValueError:
-                            pass
-                        goals_rows.append((
-                            row['Name'], float(row['Target_Amount']), t_date, float(row['Saved_Amount']), row['Status']
-                        ))
-                    cursor.executemany("INSERT INTO financial_goals (name, target_amount, target_date, saved_amount, status) VALUES (?, ?, ?, ?, ?)", goals_rows)
-                    logger.info(f"Inserted {len(goals_rows)} goals from CSV.")
-            else:
-                logger.warning(f"Goals file not found at {goals_path}")
-
-            # Load Monthly Budgets from CSV
-            if budgets_path.exists():
-                with open(budgets_path, mode='r', encoding='utf-8-sig') as bf:
-                    budgets_reader = csv.DictReader(bf)
-                    budget_rows = []
-                    for row in budgets_reader:
-                        budget_rows.append((row['Category'], float(row['Amount_Limit'])))
-                    cursor.executemany("INSERT INTO monthly_budgets (category, amount_limit) VALUES (?, ?)", budget_rows)
-                    logger.info(f"Inserted {len(budget_rows)} budgets from CSV.")
+            create_tables(cursor, sanitized_headers)
+            load_goals_and_budgets(cursor, goals_path, budgets_path)
+
+            if ingest_mode == 'rowwise':
+                count, shift_days = ingest_rowwise(cursor, csv.DictReader(f, fieldnames=original_headers),
+                                                   original_headers, sanitized_headers)
+            elif ingest_mode == 'columnar':
+                count, shift_days = ingest_columnar(conn, f, original_headers, sanitized_headers, batch_size)
             else:
-                logger.warning(f"Budgets file not found at {budgets_path}")
-
-            # Prepare Insert Statement
-            placeholders = ", ".join(["?" for _ in sanitized_headers])
-            insert_sql = f"INSERT INTO transactions ({', '.join(sanitized_headers)}) VALUES ({placeholders})"
-
-            # Read all rows to memory to calculate date shift
-            all_rows = list(reader)
-
-            # Calculate date shift to bring data to current time
-            max_date = None
-            date_header = next((h for h, s in zip(original_headers, sanitized_headers) if s == 'date'), None)
-
-            if date_header:
-                for row in all_rows:
-                    try:
-                        dt = datetime.strptime(row[date_header], "%m/%d/%Y")
-                        if max_date is None or dt > max_date:
-                            max_date = dt
-                    except ValueError:
-                        pass
-            
-            shift_delta = datetime.now() - max_date if max_date else timedelta(0)
-
-            # Calculate Balances for Accounts Table
-            # Mock starting balances: Checking has cash, Cards start at 0 debt
-            account_balances = {
-                'checking': 5000.00,
-                'platinumcard': 0.00,
-                'silvercard': 0.00
-            }
-
-            for row in all_rows:
-                acc = row.get('Account_Name', '').lower()
-                try:
-                    amt = float(row.get('Amount', 0))
-                except ValueError:
-                    continue
-                
-                t_type = row.get('Transaction_Type', '').lower()
-
-                if acc == 'checking':
-                    # Asset: Credit adds, Debit subtracts
-                    account_balances[acc] += amt if t_type == 'credit' else -amt
-                elif acc in ['platinumcard', 'silvercard']:
-                    # Liability: Debit increases debt, Credit reduces debt
-                    account_balances[acc] += amt if t_type == 'debit' else -amt
-
-            # Insert Accounts
-            cursor.executemany("INSERT INTO accounts (name, type, balance) VALUES (?, ?, ?)", 
-                               [(k, 'depository' if k == 'checking' else 'credit', v) for k, v in account_balances.items()])
-
-            # Insert Data
-            rows_to_insert = []
-            for row in all_rows:
-                # Ensure values are ordered correctly according to headers
-                row_data = []
-                for h, sanitized_h in zip(original_headers, sanitized_headers):
-                    val = row[h]
-                    if sanitized_h == "date":
-                        try:
-                            d = datetime.strptime(val, "%m/%d/%Y")
-                            val = (d + shift_delta).strftime("%Y-%m-%d")
-                        except ValueError:
-                            pass
-                    elif sanitized_h == "amount":
-                        try:
-                            val = float(val)
-                        except ValueError:
-                            pass
-                    row_data.append(val)
-                rows_to_insert.append(row_data)
-
-            cursor.executemany(insert_sql, rows_to_insert)
+                count, shift_days = ingest_stream(conn, reader, original_headers, sanitized_headers, batch_size)
             conn.commit()
-            logger.info(f"Successfully inserted {len(rows_to_insert)} records into 'transactions' table.")
-
-            # Create a global search index on text fields for faster lookups
-            logger.info("Creating global search index...")
-            cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS global_search_index USING fts5(original_text, column_name, table_name, tokenize = 'porter')")
-
-            # Populate the search index from multiple tables
-            index_queries = {
-                "transaction_description": ("SELECT DISTINCT Description, 'transaction_description', 'transactions' FROM transactions", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
-                "transaction_category": ("SELECT DISTINCT Category, 'transaction_category', 'transactions' FROM transactions", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
-                "transaction_type": ("SELECT DISTINCT transaction_type, 'transaction_type', 'transactions' FROM transactions", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
-                "goal_name": ("SELECT DISTINCT name, 'goal_name', 'financial_goals' FROM financial_goals", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)"),
-                "account_name": ("SELECT DISTINCT name, 'account_name', 'accounts' FROM accounts", "INSERT INTO global_search_index (original_text, column_name, table_name) VALUES (?, ?, ?)")
-            }
-
-            for entity_type, (query, insert_sql) in index_queries.items():
-                try:
-                    cursor.execute(query)
-                    rows = cursor.fetchall()
-                    cursor.executemany(insert_sql, rows)
-                    logger.info(f"Indexed {len(rows)} records for entity type '{entity_type}'.")
-                except sqlite3.Error as e:
-                    logger.error(f"Failed to index '{entity_type}': {e}")
+            logger.info(f"Successfully inserted {count} records into 'transactions' table.")
+
+            build_search_index(cursor)
 
             conn.commit()
             logger.info("Global search index created and populated successfully.")
-            
+
+            # Installed after the bulk load so the version triggers don't fire once per imported row
+            SchemaManager().upgrade(conn)
+            record_date_shift(conn, shift_days)
+
     except Exception as e:
         logger.error(f"An error occurred during setup: {e}")
     finally:
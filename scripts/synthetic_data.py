@@ -0,0 +1,75 @@
+import csv
+import random
+import sqlite3
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Iterator, Tuple
+
+from setup_sqlite import create_tables, build_search_index
+from src.datamodel.schema import SchemaManager
+
+# Synthetic transactions used by the benchmark and query-plan scripts.
+# Rows mimic personal_finance.csv: lower-case merchants/categories and the three demo accounts.
+
+CSV_HEADERS = ['Date', 'Description', 'Amount', 'Transaction_Type', 'Category', 'Account_Name']
+SANITIZED_HEADERS = [h.lower() for h in CSV_HEADERS]
+
+CATEGORIES = ['groceries', 'restaurants', 'shopping', 'gas&fuel', 'utilities', 'entertainment', 'travel',
+              'mortgage&rent', 'insurance', 'health', 'creditcardpayment', 'paycheck', 'mobilephone',
+              'internet', 'coffeeshops', 'alcohol&bars', 'movies&dvds', 'haircut', 'television', 'fastfood']
+ACCOUNTS = ['checking', 'platinumcard', 'silvercard']
+MERCHANTS = [f'merchant{i:03d}' for i in range(300)] + ['amazon', 'starbucks', 'paycheck', 'mortgagepayment']
+
+
+def synthetic_rows(n_rows: int, days: int = 1095, seed: int = 42) -> Iterator[Tuple[str, str, float, str, str, str]]:
+    """
+    Yields (iso_date, description, amount, transaction_type, category, account_name) tuples
+    spread evenly over the last `days` days, oldest first.
+    """
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=days)
+    for i in range(n_rows):
+        date = (start + timedelta(days=i * days // max(n_rows, 1))).strftime('%Y-%m-%d')
+        category = rng.choice(CATEGORIES)
+        t_type = 'credit' if category == 'paycheck' or rng.random() < 0.05 else 'debit'
+        yield (date, rng.choice(MERCHANTS), round(rng.uniform(1, 500), 2), t_type, category, rng.choice(ACCOUNTS))
+
+
+def write_synthetic_csv(path: Path, n_rows: int, days: int = 1095, seed: int = 42) -> Path:
+    """
+    Writes a CSV in the same layout (and MM/DD/YYYY dates) as personal_finance.csv.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        for date, *rest in synthetic_rows(n_rows, days, seed):
+            writer.writerow([datetime.strptime(date, '%Y-%m-%d').strftime('%m/%d/%Y'), *rest])
+    return path
+
+
+def create_synthetic_db(db_path: Path, n_rows: int, days: int = 1095, seed: int = 42,
+                        upgrade_schema: bool = True) -> Path:
+    """
+    Creates a finance.db lookalike with `n_rows` synthetic transactions, the search index and,
+    unless `upgrade_schema` is False, the SchemaManager objects (change tracking, indexes).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        create_tables(cursor, SANITIZED_HEADERS)
+        placeholders = ", ".join(["?" for _ in SANITIZED_HEADERS])
+        cursor.executemany(f"INSERT INTO transactions ({', '.join(SANITIZED_HEADERS)}) VALUES ({placeholders})",
+                           synthetic_rows(n_rows, days, seed))
+        cursor.executemany("INSERT INTO accounts (name, type, balance) VALUES (?, ?, ?)",
+                           [(a, 'depository' if a == 'checking' else 'credit', 1000.0) for a in ACCOUNTS])
+        cursor.executemany("INSERT INTO monthly_budgets (category, amount_limit) VALUES (?, ?)",
+                           [(c, 500.0) for c in CATEGORIES])
+        cursor.execute("INSERT INTO financial_goals (name, target_amount, target_date, saved_amount, status) VALUES (?, ?, ?, ?, ?)",
+                       ('Down Payment', 20000.0, (datetime.now() + timedelta(days=365)).strftime('%Y-%m-%d'), 5000.0, 'on_track'))
+        build_search_index(cursor)
+        conn.commit()
+        if upgrade_schema:
+            SchemaManager().upgrade(conn)
+    finally:
+        conn.close()
+    return db_path
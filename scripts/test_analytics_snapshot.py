@@ -0,0 +1,108 @@
+import sys
+import math
+import sqlite3
+import logging
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, SQLQueryRepository
+from src.analytics_snapshot import TransactionSnapshot, pa
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TODAY = date.today()
+
+# Rows with NULL and empty text, which SQL and the snapshot must treat alike
+EDGE_ROWS = [
+    (TODAY.isoformat(), 'merchant001', 9000.0, 'debit', None, 'checking'),
+    ((TODAY - timedelta(days=1)).isoformat(), 'merchant002', 8000.0, 'debit', '', 'checking'),
+    ((TODAY - timedelta(days=2)).isoformat(), None, 7000.0, 'debit', 'shopping', 'checking'),
+    ((TODAY - timedelta(days=3)).isoformat(), 'merchant003', 6500.0, 'debit', None, 'platinumcard'),
+    ((TODAY - timedelta(days=4)).isoformat(), 'merchant004', 50.0, None, 'groceries', 'checking'),
+    (None, 'merchant005', 10.0, 'debit', 'groceries', 'checking'),
+]
+
+PANELS = {
+    'daily_income_vs_expense': FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE,
+    'expense_category_summary': FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY_FILTERED,
+    'spending_by_day_of_week': FinanceQueryName.GET_SPENDING_BY_DAY_OF_WEEK,
+    'top_expense_descriptions': FinanceQueryName.GET_TOP_EXPENSE_DESCRIPTIONS,
+}
+# Group label of the panels whose SQL orders by value only: rows with equal values may come in any order
+TIE_LABELS = {'expense_category_summary': 'category', 'top_expense_descriptions': 'description'}
+
+
+def _same(sql_row, snapshot_row) -> bool:
+    if sql_row.keys() != snapshot_row.keys():
+        return False
+    return all(math.isclose(value, snapshot_row[key], rel_tol=1e-9, abs_tol=1e-6) if isinstance(value, float)
+               else value == snapshot_row[key] for key, value in sql_row.items())
+
+
+def _sorted(rows, label):
+    value = next(key for key in rows[0] if key != label) if rows else None
+    return sorted(rows, key=lambda r: (-r[value], '' if r[label] is None else r[label]))
+
+
+def _compare(db_path: Path, snapshot: TransactionSnapshot) -> None:
+    with FinanceDB(str(db_path)) as db:
+        columns = snapshot.get(db)
+        for days in (7, 30, 365):
+            start = (TODAY - timedelta(days=days)).isoformat()
+            for panel, query in PANELS.items():
+                sql = [dict(row) for row in db.run_named_query(query, (start,))]
+                got = getattr(columns, panel)(start)
+                got = got.to_dict('records') if hasattr(got, 'to_dict') else got
+                if panel in TIE_LABELS:
+                    sql, got = _sorted(sql, TIE_LABELS[panel]), _sorted(got, TIE_LABELS[panel])
+                assert len(sql) == len(got) and all(_same(a, b) for a, b in zip(sql, got)), (panel, days, sql, got)
+
+
+def test_snapshot_matches_sql():
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=5000, days=400)
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.executemany("INSERT INTO transactions (date, description, amount, transaction_type, category, "
+                             "account_name) VALUES (?, ?, ?, ?, ?, ?)", EDGE_ROWS)
+        conn.close()
+
+        _compare(db_path, TransactionSnapshot())
+        with FinanceDB(str(db_path)) as db:
+            top = TransactionSnapshot().get(db).top_expense_descriptions((TODAY - timedelta(days=7)).isoformat())
+        assert top[0]['description'] == 'merchant002', 'an empty category is not creditcardpayment'
+        assert 'merchant001' not in [row['description'] for row in top], 'NULL != creditcardpayment is not true'
+        assert top[1]['description'] is None, 'NULL descriptions are a group of their own'
+
+        if pa is not None:
+            # The memory-mapped Arrow copy keeps the NULL labels
+            arrow_path = Path(tmp) / 'transactions.arrow'
+            _compare(db_path, TransactionSnapshot(path=str(arrow_path)))
+            mapped = TransactionSnapshot(path=str(arrow_path))
+            _compare(db_path, mapped)
+            assert mapped.stats()['mapped'] == 1 and mapped.stats()['builds'] == 0
+
+        # The SQL compares dates as text, which selects 'not a date' but not '2026-1-5': no snapshot then
+        for bad_date in ('not a date', f'{TODAY.year}-1-5'):
+            with sqlite3.connect(str(db_path)) as conn:
+                conn.execute("UPDATE transactions SET date = ? WHERE description = 'merchant005'", (bad_date,))
+            conn.close()
+            with FinanceDB(str(db_path)) as db:
+                assert TransactionSnapshot().get(db) is None, bad_date
+                if pa is not None:
+                    assert TransactionSnapshot(path=str(Path(tmp) / 'bad.arrow')).get(db) is None
+                    assert TransactionSnapshot(path=str(Path(tmp) / 'bad.arrow')).get(db) is None, 'mapped'
+    logger.info("Analytics snapshot matches SQL for every panel OK")
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_sql()
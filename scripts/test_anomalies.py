@@ -0,0 +1,116 @@
+import sys
+import logging
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.anomalies import AnomalyDetector, get_default_detector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The demo data's 30-day income-vs-expenses window (date, income, expense): 24 days with transactions
+DEMO_WINDOW = [
+    ('2026-09-17', 0.0, 109.82), ('2026-09-18', 0.0, 13.09), ('2026-09-20', 0.0, 1141.24),
+    ('2026-09-21', 0.0, 13.9), ('2026-09-22', 0.0, 3.75), ('2026-09-23', 1390.37, 1893.12),
+    ('2026-09-24', 0.0, 12.87), ('2026-09-25', 0.0, 19.3), ('2026-09-26', 0.0, 160.8),
+    ('2026-09-28', 360.56, 65.0), ('2026-09-29', 0.0, 360.56), ('2026-09-30', 2250.0, 2.75),
+    ('2026-10-01', 0.0, 46.44), ('2026-10-02', 0.0, 47.66), ('2026-10-03', 90.57, 125.57),
+    ('2026-10-04', 186.13, 60.0), ('2026-10-05', 0.0, 1681.46), ('2026-10-06', 0.0, 43.56),
+    ('2026-10-07', 9.43, 0.0), ('2026-10-09', 0.0, 131.1), ('2026-10-10', 0.0, 61.77),
+    ('2026-10-14', 2250.0, 0.0), ('2026-10-15', 0.0, 37.73), ('2026-10-17', 0.0, 76.75),
+]
+
+
+def _flagged(dates, values, flags, col):
+    return {str(dates[i]): float(values[i, col]) for i in np.flatnonzero(flags[:, col])}
+
+
+def test_short_window_skips_weekday_baseline():
+    """
+    3-4 samples per weekday are too few for a weekday median: the detector scores the window
+    with the rolling median/MAD alone, so ordinary days stay unflagged.
+    """
+    dates = np.array([d for d, _, _ in DEMO_WINDOW], dtype='datetime64[D]')
+    values = np.array([[i, e] for _, i, e in DEMO_WINDOW])
+
+    flags = AnomalyDetector(seasonal=True).detect(dates, values)
+    assert np.array_equal(flags, AnomalyDetector(seasonal=False).detect(dates, values))
+
+    expense = _flagged(dates, values, flags, 1)
+    income = _flagged(dates, values, flags, 0)
+    logger.info(f"Flagged expense days: {expense}, income days: {income}")
+    assert '2026-10-04' not in expense, 'an ordinary $60 Sunday is not an anomaly'
+    assert '2026-10-07' not in income, 'a $9.43 income is not an anomaly'
+    assert {'2026-09-23', '2026-10-05'} <= set(expense), 'the two largest expense days are'
+    assert all(value >= 360 for value in expense.values()), expense
+
+
+def test_weekday_baseline_with_history():
+    """
+    With enough weeks, regular weekend spending is not an anomaly but a spike on a weekday is,
+    even though it is part of its own weekday's history.
+    """
+    rng = np.random.default_rng(7)
+    dates = np.datetime64('2026-01-05') + np.arange(7 * 12)  # 12 weeks from a Monday
+    weekend = ((dates.astype(np.int64) + 3) % 7) >= 5
+    expense = np.where(weekend, 300.0, 40.0) + rng.normal(0, 4, len(dates))
+    spike = 7 * 8 + 2  # a Wednesday
+    expense[spike] = 400.0
+    values = expense[:, None]
+
+    flags = AnomalyDetector(seasonal=True).detect(dates, values)[:, 0]
+    assert flags[spike], 'the weekday spike is flagged'
+    assert not flags[weekend].any(), 'regular weekend spending is not'
+    assert flags.sum() == 1, np.flatnonzero(flags)
+
+    # Without the weekday baseline every weekend looks like an anomaly next to the weekdays around it
+    assert AnomalyDetector(seasonal=False).detect(dates, values)[weekend, 0].any()
+
+
+def test_leave_one_out_median():
+    group = np.array([5.0, 1.0, 9.0, 3.0, 7.0, 3.0])
+    expected = [np.median(np.delete(group, i)) for i in range(len(group))]
+    assert np.allclose(AnomalyDetector._leave_one_out_median(group), expected)
+    group = group[:5]
+    expected = [np.median(np.delete(group, i)) for i in range(len(group))]
+    assert np.allclose(AnomalyDetector._leave_one_out_median(group), expected)
+
+
+def test_threshold_from_config():
+    """
+    anomalies.z_thresh sets how many demo days are flagged: 6 of 24 at the default 3.5,
+    fewer as it is raised.
+    """
+    dates = np.array([d for d, _, _ in DEMO_WINDOW], dtype='datetime64[D]')
+    values = np.array([[i, e] for _, i, e in DEMO_WINDOW])
+
+    detector = get_default_detector()
+    assert detector.z_thresh == 3.5
+    flagged_days = detector.detect(dates, values).any(axis=1).sum()
+    assert flagged_days == 6, flagged_days
+
+    strict = get_default_detector({'anomalies': {'z_thresh': 10.0}})
+    assert strict.detect(dates, values).any(axis=1).sum() < flagged_days
+
+
+def test_missing_and_short_series():
+    dates = np.datetime64('2026-01-01') + np.arange(10)
+    values = np.array([10.0, 11, np.nan, 9, 10, 500, 10, 11, 9, 10])[:, None]
+    flags = AnomalyDetector().detect(dates, values)[:, 0]
+    assert not flags[2], 'missing values are never anomalies'
+    assert flags[5]
+    assert not AnomalyDetector().detect(dates[:2], values[:2]).any()
+    logger.info("Anomaly detector OK")
+
+
+if __name__ == "__main__":
+    test_short_window_skips_weekday_baseline()
+    test_weekday_baseline_with_history()
+    test_leave_one_out_median()
+    test_threshold_from_config()
+    test_missing_and_short_series()
@@ -0,0 +1,54 @@
+import sys
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+DEMO_DB = root_path / 'data/personal_finance/finance.db'
+
+
+def _demo_db_state():
+    return [(p.name, p.stat().st_mtime_ns, p.stat().st_size) for p in sorted(DEMO_DB.parent.glob('finance.db*'))]
+
+
+# Taken before backend_server is imported, to check the import leaves the demo database alone
+DEMO_DB_BEFORE = _demo_db_state() if DEMO_DB.parent.exists() else []
+
+import backend_server
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_import_has_no_side_effects():
+    assert (_demo_db_state() if DEMO_DB.parent.exists() else []) == DEMO_DB_BEFORE, 'finance.db untouched'
+    assert backend_server.ENGINES._engine is None, 'no query engine / LLM client built'
+    assert backend_server.INSIGHTS is None and backend_server.PRECOMPUTER is None
+    assert backend_server.app.test_client().get('/').status_code == 200
+    logger.info("Importing backend_server has no side effects OK")
+
+
+def test_upgrade_schema():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=100, days=30, upgrade_schema=False)
+        saved = backend_server.DB_PATH
+        backend_server.DB_PATH = db_path
+        try:
+            backend_server.upgrade_schema()
+        finally:
+            backend_server.DB_PATH = saved
+        with sqlite3.connect(str(db_path)) as conn:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            assert {'daily_rollups', 'table_versions', 'transaction_hashes'} <= tables, tables
+        conn.close()
+    logger.info("backend_server.upgrade_schema OK")
+
+
+if __name__ == "__main__":
+    test_import_has_no_side_effects()
+    test_upgrade_schema()
@@ -0,0 +1,76 @@
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.chart_insights import ChartInsightService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHART = ('Expense by category', 'SELECT category, SUM(total) AS value FROM daily_rollups WHERE date >= ?',
+         ('2026-09-17',), [{'category': 'groceries', 'value': 412.5}])
+
+
+class SlowEngine:
+    """Stands in for the query engine: a slow LLM call that records how many run at once."""
+
+    def __init__(self, seconds: float = 0.2):
+        self.seconds = seconds
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def generate_chart_insight(self, chart_title, sql_query, query_params, query_output):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return f'insight on {chart_title}'
+
+
+def test_identical_requests_share_one_call():
+    engine = SlowEngine()
+    service = ChartInsightService(max_concurrency=4)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        insights = list(pool.map(lambda _: service.get(engine, *CHART), range(8)))
+    assert engine.calls == 1, engine.calls
+    assert set(insights) == {'insight on Expense by category'}
+
+    # A caller that missed the cache just before the flight stored the insight finds it in the flight
+    service.cache.get = lambda key: None
+    assert service.get(engine, *CHART) == insights[0]
+    assert engine.calls == 1, engine.calls
+    logger.info("Identical insight requests share one LLM call OK")
+
+
+def test_semaphore_bounds_concurrency():
+    engine = SlowEngine(seconds=0.1)
+    service = ChartInsightService(max_concurrency=2)
+    charts = [(f'chart {i}', *CHART[1:]) for i in range(6)]
+    results = dict(service.get_many(engine, charts))
+    assert sorted(results) == list(range(6))
+    assert [results[i].result() for i in range(6)] == [f'insight on chart {i}' for i in range(6)]
+    assert engine.calls == 6 and engine.max_running == 2, (engine.calls, engine.max_running)
+
+    # Single requests from other threads share the same limit
+    engine = SlowEngine(seconds=0.1)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda chart: service.get(engine, *chart), [(f'other {i}', *CHART[1:]) for i in range(6)]))
+    assert engine.max_running <= 2, engine.max_running
+    logger.info("Insight LLM calls bounded by max_concurrency OK")
+
+
+if __name__ == "__main__":
+    test_identical_requests_share_one_call()
+    test_semaphore_bounds_concurrency()
@@ -0,0 +1,69 @@
+import sys
+import json
+import asyncio
+import logging
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import backend_server
+from src.engine_registry import EngineRegistry
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.question_cache import QuestionCache
+from fake_chat_model import FakeFinanceChatModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUESTION = 'How much did I spend on groceries last month?'
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines())
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_chat_stream():
+    """
+    /api/message/stream with a local fake streaming chat model: stage events in order,
+    the tokens add up to the answer ask() gives, and a repeated question reuses its SQL.
+    """
+    question_cache = QuestionCache()
+    backend_server.ENGINES = EngineRegistry(
+        engine_factory=lambda: SQLFinanceQuery(llm=FakeFinanceChatModel(), question_cache=question_cache),
+        hot_reload=False
+    )
+    client = backend_server.app.test_client()
+
+    response = client.post('/api/message/stream', json={'prompt': QUESTION})
+    assert response.status_code == 200, response.status_code
+    assert response.mimetype == 'text/event-stream', response.mimetype
+    events = _parse_sse(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    logger.info(f"Events: {names}")
+    assert names[:3] == ['entities', 'sql', 'rows'], names
+    assert names[-1] == 'done' and names.count('token') > 1, names
+    assert 'groceries' in events[0][1]['names'], events[0]
+    assert not events[1][1]['cached']
+
+    answer = events[-1][1]['answer']
+    assert ''.join(data['text'] for name, data in events if name == 'token') == answer
+    engine = backend_server.ENGINES.get_engine()
+    assert answer == engine.ask(QUESTION)
+    assert answer == asyncio.run(engine.aask(QUESTION))
+
+    # Second time round the SQL comes from the question cache, no entities step
+    events = _parse_sse(client.get('/api/message/stream', query_string={'prompt': QUESTION}).get_data(as_text=True))
+    assert events[0][0] == 'sql' and events[0][1]['cached'], events[0]
+
+    assert client.post('/api/message/stream', json={'prompt': ''}).status_code == 400
+    logger.info("Chat stream OK")
+
+
+if __name__ == "__main__":
+    test_chat_stream()
@@ -0,0 +1,180 @@
+import sys
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.datamodel.finance_db import ConnectionPool, FinanceDB
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _pool(tmp: str, **options) -> ConnectionPool:
+    db_path = Path(tmp) / 'pool.db'
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS t (x INTEGER)')
+    conn.close()
+    return ConnectionPool(str(db_path), **options)
+
+
+def test_reuse_and_health_check():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, size=2)
+        conn = pool.acquire()
+        pool.release(conn)
+        assert pool.acquire() is conn, 'an idle healthy connection is reused'
+        pool.release(conn)
+
+        # Broken while idle: the health check drops it and a new one is opened in its place
+        conn.close()
+        fresh = pool.acquire()
+        assert fresh is not conn
+        assert fresh.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+        pool.release(fresh)
+        assert pool._opened == 1, pool._opened
+        pool.close()
+    logger.info("Connection pool health check OK")
+
+
+def test_recycling():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, size=1, max_uses=2, max_lifetime=0)
+        conn = pool.acquire()
+        pool.release(conn)
+        assert pool.acquire() is conn
+        pool.release(conn)
+        recycled = pool.acquire()
+        assert recycled is not conn, 'recycled after max_uses borrows'
+        pool.release(recycled)
+        pool.close()
+
+        pool = _pool(tmp, size=1, max_uses=0, max_lifetime=0.05)
+        conn = pool.acquire()
+        pool.release(conn)
+        time.sleep(0.1)
+        recycled = pool.acquire()
+        assert recycled is not conn, 'recycled after max_lifetime seconds'
+        assert pool._opened == 1, pool._opened
+        pool.release(recycled)
+        pool.close()
+    logger.info("Connection pool recycling OK")
+
+
+def test_checkout_timeout():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, size=1, timeout=0.1)
+        conn = pool.acquire()
+        start = time.perf_counter()
+        try:
+            pool.acquire()
+            raise AssertionError('acquire() on an exhausted pool must time out')
+        except TimeoutError:
+            pass
+        assert time.perf_counter() - start >= 0.1
+
+        # A connection released while another thread waits is handed over to it
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire()))
+        pool.timeout = 5.0
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(conn)
+        waiter.join()
+        assert borrowed == [conn]
+        pool.release(conn)
+
+        pool.close()
+        try:
+            pool.acquire()
+            raise AssertionError('a closed pool lends no connections')
+        except RuntimeError:
+            pass
+    logger.info("Connection pool checkout timeout OK")
+
+
+def test_return_after_error():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, size=1)
+        conn = pool.acquire()
+        try:
+            conn.execute('INSERT INTO t (x) VALUES (1)')
+            conn.execute('INSERT INTO missing_table (x) VALUES (2)')
+        except sqlite3.OperationalError:
+            pass
+        assert conn.in_transaction
+        pool.release(conn)
+
+        # The half-done transaction is rolled back before the connection is lent again
+        conn = pool.acquire()
+        assert not conn.in_transaction
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+        conn.execute('INSERT INTO t (x) VALUES (3)')
+        conn.commit()
+        pool.release(conn)
+
+        # A connection the pool did not lend is closed, not pooled
+        stranger = sqlite3.connect(str(Path(tmp) / 'pool.db'))
+        pool.release(stranger)
+        try:
+            stranger.execute('SELECT 1')
+            raise AssertionError('a foreign connection is closed on release')
+        except sqlite3.ProgrammingError:
+            pass
+        assert pool.acquire() is conn
+        pool.release(conn)
+        pool.close()
+    logger.info("Connection pool return after error OK")
+
+
+def test_discard_wakes_waiter():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, size=1, timeout=5.0)
+        conn = pool.acquire()
+        borrowed = []
+        waiter = threading.Thread(target=lambda: borrowed.append(pool.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+
+        # Closed while borrowed with a transaction open: the rollback fails and the connection is dropped
+        conn.execute('INSERT INTO t (x) VALUES (1)')
+        conn.close()
+        start = time.perf_counter()
+        pool.release(conn)
+        waiter.join()
+        assert time.perf_counter() - start < 1.0, 'the waiter opens a connection in the freed slot'
+        assert borrowed and borrowed[0] is not conn and pool._opened == 1
+        pool.release(borrowed[0])
+        pool.close()
+    logger.info("Connection pool discard wakes a waiter OK")
+
+
+def test_finance_db_raises_timeout():
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, size=1, timeout=0.05)
+        conn = pool.acquire()
+        try:
+            with FinanceDB(pool.db_path, pool=pool):
+                raise AssertionError('FinanceDB must not be entered without a connection')
+        except TimeoutError:
+            pass
+        pool.release(conn)
+        with FinanceDB(pool.db_path, pool=pool) as db:
+            assert db.run_query('SELECT COUNT(*) AS n FROM t') == [{'n': 0}]
+        pool.close()
+    logger.info("FinanceDB raises the pool timeout OK")
+
+
+if __name__ == "__main__":
+    test_reuse_and_health_check()
+    test_recycling()
+    test_checkout_timeout()
+    test_return_after_error()
+    test_discard_wakes_waiter()
+    test_finance_db_raises_timeout()
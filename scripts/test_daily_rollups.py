@@ -0,0 +1,133 @@
+import sys
+import math
+import sqlite3
+import logging
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, SQLQueryRepository
+from src.datamodel.schema import SchemaManager
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TODAY = date.today()
+START = (TODAY - timedelta(days=90)).isoformat()
+MONTH = (TODAY.replace(day=1).isoformat(), (TODAY.replace(day=1) + timedelta(days=32)).replace(day=1).isoformat())
+
+# The named queries routed to daily_rollups, next to the transactions SQL they replaced
+RAW_QUERIES = {
+    FinanceQueryName.GET_MONTHLY_INCOME_VS_EXPENSE: ("SELECT strftime('%Y-%m', date) as period, SUM(CASE WHEN transaction_type = 'credit' THEN amount ELSE 0 END) as income, SUM(CASE WHEN transaction_type = 'debit' THEN amount ELSE 0 END) as expense FROM transactions GROUP BY period ORDER BY period ASC LIMIT 12", ()),
+    FinanceQueryName.GET_WEEKLY_INCOME_VS_EXPENSE: ("SELECT strftime('%Y-%W', date) as period, SUM(CASE WHEN transaction_type = 'credit' THEN amount ELSE 0 END) as income, SUM(CASE WHEN transaction_type = 'debit' THEN amount ELSE 0 END) as expense FROM transactions GROUP BY period ORDER BY period ASC LIMIT 12", ()),
+    FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE: ("SELECT date, SUM(CASE WHEN transaction_type = 'credit' THEN amount ELSE 0 END) as income, SUM(CASE WHEN transaction_type = 'debit' THEN amount ELSE 0 END) as expense FROM transactions WHERE date >= ? GROUP BY date ORDER BY date ASC", (START,)),
+    FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY: ("SELECT category, SUM(amount) as value FROM transactions WHERE transaction_type = 'debit' GROUP BY category ORDER BY value DESC", ()),
+    FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY_FILTERED: ("SELECT category, SUM(amount) as value FROM transactions WHERE transaction_type = 'debit' AND date >= ? GROUP BY category ORDER BY value DESC", (START,)),
+    FinanceQueryName.GET_SPENDING_BY_DAY_OF_WEEK: ("SELECT strftime('%w', date) as day_index, SUM(amount) as total FROM transactions WHERE transaction_type = 'debit' AND date >= ? GROUP BY day_index ORDER BY day_index", (START,)),
+    FinanceQueryName.GET_CHECKING_DAILY_CHANGE: ("SELECT date, SUM(CASE WHEN transaction_type = 'credit' THEN amount ELSE -amount END) as net_change FROM transactions WHERE account_name = 'Checking' GROUP BY date ORDER BY date ASC", ()),
+    FinanceQueryName.GET_ACCOUNT_ACTIVITY_BY_MONTH: ("SELECT account_name, SUM(CASE WHEN transaction_type = 'credit' THEN amount ELSE 0 END) as credits, SUM(CASE WHEN transaction_type = 'debit' THEN amount ELSE 0 END) as debits FROM transactions WHERE date >= ? AND date < ? GROUP BY account_name", MONTH),
+    FinanceQueryName.GET_MONTHLY_SPENDING_BY_CATEGORY: ("SELECT category, SUM(amount) as total FROM transactions WHERE transaction_type = 'debit' AND date >= ? AND date < ? GROUP BY category", MONTH),
+}
+
+# daily_rollups keys NULL dimensions as '': a NULL category comes back as '' instead of null,
+# in one group with the '' categories
+LABELS = ('category', 'account_name', 'date')
+
+
+def _normalized(rows):
+    merged = {}
+    for row in map(dict, rows):
+        label, *values = row.items()
+        key = '' if label[0] in LABELS and label[1] is None else label[1]
+        if key in merged:
+            merged[key].update({k: merged[key][k] + v for k, v in values})
+        else:
+            merged[key] = {label[0]: key, **dict(values)}
+    # Groups with equal totals may come in any order
+    return sorted(merged.values(), key=lambda r: [str(v) for v in r.values()])
+
+
+def _same(a, b) -> bool:
+    return a.keys() == b.keys() and all(
+        math.isclose(v, b[k], rel_tol=1e-9, abs_tol=1e-6) if isinstance(v, float) and isinstance(b[k], float)
+        else v == b[k] for k, v in a.items())
+
+
+def _assert_parity(conn: sqlite3.Connection, step: str) -> None:
+    with FinanceDB(':memory:') as db:
+        db.conn.close()
+        db.conn = conn
+        for name, (raw_sql, params) in RAW_QUERIES.items():
+            rollup = _normalized(db.run_named_query(name, params))
+            raw = _normalized(db.run_query(raw_sql, params))
+            assert len(rollup) == len(raw) and all(_same(a, b) for a, b in zip(raw, rollup)), (step, name, raw, rollup)
+        db.conn = None
+
+
+def _rollups(conn: sqlite3.Connection):
+    return [(*row[:4], round(row[4], 6), row[5]) for row in conn.execute(
+        "SELECT date, category, account_name, transaction_type, total, txn_count FROM daily_rollups ORDER BY 1, 2, 3, 4")]
+
+
+def test_rollups_follow_writes():
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=3000, days=400)
+        conn = sqlite3.connect(str(db_path))
+        conn.row_factory = sqlite3.Row
+        _assert_parity(conn, 'backfill')
+
+        today, yesterday = TODAY.isoformat(), (TODAY - timedelta(days=1)).isoformat()
+        with conn:
+            conn.executemany("INSERT INTO transactions (date, description, amount, transaction_type, category, "
+                             "account_name) VALUES (?, ?, ?, ?, ?, ?)", [
+                                 (today, 'new merchant', 42.5, 'debit', 'brandnewcategory', 'checking'),
+                                 (today, 'paycheck', 1800.0, 'credit', 'paycheck', 'Checking'),
+                                 (today, 'no category', 12.0, 'debit', None, 'silvercard'),
+                                 (today, 'empty category', 3.0, 'debit', '', 'silvercard'),
+                                 (yesterday, 'pending hold', 'n/a', 'debit', 'shopping', 'checking'),
+                             ])
+        _assert_parity(conn, 'insert')
+
+        with conn:
+            conn.execute("UPDATE transactions SET amount = amount * 2 WHERE id % 7 = 0")
+        _assert_parity(conn, 'update amount')
+
+        with conn:
+            # Moves between groups: the old group loses the row, emptied groups disappear
+            conn.execute("UPDATE transactions SET category = 'groceries' WHERE category = 'brandnewcategory'")
+            conn.execute("UPDATE transactions SET category = 'travel' WHERE id % 11 = 0")
+            conn.execute("UPDATE transactions SET category = NULL WHERE id % 13 = 0")
+        _assert_parity(conn, 'move category')
+        assert not conn.execute("SELECT 1 FROM daily_rollups WHERE category = 'brandnewcategory'").fetchone()
+
+        with conn:
+            conn.execute("UPDATE transactions SET date = ? WHERE id % 5 = 0", (yesterday,))
+            conn.execute("UPDATE transactions SET date = date(date, '-40 days') WHERE id % 17 = 0")
+            conn.execute("UPDATE transactions SET transaction_type = 'credit', account_name = 'Checking' "
+                         "WHERE id % 19 = 0")
+        _assert_parity(conn, 'move date, type and account')
+
+        with conn:
+            conn.execute("DELETE FROM transactions WHERE id % 3 = 0")
+            conn.execute("DELETE FROM transactions WHERE description = 'no category'")
+        _assert_parity(conn, 'delete')
+        assert conn.execute("SELECT COUNT(*) FROM daily_rollups WHERE txn_count <= 0").fetchone()[0] == 0
+
+        # The trigger-maintained table is the one a rebuild from scratch produces
+        maintained = _rollups(conn)
+        SchemaManager().rebuild_rollups(conn)
+        assert _rollups(conn) == maintained
+        conn.close()
+    logger.info("daily_rollups queries match the transactions SQL after writes OK")
+
+
+if __name__ == "__main__":
+    test_rollups_follow_writes()
@@ -0,0 +1,88 @@
+import sys
+import math
+import logging
+import tempfile
+from datetime import date
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import backend_server
+from src.dashboard import DashboardBuilder
+from src.datamodel.finance_db import ConnectionPool, TableVersionCache
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# /api/dashboard key -> the single-panel endpoint it stands in for
+PANEL_ENDPOINTS = {
+    'income_vs_expenses': '/api/analytics/income-vs-expenses?period={period}',
+    'accounts': '/api/accounts',
+    'expense_summary': '/api/analytics/expense-summary?period={period}',
+    'budgets': '/api/budgets?month={month}',
+    'goals': '/api/goals',
+    'goal_forecast': '/api/analytics/goal-forecast?goal_id={goal_id}',
+}
+
+
+class _SyntheticDashboard:
+    """Points backend_server, /api/dashboard included, at a synthetic finance.db for the duration of a with block."""
+
+    def __init__(self, tmp: str):
+        self.db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=4000, days=200)
+
+    def __enter__(self):
+        self.saved = (backend_server.DB_PATH, backend_server.DB_POOL, backend_server.TRANSACTION_COUNT_CACHE,
+                      backend_server.DASHBOARD)
+        backend_server.DB_PATH = self.db_path
+        backend_server.DB_POOL = ConnectionPool(str(self.db_path), size=2)
+        backend_server.TRANSACTION_COUNT_CACHE = TableVersionCache('transactions', backend_server._count_transactions)
+        backend_server.DASHBOARD = DashboardBuilder(ConnectionPool(str(self.db_path), size=4, readonly=True))
+        return backend_server.app.test_client()
+
+    def __exit__(self, *exc):
+        backend_server.DB_POOL.close()
+        backend_server.DASHBOARD.pool.close()
+        backend_server.DASHBOARD.shutdown()
+        (backend_server.DB_PATH, backend_server.DB_POOL, backend_server.TRANSACTION_COUNT_CACHE,
+         backend_server.DASHBOARD) = self.saved
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) and math.isclose(a, b, rel_tol=1e-9,
+                                                                                              abs_tol=1e-6)
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def test_dashboard_matches_panel_endpoints():
+    with tempfile.TemporaryDirectory() as tmp, _SyntheticDashboard(tmp) as client:
+        for period, month, goal_id in (('month', '', ''), ('week', date.today().strftime('%Y-%m'), '1')):
+            response = client.get(f'/api/dashboard?period={period}&month={month}&goal_id={goal_id}')
+            assert response.status_code == 200, response.get_json()
+            dashboard = response.get_json()
+            assert set(dashboard) == {*PANEL_ENDPOINTS, 'timings_ms', 'total_ms'}
+            assert set(dashboard['timings_ms']) == {*PANEL_ENDPOINTS, 'shared_daily_scan'}
+
+            for panel, endpoint in PANEL_ENDPOINTS.items():
+                single = client.get(endpoint.format(period=period, month=month, goal_id=goal_id))
+                assert single.status_code == 200, (panel, single.get_json())
+                assert _same(single.get_json(), dashboard[panel]), (period, panel)
+            assert any(row.get('isForecast') for row in dashboard['income_vs_expenses']['data'])
+            assert dashboard['goal_forecast']['goal']['id'] == '1'
+
+        # No goal: the single endpoint answers 404, the dashboard a null panel
+        assert client.get('/api/analytics/goal-forecast?goal_id=999').status_code == 404
+        assert client.get('/api/dashboard?goal_id=999').get_json()['goal_forecast'] is None
+    logger.info("Dashboard panels match the single-panel endpoints OK")
+
+
+if __name__ == "__main__":
+    test_dashboard_matches_panel_endpoints()
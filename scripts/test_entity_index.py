@@ -0,0 +1,87 @@
+import sys
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.datamodel.finance_db import FinanceDB, ConnectionPool
+from src.datamodel.entity_index import FuzzyEntityIndex
+from src.datamodel.entity_resolver import EntityResolver
+from test_entity_resolver import _fixture_db, _load_queries
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = 'transaction_description'
+
+
+def _execute(pool: ConnectionPool, sql: str, params=()) -> None:
+    conn = pool.acquire()
+    conn.execute(sql, params)
+    conn.commit()
+    pool.release(conn)
+
+
+def test_lookup():
+    index = FuzzyEntityIndex(min_similarity=0.45)
+    for text in ('whole foods market', 'whole foods', 'starbucks', 'Starbucks Reserve', 'groceries'):
+        index.add(text, DESCRIPTION, 'transactions')
+    index.add('groceries', 'transaction_category', 'transactions')
+    index.add('', DESCRIPTION, 'transactions')
+    index.add('starbucks', DESCRIPTION, 'transactions')
+    assert len(index) == 6, 'empty and repeated values are not indexed'
+
+    # Exact (any case), the first value added wins among columns
+    assert index.lookup(' STARBUCKS ') == ('starbucks', DESCRIPTION, 'transactions')
+    assert index.lookup('groceries') == ('groceries', DESCRIPTION, 'transactions')
+    # Word prefixes, the shortest value first
+    assert index.lookup('whole foo') == ('whole foods', DESCRIPTION, 'transactions')
+    assert index.lookup('foods market') == ('whole foods market', DESCRIPTION, 'transactions')
+    assert index.lookup('reserve') == ('Starbucks Reserve', DESCRIPTION, 'transactions')
+    # Trigrams: typos, but nothing below min_similarity
+    assert index.lookup('starbukcs') == ('starbucks', DESCRIPTION, 'transactions')
+    assert index.lookup('grocerys') == ('groceries', DESCRIPTION, 'transactions')
+    assert index.lookup('netflix') is None and index.lookup('  ') is None
+
+    assert [m[0] for m in index.prefix('Star')] == ['starbucks', 'Starbucks Reserve']
+    assert [m[0] for m in index.prefix('whole', limit=1)] == ['whole foods']
+    assert index.prefix('zz') == []
+    logger.info("Entity index lookup OK")
+
+
+def test_refresh_follows_changes():
+    _load_queries()
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ConnectionPool(str(_fixture_db(tmp)), size=1)
+        index = FuzzyEntityIndex()
+        with FinanceDB(pool.db_path, pool=pool) as db:
+            assert index.refresh(db) == len(index) > 0
+            assert index.refresh(db) == 0, 'nothing changed, nothing rebuilt'
+
+        _execute(pool, "UPDATE transactions SET description = 'peets coffee' WHERE description = 'starbucks'")
+        _execute(pool, "DELETE FROM transactions WHERE description = 'amazon.com'")
+        _execute(pool, "UPDATE accounts SET name = 'joint checking' WHERE name = 'checking'")
+        with FinanceDB(pool.db_path, pool=pool) as db:
+            assert index.refresh(db) > 0
+        assert index.lookup('peets coffee') == ('peets coffee', DESCRIPTION, 'transactions')
+        assert index.lookup('starbucks') is None, 'renamed away'
+        assert index.lookup('amazon.com') is None, 'deleted'
+        assert index.lookup('joint checking') == ('joint checking', 'account_name', 'accounts')
+
+        # Through the resolver: its cache and the index follow the transactions version
+        resolver = EntityResolver(pool, index=index)
+        assert resolver.resolve(['whole foods'])['whole foods'][0] == 'whole foods market'
+        _execute(pool, "UPDATE transactions SET description = 'wholesome bakery' WHERE description = 'whole foods market'")
+        matches = resolver.resolve(['whole foods', 'wholesome bakery'])
+        assert matches['whole foods'] is None, matches
+        assert matches['wholesome bakery'] == ('wholesome bakery', DESCRIPTION, 'transactions')
+        pool.close()
+    logger.info("Entity index refresh follows renames and deletes OK")
+
+
+if __name__ == "__main__":
+    test_lookup()
+    test_refresh_follows_changes()
@@ -0,0 +1,119 @@
+import sys
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import SQLQueryRepository, ConnectionPool
+from src.datamodel.entity_index import FuzzyEntityIndex
+from src.datamodel.entity_resolver import EntityResolver
+from src.datamodel.schema import SchemaManager
+from setup_sqlite import create_tables, build_search_index
+from synthetic_data import SANITIZED_HEADERS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRANSACTIONS = [
+    ('2026-10-01', 'whole foods market', 82.10, 'debit', 'groceries', 'checking'),
+    ('2026-10-02', 'starbucks', 4.75, 'debit', 'coffeeshops', 'platinumcard'),
+    ('2026-10-03', 'at&t wireless', 65.00, 'debit', 'mobilephone', 'checking'),
+    ('2026-10-04', 'amazon.com', 23.99, 'debit', 'shopping', 'silvercard'),
+]
+
+# Exact values differ only in case; aliases name a value by some of its words, even cut short or with punctuation
+EXACT = {'Starbucks': ('starbucks', 'transaction_description', 'transactions'),
+         'GROCERIES': ('groceries', 'transaction_category', 'transactions')}
+ALIASES = {'whole foods': ('whole foods market', 'transaction_description', 'transactions'),
+           'AT&T': ('at&t wireless', 'transaction_description', 'transactions'),
+           'amazon': ('amazon.com', 'transaction_description', 'transactions')}
+MISSES = ['netflix', 'mortgage']
+
+
+def _fixture_db(tmp: str) -> Path:
+    db_path = Path(tmp) / 'finance.db'
+    conn = sqlite3.connect(str(db_path))
+    try:
+        cursor = conn.cursor()
+        create_tables(cursor, SANITIZED_HEADERS)
+        cursor.executemany(f"INSERT INTO transactions ({', '.join(SANITIZED_HEADERS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                           TRANSACTIONS)
+        cursor.execute("INSERT INTO accounts (name, type, balance) VALUES ('checking', 'depository', 100.0)")
+        build_search_index(cursor)
+        conn.commit()
+        SchemaManager().upgrade(conn)
+    finally:
+        conn.close()
+    return db_path
+
+
+def _load_queries():
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+
+
+def _check_resolver(resolver: EntityResolver, label: str):
+    terms = [*EXACT, *ALIASES, *MISSES]
+    matches = resolver.resolve(terms)
+    assert list(matches) == terms, 'one result per term, in order'
+    for term, expected in {**EXACT, **ALIASES}.items():
+        assert matches[term] == expected, (label, term, matches[term])
+    for term in MISSES:
+        assert matches[term] is None, (label, term, matches[term])
+    assert resolver.describe(matches).count('maps to database values') == len(EXACT) + len(ALIASES)
+    assert resolver.resolve(['', '  ']) == {}
+
+
+def test_fts_resolver():
+    _load_queries()
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ConnectionPool(str(_fixture_db(tmp)), size=1)
+        resolver = EntityResolver(pool)
+        _check_resolver(resolver, 'fts')
+
+        # Misses are cached too, until the transactions change
+        assert 'netflix' in resolver._cache and resolver._cache['netflix'] is None
+        conn = pool.acquire()
+        conn.execute("INSERT INTO transactions (date, description, amount, transaction_type, category, account_name) "
+                     "VALUES ('2026-10-05', 'netflix', 15.49, 'debit', 'television', 'silvercard')")
+        conn.execute("INSERT INTO global_search_index (original_text, column_name, table_name) "
+                     "VALUES ('netflix', 'transaction_description', 'transactions')")
+        conn.commit()
+        pool.release(conn)
+        assert resolver.resolve(['netflix'])['netflix'] == ('netflix', 'transaction_description', 'transactions')
+        pool.close()
+    logger.info("FTS entity resolver OK")
+
+
+def test_memory_resolver():
+    _load_queries()
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = ConnectionPool(str(_fixture_db(tmp)), size=1)
+        resolver = EntityResolver(pool, index=FuzzyEntityIndex())
+        _check_resolver(resolver, 'memory')
+
+        # Fuzzy: typos and plurals still resolve through trigram similarity
+        matches = resolver.resolve(['starbuck', 'grocery', 'wholefoods'])
+        assert matches['starbuck'] == ('starbucks', 'transaction_description', 'transactions'), matches
+        assert matches['grocery'] == ('groceries', 'transaction_category', 'transactions'), matches
+        assert matches['wholefoods'] == ('whole foods market', 'transaction_description', 'transactions'), matches
+        assert resolver.resolve(['zzqx'])['zzqx'] is None
+        pool.close()
+    logger.info("Memory entity resolver OK")
+
+
+def test_fts_query():
+    assert EntityResolver.fts_query('AT&T') == '"at" "t"'
+    assert EntityResolver.fts_query('amazon.com') == '"amazon" "com"'
+    assert EntityResolver.fts_query('&&') == ''
+
+
+if __name__ == "__main__":
+    test_fts_resolver()
+    test_memory_resolver()
+    test_fts_query()
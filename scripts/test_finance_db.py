@@ -7,7 +7,7 @@ from datetime import datetime
 root_path = Path(__file__).resolve().parent.parent
 sys.path.append(str(root_path))
 
-from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName
+from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName, month_range
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -76,7 +76,7 @@ def test_queries():
         current_month = datetime.now().strftime('%Y-%m')
         
         query = repo.get_query(FinanceQueryName.GET_MONTHLY_SPENDING_BY_CATEGORY)
-        params = [current_month]
+        params = month_range(current_month)
         results = db.run_query(query, params)
         
         if not results:
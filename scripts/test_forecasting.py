@@ -0,0 +1,132 @@
+import sys
+import logging
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.forecasting import (ForecasterFactory, SeasonalTrendForecaster, ProphetForecaster, ParallelForecaster,
+                             naive_forecast, shutdown_process_pool)
+from src.insights_engine import ForecastCache, enrich_with_forecast_and_anomalies
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WEEKLY_PATTERN = np.array([10.0, 12.0, 8.0, 15.0, 30.0, 45.0, 20.0])
+
+
+def _daily(days: int = 70, start: str = '2026-01-05'):
+    ds = pd.Series(pd.date_range(start, periods=days, freq='D'))
+    t = np.arange(days, dtype=float)
+    trend = 100.0 + 2.5 * t
+    seasonal = trend + np.resize(WEEKLY_PATTERN - WEEKLY_PATTERN.mean(), days)
+    return ds, np.column_stack([trend, seasonal])
+
+
+class CountingForecaster(SeasonalTrendForecaster):
+    def __init__(self):
+        super().__init__()
+        self.fitted_series = 0
+
+    def fit_predict(self, ds, values, horizon, freq, warm_start=None):
+        self.fitted_series += np.asarray(values).reshape(len(ds), -1).shape[1]
+        return super().fit_predict(ds, values, horizon, freq, warm_start)
+
+
+def test_numpy_forecast_shape_and_dates():
+    ds, values = _daily()
+    future, yhat = SeasonalTrendForecaster().forecast(ds, values, 14, 'D')
+    assert yhat.shape == (14, 2)
+    assert list(future) == list(pd.date_range(ds.iloc[-1] + pd.Timedelta(days=1), periods=14, freq='D'))
+
+    # A straight line goes on straight, the weekly pattern repeats on top of the trend (whose fit the
+    # pattern tilts a little, so the offset is the same within a week, not zero)
+    t_future = np.arange(len(ds), len(ds) + 14, dtype=float)
+    assert np.allclose(yhat[:, 0], 100.0 + 2.5 * t_future)
+    offset = yhat[:, 1] - (100.0 + 2.5 * t_future + np.resize(WEEKLY_PATTERN - WEEKLY_PATTERN.mean(), 14))
+    assert np.ptp(offset[:7]) < 1e-9 and np.ptp(offset[7:]) < 1e-9 and np.abs(offset).max() < 2.5, offset
+
+    # Weekly points, gaps in the dates and an empty history
+    weeks = pd.Series(pd.date_range('2026-01-04', periods=20, freq='W'))
+    future, yhat = SeasonalTrendForecaster().forecast(weeks, np.arange(20.0), 4, 'W')
+    assert len(future) == 4 and (future > weeks.iloc[-1]).all() and np.allclose(yhat[:, 0], [20, 21, 22, 23])
+    gappy = ds.drop(index=range(10, 30)).reset_index(drop=True)
+    future, yhat = SeasonalTrendForecaster().forecast(gappy, 100.0 + 2.5 * (gappy - ds[0]).dt.days, 3, 'D')
+    assert np.allclose(yhat[:, 0], 100.0 + 2.5 * np.arange(70, 73))
+    future, yhat = SeasonalTrendForecaster().forecast(ds[:0], np.zeros((0, 2)), 7, 'D')
+    assert len(future) == 0 and yhat.shape == (0, 2)
+
+    future, naive = naive_forecast(ds, values[:, 1], 9, 'D')
+    assert len(future) == 9 and np.array_equal(naive, np.resize(values[-7:, 1], 9))
+    logger.info("NumPy forecast shape and dates OK")
+
+
+def test_prophet_fallback():
+    factory = ForecasterFactory()
+    saved = sys.modules.get('prophet')
+    sys.modules['prophet'] = None  # what importlib sees when prophet is not installed
+    try:
+        assert isinstance(factory.get_forecaster('prophet'), SeasonalTrendForecaster)
+        configured = factory.get_configured_forecaster({'forecasting': {'backend': 'prophet'}})
+        assert isinstance(configured, SeasonalTrendForecaster)
+    finally:
+        if saved is None:
+            del sys.modules['prophet']
+        else:
+            sys.modules['prophet'] = saved
+
+    if importlib.util.find_spec('prophet') is not None:
+        assert isinstance(factory.get_forecaster('prophet'), ProphetForecaster)
+        ds, values = _daily()
+        future, yhat, states = ProphetForecaster().fit_predict(ds, values[:, :1], 7, 'D')
+        assert yhat.shape == (7, 1) and list(future) == list(SeasonalTrendForecaster.future_dates(ds, 7, 'D'))
+        assert set(states[0]) == {'k', 'm', 'sigma_obs', 'delta', 'beta'}
+    logger.info("Prophet backend falls back to numpy when not installed OK")
+
+
+def test_parallel_matches_serial():
+    ds, values = _daily()
+    serial = SeasonalTrendForecaster()
+    parallel = ParallelForecaster('numpy', max_workers=2, fit_timeout=60.0)
+    try:
+        assert parallel.name == serial.name, 'one cache entry for both'
+        future, yhat = serial.forecast(ds, values, 10, 'D')
+        p_future, p_yhat, states = parallel.fit_predict(ds, values, 10, 'D')
+        assert list(p_future) == list(future) and np.allclose(p_yhat, yhat) and states == [None, None]
+
+        series = {'income': (ds, values[:, 0]), 'expense': (ds[5:], values[5:, 1]), 'short': (ds[:3], values[:3, 1])}
+        expected = serial.forecast_batch(series, 10, 'D')
+        batch = parallel.forecast_batch(series, 10, 'D')
+        assert list(batch) == list(expected)
+        for name, (f, y) in expected.items():
+            assert list(batch[name][0]) == list(f) and np.allclose(batch[name][1], y), name
+    finally:
+        shutdown_process_pool()
+    logger.info("Parallel forecasts match the serial ones OK")
+
+
+def test_forecast_cache_skips_unchanged_series():
+    ds, values = _daily()
+    rows = [{'date': d.strftime('%Y-%m-%d'), 'income': i, 'expense': e} for d, (i, e) in zip(ds, values)]
+    forecaster, cache = CountingForecaster(), ForecastCache()
+    first = enrich_with_forecast_and_anomalies(rows, horizon=7, forecaster=forecaster, cache=cache)
+    assert forecaster.fitted_series == 2 and sum(1 for row in first if row.get('isForecast')) == 7
+
+    assert enrich_with_forecast_and_anomalies(rows, horizon=7, forecaster=forecaster, cache=cache) == first
+    assert forecaster.fitted_series == 2, 'both series served from the cache'
+    rows[-1] = {**rows[-1], 'expense': rows[-1]['expense'] + 1}
+    enrich_with_forecast_and_anomalies(rows, horizon=7, forecaster=forecaster, cache=cache)
+    assert forecaster.fitted_series == 3, 'only the changed series is refitted'
+    logger.info("Forecast cache skips unchanged series OK")
+
+
+if __name__ == "__main__":
+    test_numpy_forecast_shape_and_dates()
+    test_prophet_fallback()
+    test_parallel_matches_serial()
+    test_forecast_cache_skips_unchanged_series()
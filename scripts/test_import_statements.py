@@ -0,0 +1,100 @@
+import sys
+import csv
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.datamodel.schema import SchemaManager
+from import_statements import import_statement
+from synthetic_data import CSV_HEADERS, create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COFFEE = ['10/01/2026', 'corner cafe', '4.50', 'debit', 'coffeeshops', 'checking']
+STATEMENT = [
+    COFFEE,
+    COFFEE,  # a second identical coffee the same day is a second transaction
+    ['10/02/2026', 'paycheck', '2000.00', 'credit', 'paycheck', 'checking'],
+]
+OVERLAPPING = [
+    ['10/02/2026', 'paycheck', '2000.00', 'credit', 'paycheck', 'checking'],  # already imported
+    COFFEE, COFFEE, COFFEE,  # the third one is new
+    ['10/03/2026', 'bookshop', '30.00', 'debit', 'shopping', 'platinumcard'],
+]
+
+
+def _write_csv(path: Path, rows) -> Path:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        writer.writerows(rows)
+    return path
+
+
+def _counts(db_path: Path):
+    with sqlite3.connect(str(db_path)) as conn:
+        transactions = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        hashes = conn.execute("SELECT COUNT(*) FROM transaction_hashes").fetchone()[0]
+        checking = conn.execute("SELECT balance FROM accounts WHERE name = 'checking'").fetchone()[0]
+    conn.close()
+    return transactions, hashes, checking
+
+
+def test_reimport_inserts_nothing():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=200, days=60)
+        before, _, balance = _counts(db_path)
+        statement = _write_csv(Path(tmp) / 'statement.csv', STATEMENT)
+
+        stats = import_statement(statement, db_path)
+        assert (stats['inserted'], stats['duplicates']) == (3, 0), stats
+        rows, hashes, after_first = _counts(db_path)
+        assert rows == hashes == before + 3
+        assert round(after_first - balance, 2) == 2000.0 - 9.0
+
+        stats = import_statement(statement, db_path)
+        assert (stats['inserted'], stats['duplicates']) == (0, 3), stats
+        assert _counts(db_path) == (rows, hashes, after_first), 'a re-import changes nothing'
+
+        stats = import_statement(_write_csv(Path(tmp) / 'overlap.csv', OVERLAPPING), db_path)
+        assert (stats['inserted'], stats['duplicates']) == (2, 3), stats
+        with sqlite3.connect(str(db_path)) as conn:
+            coffees = conn.execute("SELECT COUNT(*) FROM transactions WHERE description = 'corner cafe'").fetchone()[0]
+        conn.close()
+        assert coffees == 3
+    logger.info("Statement re-import OK")
+
+
+def test_hashes_stay_out_of_transactions():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=50, days=30)
+        statement = _write_csv(Path(tmp) / 'statement.csv', STATEMENT)
+        import_statement(statement, db_path)
+
+        with sqlite3.connect(str(db_path)) as conn:
+            cursor = conn.execute("SELECT * FROM transactions LIMIT 1")
+            cursor.fetchall()
+            assert 'row_hash' not in [d[0] for d in cursor.description]
+            # Deleting a transaction forgets its hash, so importing it again restores it
+            last_id = conn.execute("SELECT MAX(id) FROM transactions").fetchone()[0]
+            conn.execute("DELETE FROM transactions WHERE id = ?", (last_id,))
+        conn.close()
+        stats = import_statement(statement, db_path)
+        assert stats['inserted'] == 1, stats
+        with sqlite3.connect(str(db_path)) as conn:
+            assert conn.execute("SELECT MAX(id) FROM transactions").fetchone()[0] == last_id + 1, 'ids are not reused'
+        conn.close()
+        rows, hashes, _ = _counts(db_path)
+        assert rows == hashes
+    logger.info("Row hashes kept in transaction_hashes OK")
+
+
+if __name__ == "__main__":
+    test_reimport_inserts_nothing()
+    test_hashes_stay_out_of_transactions()
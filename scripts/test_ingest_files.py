@@ -0,0 +1,85 @@
+import sys
+import csv
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from setup_sqlite import setup_db
+from ingest_files import ingest_files, parse_statement, sanitize_headers
+from synthetic_data import write_synthetic_csv
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROWS = 1200
+
+
+def _split(csv_path: Path, parts: int):
+    """The statement cut into `parts` files of consecutive rows, each with the header."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        header, *rows = list(csv.reader(f))
+    paths, size = [], -(-len(rows) // parts)
+    for i in range(parts):
+        path = csv_path.with_name(f'{csv_path.stem}_{i}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows[i * size:(i + 1) * size])
+        paths.append(path)
+    return paths
+
+
+def _contents(db_path: Path):
+    with sqlite3.connect(str(db_path)) as conn:
+        contents = {
+            'transactions': conn.execute("SELECT * FROM transactions ORDER BY id").fetchall(),
+            'accounts': conn.execute("SELECT name, type, round(balance, 6) FROM accounts ORDER BY name").fetchall(),
+            'search': sorted(conn.execute("SELECT * FROM global_search_index").fetchall()),
+            'import_state': conn.execute("SELECT * FROM import_state ORDER BY key").fetchall(),
+            'hashes': conn.execute("SELECT COUNT(*) FROM transaction_hashes").fetchone()[0],
+        }
+    conn.close()
+    return contents
+
+
+def test_multi_file_matches_setup_db():
+    with tempfile.TemporaryDirectory() as tmp:
+        statement = write_synthetic_csv(Path(tmp) / 'statement.csv', ROWS, days=90)
+        expected = Path(tmp) / 'single.db'
+        setup_db(data_path=statement, db_path=expected)
+        expected = _contents(expected)
+        assert len(expected['transactions']) == ROWS and expected['hashes'] == ROWS
+
+        parts = _split(statement, 3)
+        # Small batches and queues, so the workers block on the writer and stream their files
+        for workers in (0, 2):
+            db_path = Path(tmp) / f'workers_{workers}.db'
+            stats = ingest_files(parts, db_path, workers=workers, batch_size=50, queue_size=2)
+            assert [s['rows'] for s in stats] == [400, 400, 400], stats
+            actual = _contents(db_path)
+            for table, rows in expected.items():
+                assert actual[table] == rows, (workers, table)
+    logger.info("Multi-file ingest matches setup_db OK")
+
+
+def test_parse_statement_streams_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        statement = write_synthetic_csv(Path(tmp) / 'statement.csv', 250, days=30)
+        with open(statement, newline='', encoding='utf-8') as f:
+            columns = sanitize_headers(next(csv.reader(f)))
+        batches = []
+        parsed = parse_statement(statement, list(reversed(columns)), batches.append, batch_size=100)
+        assert [len(b) for b in batches] == [100, 100, 50]
+        assert parsed['rows'] == 250 and parsed['max_date'] is not None
+        assert isinstance(batches[0][0][columns[::-1].index('amount')], float), 'values follow `columns`'
+    logger.info("parse_statement batches OK")
+
+
+if __name__ == "__main__":
+    test_multi_file_matches_setup_db()
+    test_parse_statement_streams_batches()
@@ -0,0 +1,86 @@
+import sys
+import math
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from setup_sqlite import setup_db, INGEST_MODES
+from ingest_files import ingest_files
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Duplicates, quoted commas, accents, mixed-case types and accounts, bad amounts and dates, a long line,
+# a blank line
+FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'ingest_sample.csv'
+
+
+def _load(mode: str, tmp: str):
+    db_path = Path(tmp) / f'{mode}.db'
+    if mode == 'ingest_files':
+        ingest_files([FIXTURE], db_path, workers=0, batch_size=4)
+    else:
+        setup_db(ingest_mode=mode, data_path=FIXTURE, db_path=db_path, batch_size=4)
+    with sqlite3.connect(str(db_path)) as conn:
+        contents = {
+            'transactions': conn.execute("SELECT * FROM transactions ORDER BY id").fetchall(),
+            'accounts': conn.execute("SELECT name, type, balance FROM accounts ORDER BY name").fetchall(),
+            'search': sorted(conn.execute("SELECT * FROM global_search_index").fetchall()),
+            'import_state': conn.execute("SELECT * FROM import_state ORDER BY key").fetchall(),
+        }
+    conn.close()
+    return contents
+
+
+def _same_values(a, b) -> bool:
+    # Columnar casts and sums with pandas/NumPy, which may differ from float() and sum() in the last bits
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-12, abs_tol=1e-9)
+    return type(a) is type(b) and a == b
+
+
+def _same_rows(rows, expected) -> bool:
+    return len(rows) == len(expected) and all(
+        len(row) == len(other) and all(_same_values(a, b) for a, b in zip(row, other))
+        for row, other in zip(rows, expected))
+
+
+def test_modes_load_the_same_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        modes = (*INGEST_MODES, 'ingest_files')
+        loaded = {mode: _load(mode, tmp) for mode in modes}
+        expected = loaded['rowwise']
+        assert len(expected['transactions']) == 16, 'the blank line is not a transaction'
+        assert all(row[1] is not None for row in expected['transactions'])
+
+        # Values the loaders keep as text: the bad amounts and the dates that are not MM/DD/YYYY
+        by_description = {row[2]: row for row in expected['transactions']}
+        assert by_description['pending hold'][3] == 'n/a' and by_description['no amount'][3] == ''
+        assert by_description['bad date row'][1] == 'not a date'
+        assert by_description['iso date row'][1] == '2025-10-05'
+        assert by_description['bad iso date row'][1] == '2025-13-45'
+        assert by_description['thai kitchen, downtown'][3] == 31.4
+
+        for mode in modes:
+            actual = loaded[mode]
+            if mode == 'columnar':
+                assert _same_rows(actual['transactions'], expected['transactions']), mode
+            else:
+                assert actual['transactions'] == expected['transactions'], mode
+            # ingest_files adds each file's balance changes to the starting balances, another summation order
+            if mode in ('columnar', 'ingest_files'):
+                assert _same_rows(actual['accounts'], expected['accounts']), (mode, actual['accounts'])
+            else:
+                assert actual['accounts'] == expected['accounts'], (mode, actual['accounts'], expected['accounts'])
+            assert actual['search'] == expected['search'], mode
+            assert actual['import_state'] == expected['import_state'], mode
+    logger.info(f"Ingest modes {modes} load the same database OK")
+
+
+if __name__ == "__main__":
+    test_modes_load_the_same_database()
@@ -0,0 +1,116 @@
+import sys
+import time
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.chart_insights import ChartInsightService
+from src.insight_cache import InsightCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHART = ('Expense by category', 'SELECT category, SUM(total) AS value FROM daily_rollups WHERE date >= ?',
+         ('2026-09-17',))
+OUTPUT = [{'category': 'groceries', 'value': 412.5}, {'category': 'restaurants', 'value': 180.0}]
+
+
+class CountingEngine:
+    """Stands in for the query engine: counts the LLM calls an insight would cost."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_chart_insight(self, chart_title, sql_query, query_params, query_output):
+        self.calls += 1
+        return f'insight {self.calls} on {len(query_output)} rows'
+
+
+def test_memory_tier_bounds():
+    cache = InsightCache(max_entries=2)
+    for i in range(3):
+        cache.put(f'k{i}', f'insight {i}')
+    assert cache.get('k0') is None and cache.get('k2') == 'insight 2'
+    assert cache.stats()['evicted_lru'] == 1
+
+    cache = InsightCache(max_entries=10, max_bytes=1024)
+    cache.put('a', 'x' * 600)
+    cache.put('b', 'y' * 600)
+    assert cache.get('a') is None, 'evicted to stay under max_bytes'
+    assert cache.stats()['evicted_size'] == 1 and cache.stats()['bytes'] == 600
+    logger.info("Insight cache memory bounds OK")
+
+
+def test_ttl_expiry():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = InsightCache(ttl_seconds=0.2, db_path=str(Path(tmp) / 'insights.db'))
+        cache.put('key', 'insight')
+        assert cache.get('key') == 'insight'
+        time.sleep(0.3)
+        assert cache.get('key') is None, 'expired in both tiers'
+        assert cache.stats()['evicted_ttl'] == 2, cache.stats()
+        assert cache.stats()['db_entries'] == 0
+
+        restarted = InsightCache(ttl_seconds=0.2, db_path=str(Path(tmp) / 'insights.db'))
+        cache.put('other', 'insight')
+        time.sleep(0.3)
+        assert restarted.get('other') is None, 'an expired disk entry is not loaded'
+    logger.info("Insight cache TTL expiry OK")
+
+
+def test_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'insights.db')
+        InsightCache(db_path=db_path).put('key', 'insight')
+
+        restarted = InsightCache(db_path=db_path)
+        assert restarted.get('key') == 'insight'
+        assert restarted.get('key') == 'insight'
+        stats = restarted.stats()
+        assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (1, 1, 0), stats
+
+        pruned = InsightCache(db_path=db_path, max_db_entries=2)
+        for i in range(4):
+            pruned.put(f'k{i}', f'insight {i}')
+        assert pruned.stats()['db_entries'] == 2
+        assert InsightCache(db_path=db_path).get('k0') is None
+        assert InsightCache(db_path=db_path).get('k3') == 'insight 3'
+
+        restarted.clear()
+        assert InsightCache(db_path=db_path).get('k3') is None
+    logger.info("Insight cache survives a restart OK")
+
+
+def test_invalidated_by_new_data():
+    """The key covers the query output, so an insight is regenerated as soon as the data behind the chart changes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'insights.db')
+        engine = CountingEngine()
+        service = ChartInsightService(cache=InsightCache(db_path=db_path))
+
+        first = service.get(engine, *CHART, OUTPUT)
+        assert service.get(engine, *CHART, [dict(row) for row in OUTPUT]) == first
+        assert engine.calls == 1
+
+        changed = OUTPUT + [{'category': 'coffeeshops', 'value': 4.5}]
+        assert service.get(engine, *CHART, changed) != first
+        assert service.get(engine, *CHART[:2], ('2026-09-18',), OUTPUT) != first, 'other parameters, other insight'
+        assert engine.calls == 3
+
+        # After a restart the disk tier still answers for unchanged data only
+        restarted = ChartInsightService(cache=InsightCache(db_path=db_path))
+        assert restarted.get(engine, *CHART, OUTPUT) == first
+        assert restarted.get(engine, *CHART, changed + [{'category': 'travel', 'value': 99.0}])
+        assert engine.calls == 4
+    logger.info("Insight cache invalidated by new data OK")
+
+
+if __name__ == "__main__":
+    test_memory_tier_bounds()
+    test_ttl_expiry()
+    test_survives_restart()
+    test_invalidated_by_new_data()
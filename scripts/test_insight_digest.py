@@ -0,0 +1,111 @@
+import sys
+import math
+import json
+import logging
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.insight_digest import PayloadDigester, estimate_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+START = date(2026, 1, 1)
+
+
+def _series(days: int = 180, horizon: int = 14):
+    """Daily income/expense shaped like the enriched income-vs-expenses panel: anomalies flagged, a forecast tail."""
+    rows = []
+    for i in range(days):
+        row = {'date': (START + timedelta(days=i)).isoformat(),
+               'income': 2250.0 if i % 14 == 0 else 0.0,
+               'expense': 40.0 + (i * 37 % 23) + 0.125 * (i % 3)}
+        if i in (45, 120):
+            row['expense'] = 900.0 + i
+            row['anomaly'] = {'expense': True}
+        rows.append(row)
+    for i in range(horizon):
+        rows.append({'date': (START + timedelta(days=days + i)).isoformat(), 'isForecast': True,
+                     'income': 160.0, 'expense': 55.5})
+    return rows
+
+
+def _categories(n: int = 40):
+    return [{'category': f'category{i:02d}', 'value': float(1000 - i * 20) + 0.333} for i in range(n)]
+
+
+def test_small_payload_only_rounded():
+    digester = PayloadDigester(max_tokens=400)
+    rows = [{'category': 'groceries', 'value': 412.4567}, {'category': 'travel', 'value': 99.999}]
+    assert digester.digest(rows) == [{'category': 'groceries', 'value': 412.46}, {'category': 'travel', 'value': 100.0}]
+    logger.info("Small payload only rounded OK")
+
+
+def test_series_digest_keeps_totals_and_extremes():
+    rows = _series()
+    actual = [row for row in rows if not row.get('isForecast')]
+    digester = PayloadDigester(max_tokens=400, top_k=5, max_points=12)
+    text = digester.serialize(rows)
+    assert estimate_tokens(text) <= 400, estimate_tokens(text)
+    assert estimate_tokens(json.dumps(rows)) > 5 * 400, 'the digest is what brought it within budget'
+    digest = json.loads(text)
+
+    assert digest['points'] == len(actual) and digest['period'] == [actual[0]['date'], actual[-1]['date']]
+    for key in ('income', 'expense'):
+        stats = digest['series'][key]
+        values = [row[key] for row in actual]
+        assert math.isclose(stats['total'], sum(values), abs_tol=0.01), (key, stats['total'], sum(values))
+        assert math.isclose(stats['mean'], sum(values) / len(values), abs_tol=0.01)
+        assert stats['max'] == [actual[values.index(max(values))]['date'], max(values)]
+        assert stats['min'][1] == min(values)
+
+    assert digest['anomaly_count'] == 2
+    assert digest['anomalies'] == [{'date': '2026-05-01', 'expense': 1020.0}, {'date': '2026-02-15', 'expense': 945.0}]
+    assert digest['forecast']['points'] == 14 and digest['forecast']['expense']['total'] == 14 * 55.5
+
+    buckets = digest['downsampled']
+    assert len(buckets) <= 12 and buckets[0]['date'] == actual[0]['date']
+    assert math.isclose(sum(b['expense'] for b in buckets), digest['series']['expense']['total'],
+                        abs_tol=0.01 * len(buckets))
+    logger.info("Series digest keeps totals and extremes OK")
+
+
+def test_top_k_digest_keeps_total():
+    rows = _categories()
+    digest = PayloadDigester(max_tokens=100, top_k=5).digest(rows)
+    assert digest['rows'] == 40
+    assert [row['category'] for row in digest['top']] == [f'category{i:02d}' for i in range(5)]
+    total = sum(row['value'] for row in rows)
+    assert math.isclose(digest['total']['value'], total, abs_tol=0.01)
+    assert digest['others']['rows'] == 35
+    assert math.isclose(digest['others']['value'] + sum(row['value'] for row in digest['top']), total, abs_tol=0.05)
+    logger.info("Top-k digest keeps the total OK")
+
+
+def test_budget_shrinks_digest():
+    payload = {'income_vs_expense': _series(365), 'categories': _categories(60)}
+    sizes = []
+    for max_tokens in (600, 400, 50):
+        text = PayloadDigester(max_tokens=max_tokens, top_k=5, max_points=12).serialize(payload)
+        digest = json.loads(text)
+        sizes.append(estimate_tokens(text))
+        # Fewer points and rows, never fewer totals
+        assert len(digest['income_vs_expense']['downsampled']) <= 12 and len(digest['categories']['top']) <= 5
+        assert digest['income_vs_expense']['series']['income']['total'] == 2250.0 * 27
+        assert digest['categories']['rows'] == 60
+    assert sizes[0] <= 600 and sizes[1] <= 400 and sizes[2] < sizes[1], sizes
+
+    # A budget too small for any digest gets the smallest one: one row and two points per series
+    assert len(digest['categories']['top']) == 1 and len(digest['income_vs_expense']['downsampled']) <= 2
+    logger.info("Digest shrinks to the token budget OK")
+
+
+if __name__ == "__main__":
+    test_small_payload_only_rounded()
+    test_series_digest_keeps_totals_and_extremes()
+    test_top_k_digest_keeps_total()
+    test_budget_shrinks_digest()
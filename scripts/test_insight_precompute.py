@@ -0,0 +1,95 @@
+import sys
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src.config import load_app_config
+from src.datamodel.finance_db import SQLQueryRepository, ConnectionPool
+from src.insight_precompute import InsightPrecomputer
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CountingInsights:
+    """Stands in for ChartInsightService: records the charts asked for instead of calling an LLM."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, engine, chart_title, sql_query, query_params, query_output):
+        with self._lock:
+            self.calls.append(chart_title)
+        return 'insight'
+
+
+def _add_transaction(db_path: Path) -> None:
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.execute("INSERT INTO transactions (date, description, amount, transaction_type, category, account_name) "
+                     "VALUES (?, 'Test Coffee', 4.5, 'debit', 'Coffee Shops', 'Checking')", (date.today().isoformat(),))
+    conn.close()
+
+
+def test_regenerates_on_version_change():
+    sqlite_cfg = load_app_config()['db']['sqlite']
+    SQLQueryRepository(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'finance.db'
+        create_synthetic_db(db_path, n_rows=2000, days=120)
+        pool = ConnectionPool(str(db_path), size=2)
+        insights = CountingInsights()
+        precomputer = InsightPrecomputer(pool, insights, lambda: 'engine', poll_interval=3600,
+                                         periods=('month', 'week'))
+        try:
+            # Checked before start() so the watcher thread's first check finds nothing new
+            assert precomputer.check(), 'the first check always generates'
+            precomputer.start()
+            assert precomputer.wait_idle(timeout=30)
+            first = len(insights.calls)
+            assert first > 0
+            stats = precomputer.stats()
+            assert stats['jobs_done'] == 5 and stats['jobs_failed'] == 0, stats
+
+            assert not precomputer.check(), 'nothing changed, nothing to regenerate'
+            assert precomputer.wait_idle(timeout=30)
+            assert len(insights.calls) == first
+
+            _add_transaction(db_path)
+            assert precomputer.check(), 'a new transaction moves the data version'
+            assert precomputer.wait_idle(timeout=30)
+            assert len(insights.calls) == 2 * first
+            assert precomputer.stats()['data_changes'] == 2
+        finally:
+            precomputer.stop()
+            pool.close()
+    logger.info("Insight precompute regenerates on data version change OK")
+
+
+def test_enqueue_deduplicates():
+    precomputer = InsightPrecomputer(pool=None, insights=None, engine_provider=None)
+    assert precomputer.enqueue('expense_summary', 'month')
+    assert not precomputer.enqueue('expense_summary', 'month'), 'a queued job is not queued twice'
+    assert precomputer.enqueue('expense_summary', 'week')
+    assert precomputer.stats()['jobs_deduplicated'] == 1
+    logger.info("Insight precompute deduplication OK")
+
+
+def test_disabled_by_default():
+    # Importing backend_server (tests, benchmarks) must not start background LLM calls
+    assert not load_app_config()['insights']['precompute']['enabled']
+
+
+if __name__ == "__main__":
+    test_regenerates_on_version_change()
+    test_enqueue_deduplicates()
+    test_disabled_by_default()
@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+import sqlite3
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from src.datamodel.finance_db import SQLQueryRepository, FinanceQueryName
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows in the synthetic transactions table, override with FINANCE_PLAN_TEST_ROWS for a quicker run
+N_ROWS = int(os.getenv('FINANCE_PLAN_TEST_ROWS', 1_000_000))
+
+# Queries that by definition read every transaction. They may walk an index end to end,
+# but never the table itself.
+WHOLE_TABLE_QUERIES = {
+    FinanceQueryName.GET_ALL_TRANSACTIONS,
+    FinanceQueryName.GET_TRANSACTIONS_STREAM,
+    FinanceQueryName.GET_TOTAL_TRANSACTIONS_COUNT,
+    FinanceQueryName.GET_TRANSACTIONS_PAGINATED,
+    FinanceQueryName.GET_TRANSACTIONS_KEYSET_FIRST,
+}
+
+# Only scans of the large table matter. The other tables hold a handful of rows and
+# daily_rollups grows with the number of days, not transactions.
+LARGE_TABLES = ('transactions',)
+
+SAMPLE_PARAMETER = '2024-01-01'
+
+
+def _query_names():
+    return [value for key, value in vars(FinanceQueryName).items() if key.isupper()]
+
+
+def _explain(conn: sqlite3.Connection, query: str):
+    named = re.findall(r':(\w+)', query)
+    if named:
+        params = {name: 'paycheck' for name in named}
+    else:
+        params = [SAMPLE_PARAMETER] * query.count('?')
+    return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+
+
+def find_full_scans(conn: sqlite3.Connection, query_name: str, query: str):
+    """
+    Returns the plan lines that scan a large table: a bare table scan is never allowed,
+    an index scan only for the WHOLE_TABLE_QUERIES.
+    """
+    problems = []
+    for detail in _explain(conn, query):
+        match = re.match(r'SCAN (\w+)', detail)
+        if not match or match.group(1) not in LARGE_TABLES:
+            continue
+        if 'USING' not in detail or query_name not in WHOLE_TABLE_QUERIES:
+            problems.append(detail)
+    return problems
+
+
+def test_query_plans():
+    repo = SQLQueryRepository(queries_file='sql_queries.json')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'finance_plans.db'
+        logger.info(f"Building synthetic database with {N_ROWS} transactions...")
+        create_synthetic_db(db_path, N_ROWS)
+
+        conn = sqlite3.connect(db_path)
+        try:
+            failures = {}
+            for query_name in _query_names():
+                problems = find_full_scans(conn, query_name, repo.get_query(query_name))
+                if problems:
+                    failures[query_name] = problems
+                else:
+                    logger.info(f"{query_name}: OK")
+        finally:
+            conn.close()
+
+    for query_name, problems in failures.items():
+        logger.error(f"{query_name} falls back to a full scan: {problems}")
+    assert not failures, f"Full table scans in: {sorted(failures)}"
+
+
+if __name__ == "__main__":
+    test_query_plans()
@@ -0,0 +1,101 @@
+import sys
+import logging
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+from src import question_cache
+from src.question_cache import QuestionCache, get_question_cache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = 'v1'
+
+
+def _cache_with(question: str, sql: str) -> QuestionCache:
+    cache = QuestionCache()
+    cache.put(question, sql, SCHEMA)
+    return cache
+
+
+def test_hits():
+    """Rewordings that only differ in case, punctuation, filler words or word forms reuse the SQL."""
+    sql = "SELECT SUM(amount) FROM transactions WHERE category = 'groceries'"
+    cache = _cache_with('How much did I spend on groceries last month?', sql)
+
+    assert cache.get('how much did i spend on groceries last month', SCHEMA) == sql
+    assert cache.hits['exact'] == 1, cache.hits
+    assert cache.get('How much have I spent on groceries last month, please?', SCHEMA) == sql
+    assert cache.get('Please, how much did I spend on the groceries last month?', SCHEMA) == sql
+    assert cache.hits['similar'] == 2, cache.hits
+    logger.info("Question cache hits OK")
+
+
+def test_misses():
+    """Questions whose meaning differs must never share SQL, however similar they look."""
+    cache = _cache_with('How much did I transfer to savings?', "SELECT 'to savings'")
+    assert cache.get('How much did I transfer from savings?', SCHEMA) is None
+
+    cache = _cache_with('Transfers from savings to checking last month', "SELECT 'savings -> checking'")
+    assert cache.get('Transfers from checking to savings last month', SCHEMA) is None
+
+    cache = _cache_with('How much did I spend on groceries last month?', "SELECT SUM(amount)")
+    for question in ('How many groceries transactions last month?',   # count, not sum
+                     'How much did I spend on groceries this month?',  # period
+                     'How much did I spend on restaurants last month?',  # category
+                     'How much did I spend on groceries last year?'):
+        assert cache.get(question, SCHEMA) is None, question
+
+    cache = _cache_with('What is my total balance?', "SELECT SUM(balance) FROM accounts")
+    assert cache.get('What was my balance?', SCHEMA) is None
+    assert cache.misses == 1
+    logger.info("Question cache misses OK")
+
+
+def test_schema_change_and_discard():
+    question = 'How much did I spend on groceries last month?'
+    cache = _cache_with(question, 'SELECT 1')
+    assert cache.get(question, 'v2') is None, 'a new schema version must drop cached SQL'
+
+    cache.put(question, 'SELECT 1', 'v2')
+    cache.discard('How much have I spent on groceries last month')
+    assert cache.get(question, 'v2') is None, 'discard() of a rewording drops the entry it resolved to'
+    logger.info("Question cache schema change and discard OK")
+
+
+def test_lru_bound():
+    cache = QuestionCache(max_entries=2)
+    for i in range(3):
+        cache.put(f'spending on merchant{i}', f'SELECT {i}', SCHEMA)
+    assert cache.get('spending on merchant0', SCHEMA) is None
+    assert cache.get('spending on merchant2', SCHEMA) == 'SELECT 2'
+    logger.info("Question cache LRU bound OK")
+
+
+def test_disabled_config_read_once():
+    reads = []
+
+    def disabled_config():
+        reads.append(1)
+        return {'question_cache': {'enabled': False}}
+
+    load_app_config, cached = question_cache.load_app_config, question_cache._QUESTION_CACHE
+    question_cache.load_app_config, question_cache._QUESTION_CACHE = disabled_config, None
+    try:
+        assert get_question_cache() is None
+        assert get_question_cache() is None
+        assert len(reads) == 1, 'the disabled state is cached'
+    finally:
+        question_cache.load_app_config, question_cache._QUESTION_CACHE = load_app_config, cached
+    logger.info("Disabled question cache OK")
+
+
+if __name__ == "__main__":
+    test_hits()
+    test_misses()
+    test_schema_change_and_discard()
+    test_lru_bound()
+    test_disabled_config_read_once()
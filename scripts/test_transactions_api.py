@@ -0,0 +1,121 @@
+import sys
+import json
+import base64
+import logging
+import tempfile
+from pathlib import Path
+
+# Add the project root to sys.path to allow imports from src
+root_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_path))
+
+import backend_server
+from src.datamodel.finance_db import ConnectionPool, TableVersionCache, RowFormat, encode_cursor, decode_cursor
+from synthetic_data import create_synthetic_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# About ten transactions a day, so pages end in the middle of a date and the id breaks the tie
+ROWS = 1003
+
+
+class _SyntheticDatabase:
+    """Points backend_server at a synthetic finance.db for the duration of a with block."""
+
+    def __init__(self, tmp: str):
+        self.db_path = create_synthetic_db(Path(tmp) / 'finance.db', n_rows=ROWS, days=100)
+
+    def __enter__(self):
+        self.saved = backend_server.DB_PATH, backend_server.DB_POOL, backend_server.TRANSACTION_COUNT_CACHE
+        backend_server.DB_PATH = self.db_path
+        backend_server.DB_POOL = ConnectionPool(str(self.db_path), size=2)
+        backend_server.TRANSACTION_COUNT_CACHE = TableVersionCache('transactions', backend_server._count_transactions)
+        return backend_server.app.test_client()
+
+    def __exit__(self, *exc):
+        backend_server.DB_POOL.close()
+        backend_server.DB_PATH, backend_server.DB_POOL, backend_server.TRANSACTION_COUNT_CACHE = self.saved
+
+
+def _ids(page, row_format):
+    data = page['data']
+    if row_format == RowFormat.DICT:
+        return [row['id'] for row in data]
+    id_idx = data['columns'].index('id')
+    if row_format == RowFormat.ROWS:
+        return [row[id_idx] for row in data['rows']]
+    return data['values'][id_idx] if data['values'] else []
+
+
+def _walk(client, limit, row_format):
+    ids, cursor, pages = [], '', 0
+    while cursor is not None:
+        response = client.get(f'/api/transactions?limit={limit}&cursor={cursor}&format={row_format}')
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        assert page['total'] == ROWS and page['limit'] == limit
+        ids += _ids(page, row_format)
+        cursor = page['next_cursor']
+        pages += 1
+        assert pages <= ROWS // limit + 2, 'the cursor must move forward'
+    return ids
+
+
+def test_keyset_round_trip():
+    with tempfile.TemporaryDirectory() as tmp, _SyntheticDatabase(tmp) as client:
+        with backend_server.FinanceDB(str(backend_server.DB_PATH), pool=backend_server.DB_POOL) as db:
+            expected = [row['id'] for row in db.run_query(
+                "SELECT id FROM transactions ORDER BY date DESC, id DESC")]
+
+        for row_format in RowFormat.ALL:
+            assert _walk(client, 100, row_format) == expected, row_format
+        # A limit that divides the row count ends on an empty page without a cursor
+        assert _walk(client, 17, RowFormat.ROWS) == expected
+        assert _walk(client, ROWS, RowFormat.DICT) == expected
+
+        # Offset pagination returns the same transactions
+        offset_ids = []
+        for page in range(1, 12):
+            offset_ids += [row['id'] for row in client.get(f'/api/transactions?page={page}&limit=100').get_json()['data']]
+        assert sorted(offset_ids) == sorted(expected)
+
+        # A cursor without a limit gets the default page size, never the whole table
+        page = client.get('/api/transactions?cursor=').get_json()
+        assert page['limit'] == backend_server.KEYSET_DEFAULT_LIMIT
+        assert _ids(page, RowFormat.DICT) == expected[:page['limit']] and page['next_cursor']
+    logger.info("Keyset pagination round trip OK")
+
+
+def test_stream_formats():
+    with tempfile.TemporaryDirectory() as tmp, _SyntheticDatabase(tmp) as client:
+        lines = client.get('/api/transactions?stream=1').get_data(as_text=True).splitlines()
+        as_dicts = [json.loads(line) for line in lines]
+        assert len(as_dicts) == ROWS
+
+        header, *rows = [json.loads(line) for line in
+                         client.get('/api/transactions?stream=1&format=rows').get_data(as_text=True).splitlines()]
+        assert [dict(zip(header['columns'], row)) for row in rows] == as_dicts
+
+        assert client.get('/api/transactions?stream=1&format=columnar').status_code == 400
+    logger.info("Streamed transactions honour the format OK")
+
+
+def test_bad_cursor():
+    with tempfile.TemporaryDirectory() as tmp, _SyntheticDatabase(tmp) as client:
+        not_a_pair = base64.urlsafe_b64encode(b'{"date":"2026-01-01"}').decode('ascii').rstrip('=')
+        not_an_id = base64.urlsafe_b64encode(b'["2026-01-01","x"]').decode('ascii').rstrip('=')
+        for cursor in ('garbage!', 'bm90IGpzb24', not_a_pair, not_an_id):
+            response = client.get(f'/api/transactions?limit=10&cursor={cursor}')
+            assert response.status_code == 400, (cursor, response.status_code)
+            assert 'Invalid pagination cursor' in response.get_json()['error']
+
+        assert client.get('/api/transactions?limit=10&format=xml').status_code == 400
+    assert decode_cursor(encode_cursor('2026-01-01', 42)) == ('2026-01-01', 42)
+    logger.info("Bad pagination cursors rejected OK")
+
+
+if __name__ == "__main__":
+    test_keyset_round_trip()
+    test_stream_formats()
+    test_bad_cursor()
@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import load_app_config
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, RowFormat
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    # Optional: without pyarrow the snapshot lives in each worker's memory only
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_SNAPSHOT = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+TEXT_COLUMNS = ('transaction_type', 'category', 'account_name', 'description')
+
+SNAPSHOT_QUERY = ("SELECT date, amount, transaction_type, category, account_name, description "
+                  "FROM transactions ORDER BY date")
+
+# 1970-01-01 was a Thursday, strftime('%w') counts from Sunday = 0
+_EPOCH_WEEKDAY = 4
+
+
+def _epoch_day(iso_date: str) -> int:
+    return int(np.datetime64(iso_date, 'D').astype(np.int64))
+
+
+class SnapshotColumns:
+    """
+    One version of `transactions` as NumPy columns sorted by date: `day` (int32 days since 1970-01-01),
+    `amount` (float64, 0 where NULL or not a number) and the text columns as int32 codes into `labels`,
+    where NULL has its own None label.
+
+    The aggregations match the SQL of the dashboard panels (GET_DAILY_INCOME_VS_EXPENSE,
+    GET_EXPENSE_CATEGORY_SUMMARY_FILTERED, GET_SPENDING_BY_DAY_OF_WEEK, GET_TOP_EXPENSE_DESCRIPTIONS).
+    Rows whose date is not YYYY-MM-DD are left out. A NULL date is never selected by those queries, but the
+    SQL compares other dates as text, so `exact` is False when there are any and the snapshot must not be used.
+    """
+
+    def __init__(self, version: Any, day: np.ndarray, amount: np.ndarray, codes: Dict[str, np.ndarray],
+                 labels: Dict[str, List[Optional[str]]], exact: bool = True) -> None:
+        self.version = version
+        self.exact = exact
+        self.day = day
+        self.amount = amount
+        self.codes = codes
+        self.labels = labels
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def _since(self, start_date: str) -> slice:
+        # Sorted by day, so a date filter is one binary search
+        return slice(int(np.searchsorted(self.day, _epoch_day(start_date), side='left')), len(self.day))
+
+    def _is(self, column: str, value: str, rows: slice) -> np.ndarray:
+        try:
+            code = self.labels[column].index(value)
+        except ValueError:
+            return np.zeros(rows.stop - rows.start, dtype=bool)
+        return self.codes[column][rows] == code
+
+    def _is_not(self, column: str, value: str, rows: slice) -> np.ndarray:
+        # SQL `column != value` is not true for NULL either
+        excluded = [code for code, label in enumerate(self.labels[column]) if label is None or label == value]
+        return ~np.isin(self.codes[column][rows], excluded)
+
+    def _sum_by(self, column: str, rows: slice, mask: np.ndarray,
+                null_label: Optional[str] = None) -> List[Tuple[Optional[str], float]]:
+        codes = self.codes[column][rows][mask]
+        labels = self.labels[column]
+        if null_label is not None and None in labels:
+            # NULL grouped with `null_label`, as daily_rollups stores it
+            labels = [null_label if label is None else label for label in labels]
+            first = {}
+            codes = np.array([first.setdefault(label, code) for code, label in enumerate(labels)], np.int32)[codes]
+        size = len(labels)
+        totals = np.bincount(codes, weights=self.amount[rows][mask], minlength=size)
+        present = np.flatnonzero(np.bincount(codes, minlength=size))
+        # Largest first, ties by label (SQL leaves their order open)
+        return sorted(((labels[i], float(totals[i])) for i in present),
+                      key=lambda item: (-item[1], '' if item[0] is None else item[0]))
+
+    def daily_income_vs_expense(self, start_date: str) -> pd.DataFrame:
+        """date, income (credits) and expense (debits) per day with transactions since `start_date`."""
+        rows = self._since(start_date)
+        days, inverse = np.unique(self.day[rows], return_inverse=True)
+        amount = self.amount[rows]
+        income = np.bincount(inverse, weights=np.where(self._is('transaction_type', 'credit', rows), amount, 0.0),
+                             minlength=len(days))
+        expense = np.bincount(inverse, weights=np.where(self._is('transaction_type', 'debit', rows), amount, 0.0),
+                              minlength=len(days))
+        return pd.DataFrame({
+            'date': np.datetime_as_string(days.astype('datetime64[D]'), unit='D'),
+            'income': income,
+            'expense': expense,
+        })
+
+    def expense_category_summary(self, start_date: str) -> List[Dict[str, Any]]:
+        rows = self._since(start_date)
+        totals = self._sum_by('category', rows, self._is('transaction_type', 'debit', rows), null_label='')
+        return [{'category': category, 'value': value} for category, value in totals]
+
+    def spending_by_day_of_week(self, start_date: str) -> List[Dict[str, Any]]:
+        rows = self._since(start_date)
+        debit = self._is('transaction_type', 'debit', rows)
+        weekday = (self.day[rows][debit].astype(np.int64) + _EPOCH_WEEKDAY) % 7
+        totals = np.bincount(weekday, weights=self.amount[rows][debit], minlength=7)
+        counts = np.bincount(weekday, minlength=7)
+        return [{'day_index': str(i), 'total': float(totals[i])} for i in range(7) if counts[i]]
+
+    def top_expense_descriptions(self, start_date: str, limit: int = 3) -> List[Dict[str, Any]]:
+        rows = self._since(start_date)
+        mask = (self._is('transaction_type', 'debit', rows) & self._is('account_name', 'checking', rows)
+                & self._is_not('category', 'creditcardpayment', rows))
+        totals = self._sum_by('description', rows, mask)
+        return [{'description': description, 'total': total} for description, total in totals[:limit]]
+
+
+class TransactionSnapshot:
+    """
+    Columnar copy of `transactions` for the dashboard aggregations, rebuilt when the table's data version moves.
+    get() returns None while the table has dates the copy cannot represent, callers then run the SQL.
+
+    With pyarrow installed and `path` set, each build is also written as an Arrow IPC file (tagged with its
+    version) that every gunicorn worker memory-maps: the day, amount and code columns are read as NumPy views
+    of the mapped file, without copies, and a worker that finds the file already at the current version skips
+    the SQL read. Without pyarrow, each worker keeps its own copy in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = None
+        if path and pa is not None:
+            self.path = Path(path) if Path(path).is_absolute() else PROJECT_ROOT / path
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._columns: Optional[SnapshotColumns] = None
+        self._mapped = None
+        self._lock = threading.Lock()
+        self._stats = {'builds': 0, 'mapped': 0, 'last_build_ms': None}
+
+    def get(self, db: FinanceDB) -> Optional[SnapshotColumns]:
+        version = self.data_version(db)
+        columns = self._columns
+        if columns is None or columns.version != version:
+            with self._lock:
+                if self._columns is None or self._columns.version != version:
+                    self._columns = self._refresh(db, version)
+                columns = self._columns
+        return columns if columns.exact else None
+
+    @staticmethod
+    def data_version(db: FinanceDB) -> List[Any]:
+        # The max id tells apart rebuilt databases whose change counters restarted at the same value
+        return [db.get_table_version('transactions'),
+                db.run_named_query(FinanceQueryName.GET_MAX_TRANSACTION_ID)[0]['max_id']]
+
+    def stats(self) -> Dict[str, Any]:
+        columns = self._columns
+        return {
+            **self._stats,
+            'rows': len(columns) if columns is not None else 0,
+            'version': columns.version if columns is not None else None,
+            'arrow_file': str(self.path) if self.path else None,
+        }
+
+    def _refresh(self, db: FinanceDB, version: Any) -> SnapshotColumns:
+        if self.path is not None:
+            columns = self._map(version)
+            if columns is not None:
+                self._stats['mapped'] += 1
+                return columns
+
+        start = time.perf_counter()
+        columns = self._build(db, version)
+        if self.path is not None:
+            try:
+                self._write(columns)
+                columns = self._map(version) or columns
+            except Exception as e:
+                logger.warning(f'Could not write the analytics snapshot {self.path}, keeping it in memory: {e}')
+        self._stats['builds'] += 1
+        self._stats['last_build_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(f"Analytics snapshot of {len(columns)} transactions built in {self._stats['last_build_ms']} ms")
+        if not columns.exact:
+            logger.warning('transactions has dates that are not YYYY-MM-DD, the dashboard runs its SQL instead '
+                           'of the analytics snapshot')
+        return columns
+
+    @staticmethod
+    def _build(db: FinanceDB, version: Any) -> SnapshotColumns:
+        result = db.run_query(SNAPSHOT_QUERY, row_format=RowFormat.COLUMNAR)
+        values = dict(zip(result['columns'], result['values']))
+        text_dates = pd.Series(values['date'], dtype=object)
+        dates = pd.to_datetime(text_dates, format='%Y-%m-%d', errors='coerce')
+        # Unpadded dates parse too, but don't compare as text like padded ones
+        valid = (dates.notna() & (text_dates.str.len() == 10)).to_numpy()
+        exact = int(valid.sum()) == int(text_dates.notna().sum())
+
+        day = dates[valid].to_numpy(dtype='datetime64[D]').astype(np.int32)
+        # SUM() counts NULL and text amounts as 0
+        amount = pd.to_numeric(pd.Series(values['amount'], dtype=object), errors='coerce') \
+            .fillna(0.0).to_numpy(dtype=np.float64)[valid]
+        codes, labels = {}, {}
+        for column in TEXT_COLUMNS:
+            text = pd.Series(values[column], dtype=object)[valid]
+            column_codes, uniques = pd.factorize(text, use_na_sentinel=False)
+            codes[column] = column_codes.astype(np.int32)
+            labels[column] = [None if pd.isna(label) else str(label) for label in uniques]
+        return SnapshotColumns(version, day, amount, codes, labels, exact)
+
+    def _write(self, columns: SnapshotColumns) -> None:
+        arrays = {'day': pa.array(columns.day, pa.int32()), 'amount': pa.array(columns.amount, pa.float64())}
+        for column in TEXT_COLUMNS:
+            arrays[column] = pa.DictionaryArray.from_arrays(pa.array(columns.codes[column], pa.int32()),
+                                                            pa.array(columns.labels[column], pa.string()))
+        table = pa.table(arrays).replace_schema_metadata({'version': json.dumps(columns.version),
+                                                          'exact': json.dumps(columns.exact)})
+
+        # Written aside and renamed, workers mapping the previous file keep reading it
+        tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, self.path)
+
+    def _map(self, version: Any) -> Optional[SnapshotColumns]:
+        if not self.path.exists():
+            return None
+        try:
+            source = pa.memory_map(str(self.path), 'r')
+            table = pa_ipc.open_file(source).read_all()
+        except Exception as e:
+            logger.warning(f'Ignoring unreadable analytics snapshot {self.path}: {e}')
+            return None
+        metadata = table.schema.metadata or {}
+        if metadata.get(b'version') != json.dumps(version).encode('utf-8'):
+            source.close()
+            return None
+
+        def _array(name):
+            column = table.column(name)
+            return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+        codes, labels = {}, {}
+        for column in TEXT_COLUMNS:
+            array = _array(column)
+            codes[column] = array.indices.to_numpy(zero_copy_only=True)
+            labels[column] = array.dictionary.to_pylist()
+        columns = SnapshotColumns(version, _array('day').to_numpy(zero_copy_only=True),
+                                  _array('amount').to_numpy(zero_copy_only=True), codes, labels,
+                                  json.loads(metadata.get(b'exact', b'true')))
+        # The arrays are views of the mapping, it stays open until the next version replaces them
+        self._mapped = source
+        return columns
+
+
+def get_transaction_snapshot() -> Optional[TransactionSnapshot]:
+    """Process-wide snapshot from analytics.snapshot in app_config.yaml, None if it is disabled."""
+    global _SNAPSHOT
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None:
+            cfg = load_app_config().get('analytics', {}).get('snapshot', {})
+            # False remembers that it is disabled
+            _SNAPSHOT = TransactionSnapshot(path=cfg.get('path')) if cfg.get('enabled', False) else False
+        return _SNAPSHOT or None
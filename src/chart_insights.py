@@ -0,0 +1,105 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+from src.config import load_app_config
+from src.insight_cache import InsightCache
+
+logger = logging.getLogger(__name__)
+
+# (chart_title, sql_query, query_params, query_output), the body of an /api/insights request
+ChartInsightRequest = Tuple[str, str, Any, Any]
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time: callers arriving while a call is in flight
+    wait for it and share its result (or exception) instead of starting their own.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class ChartInsightService:
+    """
+    Generates chart insights with generate_chart_insight():
+    - results are kept in `cache`, keyed by a hash of the whole request
+    - identical requests made while one is in flight share its LLM call
+    - at most `max_concurrency` LLM calls run at once, across single and batch requests
+    """
+
+    def __init__(self, max_concurrency: int = 4, cache: InsightCache = None) -> None:
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else InsightCache()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._flights = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='chart-insight')
+
+    def get(self, engine, chart_title: str, sql_query: str, query_params: Any, query_output: Any) -> str:
+        key = InsightCache.key(chart_title, sql_query, query_params, query_output)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def generate():
+            # Cached before the flight ends, and looked up again in it: a caller that missed the cache
+            # just before the previous flight stored its insight must not start a second LLM call
+            insight = self.cache.peek(key)
+            if insight is None:
+                with self._semaphore:
+                    insight = engine.generate_chart_insight(chart_title, sql_query, str(query_params), query_output)
+                self.cache.put(key, insight)
+            return insight
+
+        return self._flights.do(key, generate)
+
+    def get_many(self, engine, charts: List[ChartInsightRequest]) -> Iterator[Tuple[int, Future]]:
+        """
+        Fans the charts out concurrently, yields (index in `charts`, finished future) in completion order.
+        """
+        futures = {self._executor.submit(self.get, engine, *chart): i for i, chart in enumerate(charts)}
+        for future in as_completed(futures):
+            yield futures[future], future
+
+
+_INSIGHT_SERVICE = None
+_INSIGHT_SERVICE_LOCK = threading.Lock()
+
+
+def get_insight_service() -> ChartInsightService:
+    """Process-wide service (and InsightCache) from the insights section of app_config.yaml."""
+    global _INSIGHT_SERVICE
+    with _INSIGHT_SERVICE_LOCK:
+        if _INSIGHT_SERVICE is None:
+            cfg = load_app_config().get('insights', {})
+            _INSIGHT_SERVICE = ChartInsightService(max_concurrency=cfg.get('max_concurrency', 4),
+                                                   cache=InsightCache(**cfg.get('cache', {})))
+        return _INSIGHT_SERVICE
@@ -0,0 +1,13 @@
+from pathlib import Path
+from typing import Dict, Any
+import yaml
+
+APP_CONFIG_PATH = Path(__file__).resolve().parent.parent / 'config' / 'app_config.yaml'
+
+
+def load_app_config() -> Dict[str, Any]:
+    """
+    Loads config/app_config.yaml, shared by the Flask backend and the LLM pipeline
+    """
+    with open(APP_CONFIG_PATH, 'r') as file:
+        return yaml.safe_load(file)
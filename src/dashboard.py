@@ -0,0 +1,382 @@
+import time
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from src.analytics_snapshot import SnapshotColumns, get_transaction_snapshot
+from src.datamodel.finance_db import FinanceDB, SQLQueryRepository, FinanceQueryName, ConnectionPool, month_range
+from src.insights_engine import enrich_with_forecast_and_anomalies
+
+logger = logging.getLogger(__name__)
+
+# This Module has the computations behind every dashboard panel.
+# Each panel function takes an open FinanceDB and returns the JSON payload of its endpoint,
+# so the single-panel endpoints and the combined /api/dashboard share one implementation.
+
+# Days of daily income/expense read once and shared by the income-vs-expenses and goal-forecast panels
+SHARED_DAILY_WINDOW_DAYS = 90
+
+DAY_NAMES = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+
+
+def _repo() -> SQLQueryRepository:
+    return SQLQueryRepository(queries_file='sql_queries.json')
+
+
+def _days_ago(days: int) -> str:
+    return (datetime.now().date() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _snapshot_columns(db: FinanceDB) -> Optional[SnapshotColumns]:
+    snapshot = get_transaction_snapshot()
+    return snapshot.get(db) if snapshot is not None else None
+
+
+def daily_income_vs_expense(db: FinanceDB, days: int) -> Union[List[Dict[str, Any]], pd.DataFrame]:
+    """
+    Daily income/expense totals for the last `days` days (the scan shared between panels).
+    A DataFrame when the analytics snapshot is enabled.
+    """
+    columns = _snapshot_columns(db)
+    if columns is not None:
+        return columns.daily_income_vs_expense(_days_ago(days))
+    return db.run_named_query(FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE, (_days_ago(days),))
+
+
+def income_vs_expenses_panel(db: FinanceDB, period: str = 'month',
+                             daily_rows: Union[List[Dict[str, Any]], pd.DataFrame, None] = None) -> Dict[str, Any]:
+    """
+    Daily income vs expenses with forecast and anomalies. `daily_rows` may be a wider
+    pre-fetched window of GET_DAILY_INCOME_VS_EXPENSE (rows or a snapshot DataFrame), it is trimmed to the period.
+    """
+    query = _repo().get_query(FinanceQueryName.GET_DAILY_INCOME_VS_EXPENSE)
+    if period == 'week':
+        start_date, horizon = _days_ago(7), 2
+    else:
+        start_date, horizon = _days_ago(30), 14
+    params = (start_date,)
+    granularity = "daily"
+
+    columns = _snapshot_columns(db) if daily_rows is None else None
+    if columns is not None:
+        # A DataFrame, it goes to the forecaster as is
+        raw_data = columns.daily_income_vs_expense(start_date)
+    elif daily_rows is None:
+        raw_data = db.run_query(query, params)
+    elif isinstance(daily_rows, pd.DataFrame):
+        raw_data = daily_rows[daily_rows['date'] >= start_date]
+    else:
+        raw_data = [row for row in daily_rows if row['date'] >= start_date]
+
+    enriched_data = enrich_with_forecast_and_anomalies(
+        data=raw_data,
+        date_key="date",
+        value_keys=("income", "expense"),
+        granularity=granularity,
+        horizon=horizon
+    )
+
+    return {
+        "data": enriched_data,
+        "insight_input": {
+            "chart_title": "Income Vs Expenses",
+            "sql_query": query,
+            "query_params": params,
+            "query_output": enriched_data
+        }
+    }
+
+
+def accounts_panel(db: FinanceDB) -> List[Dict[str, Any]]:
+    """
+    Accounts with this month's trend.
+    """
+    current_month_str = datetime.now().strftime('%Y-%m')
+
+    accounts = db.run_named_query(FinanceQueryName.GET_ALL_ACCOUNTS)  # List of dicts
+    activity = db.run_named_query(FinanceQueryName.GET_ACCOUNT_ACTIVITY_BY_MONTH, month_range(current_month_str))
+
+    # Convert activity to a dict for easier lookup
+    activity_map = {row['account_name'].lower(): row for row in activity}
+
+    enriched_accounts = []
+    for acc in accounts:
+        acc_dict = dict(acc)
+        name_key = acc_dict['name'].lower()
+
+        # Default activity
+        credits = 0.0
+        debits = 0.0
+
+        if name_key in activity_map:
+            credits = activity_map[name_key]['credits']
+            debits = activity_map[name_key]['debits']
+
+        # Calculate Net Change for this month based on account type
+        # Depository (Checking): Credits increase, Debits decrease
+        # Credit (Cards): Debits increase balance (debt), Credits decrease balance
+        if acc_dict['type'] == 'depository':
+            net_change = credits - debits
+        else:
+            net_change = debits - credits
+
+        current_balance = acc_dict['balance']
+        prev_balance = current_balance - net_change
+
+        if prev_balance == 0:
+            percent_change = 100.0 if current_balance != 0 else 0.0
+        else:
+            percent_change = ((current_balance - prev_balance) / prev_balance * 100)
+
+        # DEMO MODE: If trend is 0% (e.g. fresh DB), generate deterministic dummy data
+        if percent_change == 0:
+            # Create a seed from the account name
+            seed = sum(ord(c) for c in acc_dict['name'])
+            # Generate a float between 1.5 and 11.5
+            dummy_val = (seed % 100) / 10.0 + 1.5
+            # Flip sign based on seed parity to show variety
+            if seed % 2 == 1:
+                dummy_val = -dummy_val
+            percent_change = dummy_val
+
+        acc_dict['trend'] = percent_change
+        enriched_accounts.append(acc_dict)
+
+    return enriched_accounts
+
+
+def expense_summary_panel(db: FinanceDB, period: str = 'month') -> Dict[str, Any]:
+    """
+    Expenses by category, by day of the week and the top descriptions.
+    """
+    repo = _repo()
+    start_date_str = _days_ago(7) if period == 'week' else _days_ago(30)
+    params = (start_date_str,)
+
+    query_category = repo.get_query(FinanceQueryName.GET_EXPENSE_CATEGORY_SUMMARY_FILTERED)
+    query_day = repo.get_query(FinanceQueryName.GET_SPENDING_BY_DAY_OF_WEEK)
+    query_desc = repo.get_query(FinanceQueryName.GET_TOP_EXPENSE_DESCRIPTIONS)
+
+    # Daily spending always uses month start, ignoring the toggle
+    day_params = (_days_ago(30),)
+
+    columns = _snapshot_columns(db)
+    if columns is not None:
+        data_category = columns.expense_category_summary(start_date_str)
+        data_day = columns.spending_by_day_of_week(day_params[0])
+        data_desc = columns.top_expense_descriptions(start_date_str)
+    else:
+        data_category = db.run_query(query_category, params)
+        data_day = db.run_query(query_day, day_params)
+        data_desc = db.run_query(query_desc, params)
+
+    # Process day data to map 0-6 to names (0 is Sunday in strftime %w)
+    day_map = {int(row['day_index']): row['total'] for row in data_day}
+    processed_days = [{'day': DAY_NAMES[i], 'value': day_map.get(i, 0)} for i in range(7)]
+
+    insight_inputs = {
+        "by_category": {
+            "chart_title": "Expense by category",
+            "sql_query": query_category,
+            "query_params": params,
+            "query_output": data_category
+        },
+        "by_day": {
+            "chart_title": "Expense by day of the week",
+            "sql_query": query_day,
+            "query_params": day_params,
+            "query_output": processed_days
+        },
+        "top_descriptions": {
+            "chart_title": "Top 3 Expenses",
+            "sql_query": query_desc,
+            "query_params": params,
+            "query_output": data_desc
+        }
+    }
+
+    return {
+        "by_category": data_category,
+        "by_day": processed_days,
+        "top_descriptions": data_desc,
+        "insight_inputs": insight_inputs
+    }
+
+
+def budgets_panel(db: FinanceDB, month: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Budgets with the amount spent in `month` (YYYY-MM, defaults to the current month).
+    """
+    current_month = month or datetime.now().strftime('%Y-%m')
+
+    budgets = db.run_named_query(FinanceQueryName.GET_ALL_BUDGETS)
+    spending = db.run_named_query(FinanceQueryName.GET_MONTHLY_SPENDING_BY_CATEGORY, month_range(current_month))
+
+    spending_map = {row['category']: row['total'] for row in spending}
+
+    result = []
+    for b in budgets:
+        cat = b['category']
+        limit = b['amount_limit']
+        spent = spending_map.get(cat, 0)
+        if spent is None: spent = 0
+
+        result.append({
+            "id": b['id'],
+            "category": cat,
+            "limit": limit,
+            "spent": spent,
+            "percentage": min((spent / limit) * 100, 100) if limit > 0 else 0
+        })
+
+    return result
+
+
+def goals_panel(db: FinanceDB) -> List[Dict[str, Any]]:
+    goals = db.run_named_query(FinanceQueryName.GET_ALL_GOALS)
+
+    results = []
+    for g in goals:
+        g_dict = dict(g)
+        # Map saved_amount to current_amount for frontend compatibility
+        g_dict['current_amount'] = g_dict.pop('saved_amount', 0)
+        g_dict['id'] = str(g_dict['id'])
+        results.append(g_dict)
+
+    return results
+
+
+def goal_forecast_panel(db: FinanceDB, goal_id: Optional[str] = None,
+                        daily_rows: Union[List[Dict[str, Any]], pd.DataFrame, None] = None) -> Optional[Dict[str, Any]]:
+    """
+    Goal progress history and forecast from the last 90 days' savings rate. None if there is no goal.
+    `daily_rows` may carry the pre-fetched SHARED_DAILY_WINDOW_DAYS window.
+    """
+    if goal_id:
+        goals = db.run_named_query(FinanceQueryName.GET_GOAL_BY_ID, (goal_id,))
+    else:
+        goals = db.run_named_query(FinanceQueryName.GET_FIRST_GOAL)
+
+    if not goals:
+        return None
+
+    goal = dict(goals[0])
+    goal['current_amount'] = goal.pop('saved_amount', 0)
+    goal['id'] = str(goal['id'])
+
+    # 1. Calculate Actual Monthly Savings Rate from last 90 days
+    # Re-using the daily income/expense query to calculate aggregate savings
+    data_90 = daily_rows if daily_rows is not None else daily_income_vs_expense(db, SHARED_DAILY_WINDOW_DAYS)
+
+    if isinstance(data_90, pd.DataFrame):
+        total_income, total_expense = float(data_90['income'].sum()), float(data_90['expense'].sum())
+    else:
+        total_income = sum(d['income'] for d in data_90)
+        total_expense = sum(d['expense'] for d in data_90)
+    # Simple average monthly savings (90 days approx 3 months)
+    avg_monthly_savings = (total_income - total_expense) / 3
+
+    # 2. Generate Chart Data
+    chart_data = []
+    today = datetime.now()
+    target_date = datetime.strptime(goal['target_date'], "%Y-%m-%d")
+
+    # History (Simulated for the past 6 months to reach current_amount)
+    # We assume a somewhat linear progression to current amount for visualization
+    for i in range(6, -1, -1):
+        date = (today - relativedelta(months=i)).strftime("%Y-%m")
+        # Simulate history: Current - (Avg * i), but don't go below 0
+        simulated_past = max(0, goal['current_amount'] - (avg_monthly_savings * i))
+        chart_data.append({
+            "date": date,
+            "actual": int(simulated_past),
+            "forecast": None,
+            "ideal": None
+        })
+
+    # Future (Forecast vs Ideal)
+    months_left = (target_date.year - today.year) * 12 + target_date.month - today.month
+    months_left = max(1, months_left)
+
+    ideal_monthly_rate = (goal['target_amount'] - goal['current_amount']) / months_left
+
+    # Add the "Today" point to start the future lines
+    chart_data[-1]["forecast"] = goal['current_amount']
+    chart_data[-1]["ideal"] = goal['current_amount']
+
+    for i in range(1, months_left + 1):
+        future_date = (today + relativedelta(months=i)).strftime("%Y-%m")
+        forecast_val = goal['current_amount'] + (avg_monthly_savings * i)
+        ideal_val = goal['current_amount'] + (ideal_monthly_rate * i)
+
+        chart_data.append({
+            "date": future_date,
+            "actual": None,
+            "forecast": int(forecast_val),
+            "ideal": int(ideal_val)
+        })
+
+    insight_input = {
+        "chart_title": f"Goal Forecast: {goal['name']}",
+        "sql_query": "N/A (Derived from Aggregated Savings Rate)",
+        "query_params": {"goal": goal['name'], "current_savings_rate": round(avg_monthly_savings, 2)},
+        "query_output": {
+            "goal_target": goal['target_amount'],
+            "current_amount": goal['current_amount'],
+            "months_to_target": months_left,
+            "projected_amount_at_target_date": chart_data[-1]['forecast'],
+            "status": "On Track" if chart_data[-1]['forecast'] >= goal['target_amount'] else "At Risk"
+        }
+    }
+
+    return {"data": chart_data, "goal": goal, "insight_input": insight_input}
+
+
+class DashboardBuilder:
+    """
+    Computes every dashboard panel in one call. The daily income/expense window is scanned once
+    and shared, independent panels run concurrently, each on its own read-only pooled connection.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_workers: int = 4) -> None:
+        self.pool = pool
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard')
+
+    def build(self, period: str = 'month', month: Optional[str] = None,
+              goal_id: Optional[str] = None) -> Dict[str, Any]:
+        start = time.perf_counter()
+        timings = {}
+
+        def _timed(name, fn, *args):
+            def _run():
+                panel_start = time.perf_counter()
+                try:
+                    with FinanceDB(self.pool.db_path, pool=self.pool) as db:
+                        return fn(db, *args)
+                finally:
+                    timings[name] = round((time.perf_counter() - panel_start) * 1000, 2)
+            return self.executor.submit(_run)
+
+        daily = _timed('shared_daily_scan', daily_income_vs_expense, SHARED_DAILY_WINDOW_DAYS)
+        futures = {
+            'accounts': _timed('accounts', accounts_panel),
+            'budgets': _timed('budgets', budgets_panel, month),
+            'expense_summary': _timed('expense_summary', expense_summary_panel, period),
+            'goals': _timed('goals', goals_panel),
+        }
+
+        daily_rows = daily.result()
+        futures['income_vs_expenses'] = _timed('income_vs_expenses', income_vs_expenses_panel, period, daily_rows)
+        futures['goal_forecast'] = _timed('goal_forecast', goal_forecast_panel, goal_id, daily_rows)
+
+        result = {name: future.result() for name, future in futures.items()}
+        result['timings_ms'] = timings
+        result['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        return result
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
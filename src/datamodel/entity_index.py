@@ -0,0 +1,154 @@
+import re
+import bisect
+import itertools
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, RowFormat
+
+logger = logging.getLogger(__name__)
+
+# (original_text, column_name, table_name), the same shape as a global_search_index row
+EntityMatch = Tuple[str, str, str]
+
+
+class FuzzyEntityIndex:
+    """
+    In-memory index of the values global_search_index holds (descriptions, categories and
+    transaction types, account and goal names), a few hundred strings in practice.
+
+    lookup() ranks candidates like this:
+    1. exact (case-insensitive) match
+    2. every word of the term starts a word of the value, e.g. 'foods' -> 'whole foods market';
+       shorter values first, like bm25 favours short documents
+    3. trigram similarity (Dice) of at least `min_similarity`, which absorbs typos and plurals
+    prefix() lists values starting with a prefix from a sorted array.
+
+    refresh() re-reads the values and rebuilds the index only when they changed, so values of
+    renamed or deleted transactions, accounts and goals stop matching. EntityResolver calls it
+    whenever the transactions table_versions counter moves.
+    """
+
+    def __init__(self, min_similarity: float = 0.45) -> None:
+        self.min_similarity = min_similarity
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._entries: List[EntityMatch] = []
+        self._entry_words: List[List[str]] = []
+        self._entry_gram_counts: List[int] = []
+        self._keys: Dict[Tuple[str, str, str], int] = {}
+        self._by_text: Dict[str, List[int]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._words: Dict[str, Set[int]] = {}
+        self._sorted_texts: List[Tuple[str, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, original_text: str, column_name: str, table_name: str) -> None:
+        if not original_text:
+            return
+        key = (original_text, column_name, table_name)
+        with self._lock:
+            if key in self._keys:
+                return
+            entry_id = len(self._entries)
+            self._entries.append(key)
+            self._keys[key] = entry_id
+            text = original_text.lower()
+            grams, words = self._trigrams_of(text), self._words_of(text)
+            self._entry_words.append(words)
+            self._entry_gram_counts.append(len(grams))
+            self._by_text.setdefault(text, []).append(entry_id)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(entry_id)
+            for word in words:
+                self._words.setdefault(word[:3], set()).add(entry_id)
+            bisect.insort(self._sorted_texts, (text, entry_id))
+
+    def refresh(self, db: FinanceDB) -> int:
+        """
+        Reads the values of every transaction plus the account and goal names, and rebuilds the index
+        if they differ from the indexed ones. Returns how many values were added or removed.
+        """
+        max_id = db.run_named_query(FinanceQueryName.GET_MAX_TRANSACTION_ID)[0]['max_id'] or 0
+        rows = db.run_named_query(FinanceQueryName.GET_TRANSACTION_ENTITY_VALUES,
+                                  {'after_id': 0, 'up_to_id': max_id}, row_format=RowFormat.ROWS)['rows']
+        rows += db.run_named_query(FinanceQueryName.GET_OTHER_ENTITY_VALUES, row_format=RowFormat.ROWS)['rows']
+        # In query order, which decides the match among values that differ only in column
+        values = list(dict.fromkeys(tuple(row) for row in rows if row[0]))
+
+        with self._lock:
+            changed = len(set(values) ^ set(self._keys))
+            if changed:
+                self._clear()
+                for value in values:
+                    self.add(*value)
+        if changed:
+            logger.info(f'Entity index: {changed} values added or removed, {len(self._entries)} total')
+        return changed
+
+    def lookup(self, term: str) -> Optional[EntityMatch]:
+        text = term.strip().lower()
+        if not text:
+            return None
+        with self._lock:
+            exact = self._by_text.get(text)
+            if exact:
+                return self._entries[exact[0]]
+
+            best_id, best_score = None, 0.0
+            for entry_id in self._word_matches(text):
+                # 0.6 - 0.9: above any trigram-only score, shorter values first
+                score = 0.6 + 0.3 * len(text) / len(self._entries[entry_id][0])
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                grams = self._trigrams_of(text)
+                shared = Counter()
+                for gram in grams:
+                    shared.update(self._trigrams.get(gram, ()))
+                for entry_id, count in shared.items():
+                    dice = 2 * count / (len(grams) + self._entry_gram_counts[entry_id])
+                    if dice >= self.min_similarity and dice * 0.6 > best_score:
+                        best_id, best_score = entry_id, dice * 0.6
+
+            return self._entries[best_id] if best_id is not None else None
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[EntityMatch]:
+        text = prefix.strip().lower()
+        with self._lock:
+            start = bisect.bisect_left(self._sorted_texts, (text, -1))
+            matches = []
+            for value, entry_id in itertools.islice(self._sorted_texts, start, None):
+                if not value.startswith(text) or len(matches) >= limit:
+                    break
+                matches.append(self._entries[entry_id])
+            return matches
+
+    def _word_matches(self, text: str) -> Set[int]:
+        words = self._words_of(text)
+        if not words:
+            return set()
+        candidates = None
+        for word in words:
+            ids = {entry_id for entry_id in self._words.get(word[:3], ())
+                   if any(w.startswith(word) for w in self._entry_words[entry_id])}
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return candidates
+
+    @staticmethod
+    def _words_of(text: str) -> List[str]:
+        return re.findall(r'\w+', text)
+
+    @staticmethod
+    def _trigrams_of(text: str) -> Set[str]:
+        padded = f'  {text} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -0,0 +1,125 @@
+import re
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, RowFormat, SQLQueryRepository, ConnectionPool
+from src.datamodel.entity_index import FuzzyEntityIndex, EntityMatch
+
+logger = logging.getLogger(__name__)
+
+
+class EntityResolver:
+    """
+    Maps the entity names found in a question to values in the global_search_index FTS5 table.
+    All uncached terms are looked up in one UNION ALL query (one bm25-ranked subquery per term),
+    results (including misses) are kept in an LRU that is cleared when the transactions change.
+    With a FuzzyEntityIndex the lookups are answered in memory instead, and the index picks up
+    new values whenever the transactions change.
+    """
+
+    def __init__(self, pool: ConnectionPool, cache_size: int = 1024, index: FuzzyEntityIndex = None) -> None:
+        self.pool = pool
+        self.cache_size = cache_size
+        self.index = index
+        self._cache: 'OrderedDict[str, Optional[EntityMatch]]' = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def resolve(self, terms: List[str]) -> Dict[str, Optional[EntityMatch]]:
+        """
+        Best match per term (None when nothing matches), in the order of `terms`.
+        """
+        unique = list(dict.fromkeys(t.strip() for t in terms if t and t.strip()))
+        if not unique:
+            return {}
+
+        with FinanceDB(self.pool.db_path, pool=self.pool) as db:
+            version = db.get_table_version('transactions')
+            with self._lock:
+                if version is None or version != self._version:
+                    self._cache.clear()
+                    self._version = version
+                    if self.index is not None:
+                        self._refresh_index(db)
+                cached = {t: self._cache[t.lower()] for t in unique if t.lower() in self._cache}
+                for term in cached:
+                    self._cache.move_to_end(term.lower())
+
+            missing = [t for t in unique if t not in cached]
+            found = self._search(db, missing) if missing else {}
+
+        with self._lock:
+            for term in missing:
+                self._cache[term.lower()] = found.get(term)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return {t: cached[t] if t in cached else found.get(t) for t in unique}
+
+    def _refresh_index(self, db: FinanceDB) -> None:
+        try:
+            self.index.refresh(db)
+        except sqlite3.Error:
+            logger.exception('Failed to refresh the entity index, matching against the values it already has')
+
+    async def aresolve(self, terms: List[str]) -> Dict[str, Optional[EntityMatch]]:
+        """
+        resolve() on a worker thread, so it can overlap with other steps of an async pipeline.
+        """
+        return await asyncio.to_thread(self.resolve, terms)
+
+    @staticmethod
+    def describe(matches: Dict[str, Optional[EntityMatch]]) -> str:
+        """
+        The entity mapping text for the SQL prompt, one line per matched term.
+        """
+        return ''.join(f"'{term}' maps to database values: {[match]}\n"
+                       for term, match in matches.items() if match is not None)
+
+    @staticmethod
+    def fts_query(term: str) -> str:
+        """
+        The term as an FTS5 query: every word quoted (implicit AND), so punctuation such as
+        'at&t' or 'amazon.com' can't break the MATCH syntax.
+        """
+        return ' '.join(f'"{word}"' for word in re.findall(r'\w+', term.lower()))
+
+    def _search(self, db: FinanceDB, terms: List[str]) -> Dict[str, EntityMatch]:
+        if self.index is not None:
+            matches = {term: self.index.lookup(term) for term in terms}
+            return {term: match for term, match in matches.items() if match is not None}
+
+        queries = {term: self.fts_query(term) for term in terms}
+        queries = {term: query for term, query in queries.items() if query}
+        if not queries:
+            return {}
+
+        member = SQLQueryRepository().get_query(FinanceQueryName.ENTITY_FULLTEXT_SEARCH_TERM)
+        members, params = [], {}
+        for i, (term, query) in enumerate(queries.items()):
+            members.append(member.replace(':term', f':term{i}').replace(':value', f':value{i}'))
+            params[f'term{i}'], params[f'value{i}'] = term, query
+
+        try:
+            rows = db.run_query(' UNION ALL '.join(members), params, row_format=RowFormat.ROWS)['rows']
+        except sqlite3.Error:
+            logger.exception(f'Batched entity search failed for {list(queries)}, retrying term by term')
+            return self._search_each(db, queries)
+        return {term: (text, column, table) for term, text, column, table in rows}
+
+    def _search_each(self, db: FinanceDB, queries: Dict[str, str]) -> Dict[str, EntityMatch]:
+        member = SQLQueryRepository().get_query(FinanceQueryName.ENTITY_FULLTEXT_SEARCH_TERM)
+        found = {}
+        for term, query in queries.items():
+            try:
+                rows = db.run_query(member, {'term': term, 'value': query}, row_format=RowFormat.ROWS)['rows']
+            except sqlite3.Error as e:
+                logger.error(f"Entity search failed for '{term}': {e}")
+                continue
+            if rows:
+                found[term] = tuple(rows[0][1:])
+        return found
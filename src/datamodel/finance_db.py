@@ -1,7 +1,11 @@
 import sqlite3
+import base64
 import logging
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import List, Any, Dict, Optional, Union
+from typing import List, Any, Dict, Optional, Union, Callable, Iterator, Tuple
 import json
 
 logger = logging.getLogger(__name__)
@@ -15,6 +19,9 @@ class FinanceQueryName:
     GET_ALL_TRANSACTIONS = 'get_all_transactions'
     GET_TRANSACTIONS_PAGINATED = 'get_transactions_paginated'
     GET_TOTAL_TRANSACTIONS_COUNT = 'get_total_transactions_count'
+    GET_TRANSACTIONS_KEYSET_FIRST = 'get_transactions_keyset_first'
+    GET_TRANSACTIONS_KEYSET_AFTER = 'get_transactions_keyset_after'
+    GET_TRANSACTIONS_STREAM = 'get_transactions_stream'
     GET_MONTHLY_INCOME_VS_EXPENSE = 'get_monthly_income_vs_expense'
     GET_WEEKLY_INCOME_VS_EXPENSE = 'get_weekly_income_vs_expense'
     GET_DAILY_INCOME_VS_EXPENSE = 'get_daily_income_vs_expense'
@@ -31,6 +38,8 @@ class FinanceQueryName:
     # Goals
     GET_ALL_GOALS = 'get_all_goals'
     GET_GOAL_BY_NAME = 'get_goal_by_name'
+    GET_GOAL_BY_ID = 'get_goal_by_id'
+    GET_FIRST_GOAL = 'get_first_goal'
     CREATE_GOAL = 'create_goal'
     UPDATE_GOAL_SAVED_AMOUNT = 'update_goal_saved_amount'
     UPDATE_GOAL_STATUS = 'update_goal_status'
@@ -46,6 +55,30 @@ class FinanceQueryName:
     # Analytics
     GET_MONTHLY_SPENDING_BY_CATEGORY = 'get_monthly_spending_by_category'
 
+    # Change tracking
+    GET_TABLE_VERSION = 'get_table_version'
+
+    # Entity search (global_search_index)
+    ENTITY_FULLTEXT_SEARCH = 'entity_db_fulltext_search'
+    ENTITY_FULLTEXT_SEARCH_TERM = 'entity_fulltext_search_term'
+    GET_MAX_TRANSACTION_ID = 'get_max_transaction_id'
+    GET_TRANSACTION_ENTITY_VALUES = 'get_transaction_entity_values'
+    GET_OTHER_ENTITY_VALUES = 'get_other_entity_values'
+
+
+class RowFormat:
+    """
+    Shapes that FinanceDB.run_query can return SELECT results in
+    """
+    # List of dicts, one per row (default)
+    DICT = 'dict'
+    # {'columns': [...], 'rows': [(...), ...]}: column names once, row values as tuples
+    ROWS = 'rows'
+    # {'columns': [...], 'values': [(...), ...]}: one tuple of values per column
+    COLUMNAR = 'columnar'
+
+    ALL = (DICT, ROWS, COLUMNAR)
+
 
 class SQLQueryRepository:
     """
@@ -53,24 +86,41 @@ class SQLQueryRepository:
     This is a Singleton Class.
     """
     _instance = None
+    _instance_lock = threading.Lock()
+    QUERY_FOLDER = Path(__file__).resolve().parent / 'queries'
 
     def __new__(cls, examples_file: str = None, queries_file: str = None):
         if cls._instance is None:
-            cls._instance = super(SQLQueryRepository, cls).__new__(cls)
-            cls._instance._initialize(examples_file, queries_file)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    # Only publish the instance once it is fully loaded, request threads may race here
+                    instance = super(SQLQueryRepository, cls).__new__(cls)
+                    instance._initialize(examples_file, queries_file)
+                    cls._instance = instance
         return cls._instance
 
+    @classmethod
+    def reload(cls, examples_file: str = None, queries_file: str = None) -> 'SQLQueryRepository':
+        """
+        Re-reads the queries and examples files into the singleton, e.g. after they were edited.
+        """
+        instance = cls(examples_file, queries_file)
+        with cls._instance_lock:
+            instance._initialize(examples_file, queries_file)
+        return instance
+
     def _initialize(self, examples_file: str, queries_file: str) -> None:
         if queries_file is None:
             raise ValueError('Queries file name must be provided on the first instantiation.')
 
-        query_folder_path = Path(__file__).resolve().parent / 'queries'
-        self.queries = self._load_json(query_folder_path / queries_file)
-        
-        if examples_file:
-            self.examples = self._load_json(query_folder_path / examples_file)
-        else:
-            self.examples = []
+        query_folder_path = self.QUERY_FOLDER
+        queries = self._load_json(query_folder_path / queries_file)
+        examples = self._load_json(query_folder_path / examples_file) if examples_file else []
+
+        self.queries = queries
+        # Classify once at load time instead of string-sniffing the SQL on every run
+        self.read_queries = {name for name, query in queries.items() if self._is_read_statement(query)}
+        self.examples = examples
 
     def get_query(self, query_name: str) -> str:
         """
@@ -82,9 +132,20 @@ class SQLQueryRepository:
             logger.error(f'Query: {query_name} not found in the repository.')
             raise KeyError(f'Query: {query_name} not found in the repository.')
 
+    def is_read_query(self, query_name: str) -> bool:
+        """
+        True if the named query returns rows (SELECT / WITH / PRAGMA), False for writes.
+        """
+        return query_name in self.read_queries
+
     def getExamples(self) -> List[Dict[str, str]]:
         return self.examples
 
+    @staticmethod
+    def _is_read_statement(query: str) -> bool:
+        first_keyword = query.lstrip(' \t\n(').split(None, 1)[0].upper() if query.strip() else ''
+        return first_keyword in ('SELECT', 'WITH', 'PRAGMA', 'VALUES', 'EXPLAIN')
+
     def _load_json(self, file_path: Path) -> Any:
         try:
             with open(file_path, 'r') as file:
@@ -95,40 +156,358 @@ class SQLQueryRepository:
             raise e
 
 
+class PooledConnection:
+    """
+    Bookkeeping wrapper around a pooled sqlite3 connection (age and use count for recycling)
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of long-lived SQLite connections.
+    Connections are opened lazily up to `size`, put in WAL mode with the tuned pragmas,
+    health checked when borrowed and recycled after `max_lifetime` seconds or `max_uses` borrows.
+    A `readonly` pool opens the file with mode=ro and query_only, for concurrent readers.
+    """
+
+    def __init__(self, db_path: str, size: int = 8, timeout: float = 10.0,
+                 cache_size: int = -16000, mmap_size: int = 268435456,
+                 max_lifetime: float = 3600.0, max_uses: int = 10000,
+                 cached_statements: int = 256, readonly: bool = False) -> None:
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.max_lifetime = max_lifetime
+        self.max_uses = max_uses
+        self.cached_statements = cached_statements
+        self.readonly = readonly
+
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        # Signalled whenever a connection is returned or a slot frees up, with _lock held
+        self._available = threading.Condition(self._lock)
+        self._in_use: Dict[int, PooledConnection] = {}
+        self._opened = 0
+        self._closed = False
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Borrow a connection, blocking up to `timeout` seconds when all connections are in use.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            pooled = self._checkout(deadline)
+            if pooled is None:
+                pooled = self._open()
+            elif self._is_expired(pooled) or not self._is_healthy(pooled):
+                self._discard(pooled)
+                continue
+
+            pooled.uses += 1
+            with self._lock:
+                self._in_use[id(pooled.conn)] = pooled
+            return pooled.conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Return a borrowed connection. Any open transaction is rolled back before it is reused.
+        """
+        with self._lock:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            conn.close()
+            return
+
+        if self._closed:
+            self._discard(pooled)
+            return
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f'Dropping pooled SQLite connection after failed rollback: {e}')
+            self._discard(pooled)
+            return
+
+        with self._available:
+            self._idle.put_nowait(pooled)
+            self._available.notify()
+
+    def close(self) -> None:
+        """
+        Close idle connections. Borrowed connections are closed when they are released.
+        """
+        with self._available:
+            self._closed = True
+            self._available.notify_all()
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def _checkout(self, deadline: float) -> Optional[PooledConnection]:
+        """
+        An idle connection, or None once a slot is reserved for a new one. Waits for either until `deadline`.
+        """
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f'Connection pool for {self.db_path} is closed.')
+                try:
+                    return self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+                if self._opened < self.size:
+                    self._opened += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'No SQLite connection available for {self.db_path} after {self.timeout}s')
+                self._available.wait(remaining)
+
+    def _open(self) -> PooledConnection:
+        try:
+            return PooledConnection(self._connect())
+        except Exception:
+            self._free_slot()
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 keeps an LRU of prepared statements per connection, keyed by SQL text. Sizing it above
+        # the number of repository queries keeps every named query compiled for the connection lifetime.
+        if self.readonly:
+            conn = sqlite3.connect(f'{Path(self.db_path).resolve().as_uri()}?mode=ro', uri=True, timeout=self.timeout,
+                                   check_same_thread=False, cached_statements=self.cached_statements)
+            conn.execute('PRAGMA query_only=ON')
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                                   cached_statements=self.cached_statements)
+            # WAL lets readers run alongside the writer, it is persisted in the database file
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size={int(self.cache_size)}')
+        conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def _is_expired(self, pooled: PooledConnection) -> bool:
+        if self.max_lifetime and time.monotonic() - pooled.created_at > self.max_lifetime:
+            return True
+        return bool(self.max_uses) and pooled.uses >= self.max_uses
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        try:
+            pooled.conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f'Pooled SQLite connection failed health check: {e}')
+            return False
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        try:
+            pooled.conn.close()
+        except sqlite3.Error:
+            pass
+        self._free_slot()
+
+    def _free_slot(self) -> None:
+        # Wakes a waiter, which can now open a connection in place of the dropped one
+        with self._available:
+            self._opened -= 1
+            self._available.notify()
+
+
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(db_path: str, readonly: bool = False, **pool_options: Any) -> ConnectionPool:
+    """
+    Returns the process-wide pool for `db_path` (one read-write and one read-only per file),
+    creating it with `pool_options` on first use.
+    """
+    key = f"{Path(db_path).resolve()}{'?mode=ro' if readonly else ''}"
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(str(db_path), readonly=readonly, **pool_options)
+            _POOLS[key] = pool
+        return pool
+
+
+def month_range(month: str) -> Tuple[str, str]:
+    """
+    'YYYY-MM' -> ('YYYY-MM-01', first day of the next month), for sargable `date >= ? AND date < ?` filters.
+    """
+    year, mon = (int(part) for part in month.split('-')[:2])
+    next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return f'{year:04d}-{mon:02d}-01', f'{next_year:04d}-{next_mon:02d}-01'
+
+
+def encode_cursor(date: str, row_id: int) -> str:
+    """
+    Opaque keyset pagination token for the last (date, id) returned to the client.
+    """
+    raw = json.dumps([date, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[str, int]:
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        date, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(date), int(row_id)
+    except Exception:
+        raise ValueError(f'Invalid pagination cursor: {token}')
+
+
+class TableVersionCache:
+    """
+    Caches one value derived from a table until the table's change counter (table_versions) moves.
+    Databases without change tracking fall back to recomputing on every call.
+    """
+
+    def __init__(self, table: str, compute: Callable[['FinanceDB'], Any]) -> None:
+        self.table = table
+        self.compute = compute
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+
+    def get(self, db: 'FinanceDB') -> Any:
+        version = db.get_table_version(self.table)
+        with self._lock:
+            if version is not None and version == self._version:
+                return self._value
+
+        value = self.compute(db)
+        with self._lock:
+            self._version, self._value = version, value
+        return value
+
+
 class FinanceDB:
     """
-    This Class is used to perform CRUD operations on SQLite Database
+    This Class is used to perform CRUD operations on SQLite Database.
+    When a ConnectionPool is passed the connection is borrowed from it instead of opened per use.
     """
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(self, db_path: str, pool: Optional[ConnectionPool] = None) -> None:
         self.db_path = db_path
+        self.pool = pool
         self.conn = None
 
     def close(self):
         if self.conn:
-            self.conn.close()
+            if self.pool is not None:
+                self.pool.release(self.conn)
+            else:
+                self.conn.close()
+            self.conn = None
 
     # Context Management 
     def __enter__(self):
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            # Set row_factory to sqlite3.Row to allow dictionary-like access
-            self.conn.row_factory = sqlite3.Row
+            if self.pool is not None:
+                self.conn = self.pool.acquire()
+            else:
+                self.conn = sqlite3.connect(self.db_path)
+                # Set row_factory to sqlite3.Row to allow dictionary-like access
+                self.conn.row_factory = sqlite3.Row
         except Exception as e:
+            # Raised, a pool timeout must reach the caller rather than a FinanceDB without a connection
             logger.error(f'Failed to initialize SQLite DB {e}')
+            raise
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
 
-    def run_query(self, query: str, parameters: Union[Dict[str, Any], List[Any], tuple] = None) -> List[Dict[str, Any]]:
+    def run_query(self, query: str, parameters: Union[Dict[str, Any], List[Any], tuple] = None,
+                  row_format: str = RowFormat.DICT) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         with self.conn:
-            cursor = self.conn.cursor()
-            if parameters:
-                cursor.execute(query, parameters)
-            else:
-                cursor.execute(query)
-            
-            if query.strip().upper().startswith('SELECT'):
-                return [dict(row) for row in cursor.fetchall()]
-            return []
\ No newline at end of file
+            return self._execute(query, parameters, row_format)
+
+    def run_named_query(self, query_name: str, parameters: Union[Dict[str, Any], List[Any], tuple] = None,
+                        row_format: str = RowFormat.DICT) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Runs a query from the SQLQueryRepository by its FinanceQueryName.
+        The repository hands back the same SQL string on every call, so the statement compiled
+        the first time is reused from the connection's statement cache.
+        """
+        repo = SQLQueryRepository()
+        query = repo.get_query(query_name)
+        if repo.is_read_query(query_name):
+            # Reads need no commit/rollback around them
+            return self._execute(query, parameters, row_format)
+        return self.run_query(query, parameters, row_format)
+
+    def iter_query(self, query: str, parameters: Union[Dict[str, Any], List[Any], tuple] = None,
+                   batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Yields rows as dicts while fetching `batch_size` rows at a time, so large result sets
+        are never fully materialised. The connection must stay open while the generator is consumed.
+        """
+        cursor = self.conn.cursor()
+        if parameters:
+            cursor.execute(query, parameters)
+        else:
+            cursor.execute(query)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+
+    def get_table_version(self, table: str) -> Optional[int]:
+        """
+        Change counter maintained by the table_versions triggers, None if change tracking is not installed.
+        """
+        try:
+            rows = self.run_named_query(FinanceQueryName.GET_TABLE_VERSION, (table,))
+        except sqlite3.OperationalError:
+            return None
+        return rows[0]['version'] if rows else None
+
+    def _execute(self, query: str, parameters: Union[Dict[str, Any], List[Any], tuple],
+                 row_format: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        cursor = self.conn.cursor()
+        if row_format != RowFormat.DICT:
+            # Plain tuples straight from the C layer, skips building a sqlite3.Row / dict per row
+            cursor.row_factory = None
+        if parameters:
+            cursor.execute(query, parameters)
+        else:
+            cursor.execute(query)
+
+        # Statements that return rows always have a description, writes never do
+        if cursor.description is None:
+            return [] if row_format == RowFormat.DICT else self._shape([], [], row_format)
+        return self._shape(cursor.description, cursor.fetchall(), row_format)
+
+    @staticmethod
+    def _shape(description, rows: List[Any], row_format: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        if row_format == RowFormat.DICT:
+            return [dict(row) for row in rows]
+
+        columns = [col[0] for col in description]
+        if row_format == RowFormat.ROWS:
+            return {'columns': columns, 'rows': rows}
+        if row_format == RowFormat.COLUMNAR:
+            values = list(zip(*rows)) if rows else [() for _ in columns]
+            return {'columns': columns, 'values': values}
+        raise ValueError(f'Unsupported row format: {row_format}')
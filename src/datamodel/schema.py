@@ -0,0 +1,109 @@
+import sqlite3
+import logging
+import hashlib
+from pathlib import Path
+from typing import Any, List
+import json
+
+logger = logging.getLogger(__name__)
+
+
+def transaction_row_hash(date: Any, description: Any, amount: Any, account_name: Any, ordinal: int) -> str:
+    """
+    Content hash identifying a transaction across imports: (date, description, amount, account) plus its
+    ordinal among identical rows, so two same-day coffees of the same price stay two transactions.
+    """
+    if isinstance(amount, (int, float)):
+        amount = f"{amount:.2f}"
+    key = '\x1f'.join('' if v is None else str(v) for v in (date, description, amount, account_name, ordinal))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SchemaManager:
+    """
+    Applies the auxiliary schema objects stored in queries/sql_schema.json (change tracking, rollups, indexes)
+    on top of the tables created by scripts/setup_sqlite.py. Every statement is idempotent.
+    """
+
+    ROW_HASHES = 'row_hashes'
+    ROW_HASHES_BACKFILL = 'row_hashes_backfill'
+    CHANGE_TRACKING = 'change_tracking'
+    ROLLUPS = 'rollups'
+    ROLLUPS_REBUILD = 'rollups_rebuild'
+    INDEXES = 'indexes'
+
+    def __init__(self, schema_file: str = 'sql_schema.json') -> None:
+        file_path = Path(__file__).resolve().parent / 'queries' / schema_file
+        with open(file_path, 'r') as file:
+            self.schema = json.load(file)
+
+    def install_row_hashes(self, conn: sqlite3.Connection) -> None:
+        """
+        Creates transaction_hashes (transaction_row_hash of every transaction, keyed by its id) and
+        import_state, which scripts/import_statements.py relies on to skip rows it has already imported.
+        The hashes live outside transactions so they never show up in its queries or in the LLM's schema.
+        """
+        self._apply(conn, self.ROW_HASHES)
+        if conn.execute("SELECT 1 FROM transactions WHERE NOT EXISTS (SELECT 1 FROM transaction_hashes "
+                        "WHERE transaction_hashes.transaction_id = transactions.id) LIMIT 1").fetchone():
+            conn.create_function('finance_row_hash', 5, transaction_row_hash, deterministic=True)
+            self._apply(conn, self.ROW_HASHES_BACKFILL)
+
+    def install_change_tracking(self, conn: sqlite3.Connection) -> None:
+        """
+        Creates table_versions and the triggers that bump the transactions version on every write.
+        """
+        self._apply(conn, self.CHANGE_TRACKING)
+
+    def install_rollups(self, conn: sqlite3.Connection) -> None:
+        """
+        Creates daily_rollups (day x category x account x transaction_type totals) and the triggers
+        that keep it in step with every insert, update and delete on transactions.
+        The table is backfilled the first time it is created. NULL dimensions are stored as '', so the
+        queries reading it report a NULL category (or date, account) as '', together with the '' ones.
+        """
+        exists = self._table_exists(conn, 'daily_rollups')
+        self._apply(conn, self.ROLLUPS)
+        if not exists:
+            self.rebuild_rollups(conn)
+
+    def rebuild_rollups(self, conn: sqlite3.Connection) -> None:
+        """
+        Recomputes daily_rollups from scratch, e.g. after a bulk load done without the triggers.
+        """
+        self._apply(conn, self.ROLLUPS_REBUILD)
+
+    def create_indexes(self, conn: sqlite3.Connection) -> None:
+        """
+        Creates the composite / covering indexes used by the named queries in sql_queries.json.
+        Statistics are gathered once so the planner can choose between them.
+        """
+        self._apply(conn, self.INDEXES)
+        if not self._table_exists(conn, 'sqlite_stat1'):
+            with conn:
+                conn.execute('ANALYZE')
+
+    def upgrade(self, conn: sqlite3.Connection) -> None:
+        """
+        Brings an existing finance.db up to date with every schema section.
+        """
+        if not self._table_exists(conn, 'transactions'):
+            logger.warning('transactions table not found, skipping schema upgrade.')
+            return
+        # First, so a fresh load is hashed before the change tracking triggers exist
+        self.install_row_hashes(conn)
+        self.install_change_tracking(conn)
+        self.install_rollups(conn)
+        self.create_indexes(conn)
+
+    def _apply(self, conn: sqlite3.Connection, section: str) -> None:
+        statements: List[str] = self.schema[section]
+        with conn:
+            for statement in statements:
+                conn.execute(statement)
+        logger.info(f"Applied {len(statements)} '{section}' schema statements.")
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        return row is not None
@@ -0,0 +1,129 @@
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.config import APP_CONFIG_PATH, load_app_config
+from src.datamodel.finance_db import SQLQueryRepository
+from src.finance_sql_pipeline import SQLFinanceQuery
+from src.pipeline.abstract_query_engine import PromptRepository
+
+logger = logging.getLogger(__name__)
+
+# This Module has the following:
+# EngineRegistry: one SQLFinanceQuery (DB handle, LLM client, compiled chain) shared by all request threads,
+# rebuilt when app_config.yaml or the prompt / query files change
+# get_engine_registry: the process-wide registry
+
+
+class EngineRegistry:
+    """
+    Holds the SQLFinanceQuery used by every request. Building one reads the config, reflects the
+    database and creates the LLM client, so it is done once and the compiled chain is reused;
+    chains are stateless and safe to invoke from many threads.
+
+    Every `check_interval` seconds get_engine() compares the mtimes of the watched files and,
+    when one changed, reloads the repositories and swaps in a new engine. Requests already
+    running keep the engine they started with. If a rebuild fails the previous engine stays.
+    """
+
+    def __init__(self, engine_factory: Callable[[], SQLFinanceQuery] = SQLFinanceQuery,
+                 check_interval: float = 2.0, hot_reload: bool = True) -> None:
+        self.engine_factory = engine_factory
+        self.check_interval = check_interval
+        self.hot_reload = hot_reload
+        self._engine: Optional[SQLFinanceQuery] = None
+        self._mtimes: Dict[Path, int] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get_engine(self) -> SQLFinanceQuery:
+        engine = self._engine
+        if engine is None:
+            return self.reload(only_if_missing=True)
+        if self.hot_reload and time.monotonic() - self._last_check >= self.check_interval:
+            self._last_check = time.monotonic()
+            if self._mtimes != self._snapshot():
+                engine = self.reload()
+        return engine
+
+    def reload(self, only_if_missing: bool = False) -> SQLFinanceQuery:
+        """
+        Re-reads config, prompts and queries and builds a new engine with its chain compiled.
+        """
+        with self._lock:
+            if only_if_missing and self._engine is not None:
+                return self._engine
+
+            mtimes = self._snapshot()
+            try:
+                engine = self._build()
+            except Exception:
+                if self._engine is None:
+                    raise
+                logger.exception('Failed to rebuild the query engine, keeping the previous one')
+                self._mtimes = mtimes  # don't retry until the files change again
+                return self._engine
+
+            if self._engine is not None:
+                logger.info('Query engine reloaded')
+            self._engine = engine
+            self._mtimes = mtimes
+            self._last_check = time.monotonic()
+            return engine
+
+    def warm_up(self) -> bool:
+        """
+        Builds the engine ahead of the first request. Returns False (and logs) if that fails,
+        e.g. without LLM credentials, in which case the first request retries.
+        """
+        try:
+            self.get_engine()
+            return True
+        except Exception as e:
+            logger.warning(f'Query engine not built at startup: {e}')
+            return False
+
+    def _build(self) -> SQLFinanceQuery:
+        sqlite_cfg = load_app_config()['db']['sqlite']
+        PromptRepository.reload(sqlite_cfg['prompts_file'])
+        SQLQueryRepository.reload(examples_file=sqlite_cfg['examples_file'], queries_file=sqlite_cfg['queries_file'])
+
+        engine = self.engine_factory()
+        engine.build_chains()
+        return engine
+
+    def _watched_files(self) -> List[Path]:
+        files = [APP_CONFIG_PATH]
+        try:
+            sqlite_cfg = load_app_config()['db']['sqlite']
+        except Exception:
+            return files  # a half-written config shows up as an mtime change once it is complete
+        files.append(PromptRepository.PROMPT_FOLDER / sqlite_cfg['prompts_file'])
+        files.append(SQLQueryRepository.QUERY_FOLDER / sqlite_cfg['queries_file'])
+        files.append(SQLQueryRepository.QUERY_FOLDER / sqlite_cfg['examples_file'])
+        return files
+
+    def _snapshot(self) -> Dict[Path, int]:
+        mtimes = {}
+        for path in self._watched_files():
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+
+_REGISTRY = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_engine_registry() -> EngineRegistry:
+    """Process-wide registry configured by the pipeline section of app_config.yaml."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = EngineRegistry(**load_app_config().get('pipeline', {}))
+        return _REGISTRY
@@ -1,21 +1,29 @@
 from pathlib import Path
-from typing import Dict, Any, List
-import yaml
+from typing import Dict, Any, List, Callable, AsyncIterator
+import os
+import asyncio
 import logging
+import threading
 import json
 
 from langchain_community.utilities import SQLDatabase
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_core.prompts import ChatPromptTemplate, FewShotChatMessagePromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.utils.function_calling import convert_to_openai_function
 from langchain.callbacks.tracers import ConsoleCallbackHandler
 from langchain_core.messages import AIMessage
+from langchain_core.language_models import BaseChatModel
 from pydantic import BaseModel, Field
 
 from src.pipeline.llm import LLMFactory
 from src.pipeline.abstract_query_engine import AbstractQueryEngine, PromptRepository
-from src.datamodel.finance_db import SQLQueryRepository
+from src.datamodel.finance_db import SQLQueryRepository, get_connection_pool
+from src.datamodel.entity_resolver import EntityResolver
+from src.datamodel.entity_index import FuzzyEntityIndex
+from src.config import load_app_config
+from src.question_cache import QuestionCache, get_question_cache
+from src.insight_digest import PayloadDigester
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,15 +38,43 @@ class Entities(BaseModel):
     )
 
 
+class VersionedCache:
+    """
+    Caches one computed value until `version()` returns something different.
+    """
+
+    def __init__(self, version: Callable[[], Any], compute: Callable[[], Any]) -> None:
+        self.version = version
+        self.compute = compute
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+
+    def get(self) -> Any:
+        version = self.version()
+        with self._lock:
+            if version is not None and version == self._version:
+                return self._value
+
+        value = self.compute()
+        with self._lock:
+            self._version, self._value = version, value
+        return value
+
+
 class SQLFinanceQuery(AbstractQueryEngine):
     """
     FinanceQuery pipeline which uses SQLite database as the backend
     """
 
-    def __init__(self) -> None:
+    # Where setup_sqlite.py creates the database
+    DB_PATH = Path(__file__).resolve().parent.parent / 'data' / 'personal_finance' / 'finance.db'
+
+    def __init__(self, llm: BaseChatModel = None, cache_prompt_context: bool = True,
+                 question_cache: QuestionCache = None) -> None:
         self.config = self._load_config()
         self.db = self._load_db()
-        self.llm = LLMFactory().get_LLM(
+        self.llm = llm or LLMFactory().get_LLM(
             llm_provider=self.config['use_llm'],
             cfg=self.config['llm'][self.config['use_llm']]
         )
@@ -50,7 +86,24 @@ class SQLFinanceQuery(AbstractQueryEngine):
             examples_file=self.config['db']['sqlite']['examples_file'],
             queries_file=self.config['db']['sqlite']['queries_file']
         )
-        self.chain = None
+        self.entity_resolver = self._load_entity_resolver()
+        self.insight_digester = self._load_insight_digester()
+        self.sql_chain = None
+        self.answer_chain = None
+        # The stages astream_ask() runs one at a time, so each can be reported as it finishes
+        self.ner_chain = None
+        self.sql_writer = None
+        self.response_writer = None
+        # Shared by every engine so cached SQL survives EngineRegistry reloads
+        self.question_cache = question_cache if question_cache is not None else get_question_cache()
+
+        # The schema text reflects the database and the examples render every few-shot example,
+        # neither changes between questions unless the schema or the examples file does
+        self.cache_prompt_context = cache_prompt_context
+        self._examples_mtime = self._examples_file_mtime()
+        self._db_schema_version = self._schema_version()
+        self._schema_cache = VersionedCache(self._schema_version, self._table_info)
+        self._examples_cache = VersionedCache(self._examples_version, self._render_examples)
 
     # Step 1: Named Entity Recognition
     def prepare_ner_chain(self):
@@ -64,32 +117,31 @@ class SQLFinanceQuery(AbstractQueryEngine):
 
     # Step 2: Matching Entities with Database Values
     def map_to_database(self, values: List[str]) -> str:
-        match_query = self.query_repo.get_query('entity_db_fulltext_search')
-        result = ""
-        for value in values:
-            try:
-                # self.db.run can execute a query with parameters
-                response = self.db.run(match_query, parameters={"value": value})
-                if response:
-                    result += f"'{value}' maps to database values: {response}\n"
-            except Exception as e:
-                logger.warning(f"Failed to map entity {value}: {e}")
-                pass
-        return result
+        # All entities in one FTS5 query, repeated terms come from the resolver's cache
+        return self.entity_resolver.describe(self.entity_resolver.resolve(values))
+
+    async def amap_to_database(self, values: List[str]) -> str:
+        return self.entity_resolver.describe(await self.entity_resolver.aresolve(values))
 
 
     # Step 3: Prepare SQL query based on identified entities and db match
     def prepare_db_query_response(self, entity_chain):
-
-        # 1. Few-shot Examples - pull examples from the repository
-        example_prompt = ChatPromptTemplate.from_messages(
-            [(self.HUMAN_MESSAGE, "{question}"), (self.SYSTEM_MESSAGE, "{query}")]
+        sql_response = (
+                RunnablePassthrough.assign(names=entity_chain)
+                | RunnablePassthrough.assign(
+            entities_list=RunnableLambda(
+                lambda x: self.map_to_database(self._extract_names(x['names'])),
+                afunc=self._amap_entities
+            ),
+            schema=lambda _: self.get_schema_text()) # CREATE TABLE statements, cached per schema version
+                | self.prepare_sql_writer()
         )
+        return sql_response
 
-        few_shot_prompt = FewShotChatMessagePromptTemplate(
-            examples=self.query_repo.getExamples(),
-            example_prompt=example_prompt,
-        )
+    # Step 3 on its own: {"question", "entities_list", "schema"} -> SQL query
+    def prepare_sql_writer(self):
+
+        # 1. Few-shot Examples - rendered from the repository by get_examples_text
 
         # 2. Create Prompt
         # Note: Ensure 'sqlPrompt' key exists in your sql_prompts.json
@@ -97,38 +149,42 @@ class SQLFinanceQuery(AbstractQueryEngine):
         sql_prompt = ChatPromptTemplate.from_messages([(self.SYSTEM_MESSAGE, system), (self.HUMAN_MESSAGE, human)])
 
         # 3. Prepare chain
-        sql_response = (
-                RunnablePassthrough.assign(names=entity_chain)
-                | RunnablePassthrough.assign(
-            entities_list=lambda x: self.map_to_database(self._extract_names(x['names'])),
-            schema=lambda _: self.db.get_table_info()) # LangChain method to get CREATE TABLE statements
-                | RunnablePassthrough.assign(
-            examples=lambda _: few_shot_prompt.format()
+        sql_writer = (
+                RunnablePassthrough.assign(
+            examples=lambda _: self.get_examples_text()
         )
                 | sql_prompt
                 | self.llm.bind(stop=["\nSQLResult:"])
                 | self._clean_sql_output
         )
-        return sql_response
+        return sql_writer
 
     # Step 4. Validate SQL and Create Final Response
     def prepare_response_chain(self, sql_response):
-        system, human = self.prompt_repo.get_response_prompt()
-        response_prompt = ChatPromptTemplate.from_messages(
-            [(self.SYSTEM_MESSAGE, system), (self.HUMAN_MESSAGE, human)]
+        chain = (
+                RunnablePassthrough.assign(query=sql_response)
+                | self.prepare_answer_chain()
         )
+        return chain
 
+    # Step 4 on its own: runs an already generated {"question", "query"} and words the answer
+    def prepare_answer_chain(self):
         chain = (
-                RunnablePassthrough.assign(query=sql_response)
-                | RunnablePassthrough.assign(
+                RunnablePassthrough.assign(
             response=lambda x: self.db.run(x["query"]),
         )
-                | response_prompt
-                | self.llm
-                | StrOutputParser()
+                | self.prepare_response_writer()
         )
         return chain
 
+    # Wording of the answer: {"question", "query", "response"} -> text, streamable token by token
+    def prepare_response_writer(self):
+        system, human = self.prompt_repo.get_response_prompt()
+        response_prompt = ChatPromptTemplate.from_messages(
+            [(self.SYSTEM_MESSAGE, system), (self.HUMAN_MESSAGE, human)]
+        )
+        return response_prompt | self.llm | StrOutputParser()
+
     # Putting it all together
     def prepare_app_query_chain(self):
         entity_chain = self.prepare_ner_chain()  # Step 1
@@ -136,14 +192,117 @@ class SQLFinanceQuery(AbstractQueryEngine):
         finance_query_chain = self.prepare_response_chain(sql_response)  # Step 4
         return finance_query_chain
 
+    def build_chains(self) -> None:
+        """
+        Compiles the SQL generation (steps 1-3) and answer (step 4) chains that ask() runs separately,
+        so a cached question can skip straight to step 4.
+        """
+        self.ner_chain = self.prepare_ner_chain()
+        self.sql_writer = self.prepare_sql_writer()
+        self.response_writer = self.prepare_response_writer()
+        self.sql_chain = self.prepare_db_query_response(self.ner_chain)
+        self.answer_chain = self.prepare_answer_chain()
+
+    def generate_sql(self, question: str, verbose: bool = False) -> str:
+        """
+        Steps 1-3: question -> SQL query
+        """
+        if self.sql_chain is None:
+            self.build_chains()
+        return self.sql_chain.invoke({"question": question}, config=self._run_config(verbose))
+
+    def answer(self, question: str, query: str, verbose: bool = False) -> str:
+        """
+        Step 4: runs the SQL against the current data and answers the question
+        """
+        if self.answer_chain is None:
+            self.build_chains()
+        return self.answer_chain.invoke({"question": question, "query": query}, config=self._run_config(verbose))
+
     def ask(self, question: str, verbose: bool = False) -> str:
-        if self.chain is None:
-            self.chain = self.prepare_app_query_chain()
+        if self.question_cache is None:
+            return self.answer(question, self.generate_sql(question, verbose), verbose)
+
+        schema_version = self._schema_version()
+        query = self.question_cache.get(question, schema_version)
+        if query is not None:
+            try:
+                return self.answer(question, query, verbose)
+            except Exception as e:
+                logger.warning(f"Cached SQL failed, generating it again: {e}")
+                self.question_cache.discard(question)
 
-        if verbose:
-            return self.chain.invoke({"question": question}, config={'callbacks': [ConsoleCallbackHandler()]})
+        query = self.generate_sql(question, verbose)
+        response = self.answer(question, query, verbose)
+        # Only SQL that ran is worth reusing
+        self.question_cache.put(question, query, schema_version)
+        return response
 
-        return self.chain.invoke({"question": question})
+    async def aask(self, question: str, verbose: bool = False) -> str:
+        """
+        ask() for async callers, the answer astream_ask() ends with.
+        """
+        answer = ''
+        async for event in self.astream_ask(question, verbose):
+            if event['event'] == 'done':
+                answer = event['data']['answer']
+        return answer
+
+    async def astream_ask(self, question: str, verbose: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        ask() as a stream of {"event", "data"} dicts, each yielded as soon as its stage finishes:
+        entities ({"names", "matches"}), sql ({"query", "cached"}), rows ({"result"}),
+        token ({"text"}) per chunk of the answer, and done ({"answer"}).
+        A cached question skips the entities event and goes straight to its SQL.
+        """
+        if self.response_writer is None:
+            self.build_chains()
+        config = self._run_config(verbose)
+
+        schema_version, query, result = None, None, None
+        if self.question_cache is not None:
+            schema_version = await asyncio.to_thread(self._schema_version)
+            query = self.question_cache.get(question, schema_version)
+        if query is not None:
+            try:
+                result = await asyncio.to_thread(self.db.run, query)
+            except Exception as e:
+                logger.warning(f"Cached SQL failed, generating it again: {e}")
+                self.question_cache.discard(question)
+                query = None
+            else:
+                yield {'event': 'sql', 'data': {'query': query, 'cached': True}}
+
+        if query is None:
+            # Steps 1-3
+            names = self._extract_names(await self.ner_chain.ainvoke({"question": question}, config=config))
+            matches, schema = await asyncio.gather(
+                self.entity_resolver.aresolve(names),
+                asyncio.to_thread(self.get_schema_text)
+            )
+            yield {'event': 'entities', 'data': {
+                'names': names,
+                'matches': {term: match for term, match in matches.items() if match is not None}
+            }}
+            query = await self.sql_writer.ainvoke({
+                "question": question,
+                "entities_list": self.entity_resolver.describe(matches),
+                "schema": schema
+            }, config=config)
+            yield {'event': 'sql', 'data': {'query': query, 'cached': False}}
+            result = await asyncio.to_thread(self.db.run, query)
+
+        # Step 4
+        yield {'event': 'rows', 'data': {'result': result}}
+        chunks = []
+        async for chunk in self.response_writer.astream(
+                {"question": question, "query": query, "response": result}, config=config):
+            chunks.append(chunk)
+            yield {'event': 'token', 'data': {'text': chunk}}
+
+        if self.question_cache is not None:
+            self.question_cache.put(question, query, schema_version)
+        yield {'event': 'done', 'data': {'answer': ''.join(chunks)}}
 
     def generate_chart_insight(self, chart_title: str, sql_query: str, query_params: Any, query_output: Any) -> str:
         system, human = self.prompt_repo.get_chart_insight_prompt()
@@ -154,20 +313,104 @@ class SQLFinanceQuery(AbstractQueryEngine):
             "chart_title": chart_title,
             "sql_query": sql_query,
             "query_params": json.dumps(query_params, default=str),
-            "query_output": json.dumps(query_output, default=str)
+            "query_output": self.serialize_query_output(query_output)
         })
 
+    def serialize_query_output(self, query_output: Any) -> str:
+        """
+        query_output as it goes into the chart insight prompt: a digest within insights.digest.max_tokens,
+        or every row when the digest is disabled.
+        """
+        if self.insight_digester is None:
+            return json.dumps(query_output, default=str)
+        return self.insight_digester.serialize(query_output)
+
+    async def _amap_entities(self, x: Dict[str, Any]) -> str:
+        return await self.amap_to_database(self._extract_names(x['names']))
+
+    @staticmethod
+    def _run_config(verbose: bool) -> Dict[str, Any]:
+        return {'callbacks': [ConsoleCallbackHandler()]} if verbose else {}
+
+    def get_schema_text(self) -> str:
+        """
+        db.get_table_info() (CREATE TABLE statements and sample rows), recomputed when PRAGMA schema_version changes.
+        """
+        if not self.cache_prompt_context:
+            return self._table_info()
+        return self._schema_cache.get()
+
+    def get_examples_text(self) -> str:
+        """
+        The few-shot examples rendered for the SQL prompt, recomputed when the examples file changes.
+        """
+        if not self.cache_prompt_context:
+            return self._render_examples()
+        return self._examples_cache.get()
+
+    def _render_examples(self) -> str:
+        example_prompt = ChatPromptTemplate.from_messages(
+            [(self.HUMAN_MESSAGE, "{question}"), (self.SYSTEM_MESSAGE, "{query}")]
+        )
+        few_shot_prompt = FewShotChatMessagePromptTemplate(
+            examples=self.query_repo.getExamples(),
+            example_prompt=example_prompt,
+        )
+        return few_shot_prompt.format()
+
+    def _table_info(self) -> str:
+        version = self._schema_version()
+        if version != self._db_schema_version:
+            # SQLDatabase reflects the tables once, so reflect again to describe the new schema
+            self.db = self._load_db()
+            self._db_schema_version = version
+        return self.db.get_table_info()
+
+    def _schema_version(self) -> str:
+        # Bumped by SQLite on every CREATE / ALTER / DROP
+        return self.db.run("PRAGMA schema_version")
+
+    def _examples_version(self):
+        mtime = self._examples_file_mtime()
+        if mtime != self._examples_mtime:
+            # Edited since it was loaded, pick up the new examples
+            SQLQueryRepository.reload(
+                examples_file=self.config['db']['sqlite']['examples_file'],
+                queries_file=self.config['db']['sqlite']['queries_file']
+            )
+            self._examples_mtime = mtime
+        # The examples themselves are the version: the repository may also be reloaded elsewhere (EngineRegistry)
+        return self.query_repo.getExamples()
+
+    def _examples_file_mtime(self):
+        examples_file = SQLQueryRepository.QUERY_FOLDER / self.config['db']['sqlite']['examples_file']
+        try:
+            return os.stat(examples_file).st_mtime_ns
+        except OSError:
+            return None
+
     def _load_config(self) -> Dict[str, Any]:
-        llm_config_path = Path(__file__).resolve().parent.parent / 'config' / 'app_config.yaml'
-        with open(llm_config_path, 'r') as file:
-            return yaml.safe_load(file)
+        return load_app_config()
+
+    def _load_entity_resolver(self) -> EntityResolver:
+        # entity_search.backend: memory (FuzzyEntityIndex) or fts (global_search_index queries)
+        search_cfg = self.config.get('entity_search', {})
+        index = None
+        if search_cfg.get('backend', 'memory') == 'memory':
+            index = FuzzyEntityIndex(min_similarity=search_cfg.get('min_similarity', 0.45))
+        pool = get_connection_pool(str(self.DB_PATH), readonly=True, **self.config['db']['sqlite'].get('pool', {}))
+        return EntityResolver(pool, cache_size=search_cfg.get('cache_size', 1024), index=index)
+
+    def _load_insight_digester(self):
+        digest_cfg = dict(self.config.get('insights', {}).get('digest', {}))
+        if not digest_cfg.pop('enabled', True):
+            return None
+        return PayloadDigester(**digest_cfg)
 
     def _load_db(self) -> SQLDatabase:
         # Constructing the SQLite URI. 
-        # Assuming the DB is located where setup_sqlite.py created it.
-        db_path = Path(__file__).resolve().parent.parent / 'data' / 'personal_finance' / 'finance.db'
         return SQLDatabase.from_uri(
-            f"sqlite:///{db_path}",
+            f"sqlite:///{self.DB_PATH}",
             include_tables=['transactions', 'financial_goals', 'monthly_budgets', 'accounts']
         )
 
@@ -0,0 +1,343 @@
+import math
+import time
+import logging
+import importlib.util
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Tuple, List
+
+import numpy as np
+import pandas as pd
+
+from src.config import load_app_config
+
+logger = logging.getLogger(__name__)
+
+# This Module has the following:
+# Abstract Forecaster interface used by the insights engine
+# SeasonalTrendForecaster: NumPy linear trend + seasonal profile, all value keys in one pass
+# ProphetForecaster: the original per-series Prophet fit, opt-in (prophet is an optional dependency)
+# ParallelForecaster: fits the series of any backend in a shared process pool, with per-fit timeouts
+# ForecasterFactory that picks the backend from app_config.yaml, numpy when prophet is not installed
+
+
+class ForecasterNotSupportedError(Exception):
+    pass
+
+
+class Forecaster(ABC):
+    """
+    Abstract class for forecasting backends.
+    """
+
+    @abstractmethod
+    def forecast(self, ds: pd.Series, values: np.ndarray, horizon: int, freq: str) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+        """
+        Forecasts `horizon` steps past the last date in `ds` for every column of `values`
+        (shape: len(ds) x number of series). Returns the future dates and a (horizon x series) array.
+        """
+        pass
+
+    def fit_predict(self, ds: pd.Series, values: np.ndarray, horizon: int, freq: str,
+                    warm_start: Optional[List[Any]] = None) -> Tuple[pd.DatetimeIndex, np.ndarray, List[Any]]:
+        """
+        Like forecast, but also returns one fitted state per series. Passing a previous state back in
+        `warm_start` lets iterative backends start from it instead of a cold fit.
+        Backends without iterative fitting ignore it and return None states.
+        """
+        future, yhat = self.forecast(ds, values, horizon, freq)
+        return future, yhat, [None] * yhat.shape[1]
+
+    def forecast_batch(self, series: Dict[str, Tuple[pd.Series, np.ndarray]], horizon: int,
+                       freq: str) -> Dict[str, Tuple[pd.DatetimeIndex, np.ndarray]]:
+        """
+        Forecasts many independent series, each with its own dates: {name: (ds, y)} -> {name: (future, yhat)}.
+        """
+        results = {}
+        for name, (ds, y) in series.items():
+            future, yhat = self.forecast(ds, np.asarray(y, dtype=float).reshape(-1, 1), horizon, freq)
+            results[name] = (future, yhat[:, 0])
+        return results
+
+    @property
+    def name(self) -> str:
+        """Identifies the model producing the forecasts, e.g. in cache keys."""
+        return type(self).__name__
+
+    @staticmethod
+    def future_dates(ds: pd.Series, horizon: int, freq: str) -> pd.DatetimeIndex:
+        """
+        Same dates as Prophet's make_future_dataframe: the first `horizon` steps after the last date.
+        Empty without a history to start from.
+        """
+        if len(ds) == 0:
+            return pd.DatetimeIndex([])
+        last = pd.Timestamp(ds.max())
+        dates = pd.date_range(start=last, periods=horizon + 1, freq=freq)
+        return dates[dates > last][:horizon]
+
+
+class SeasonalTrendForecaster(Forecaster):
+    """
+    Least-squares linear trend plus a mean seasonal profile of the residuals (weekly for daily data),
+    solved for every series at once with NumPy. Gaps in the dates are handled by fitting on time offsets.
+    """
+
+    SEASON_LENGTH = {'D': 7}
+
+    def __init__(self, min_seasons: int = 2) -> None:
+        self.min_seasons = min_seasons
+
+    def forecast(self, ds, values, horizon, freq):
+        future = self.future_dates(ds, horizon, freq)
+        values = np.asarray(values, dtype=float)
+        if values.ndim != 2:
+            values = values.reshape(len(ds), -1)
+        n_points, n_series = values.shape
+
+        if n_points == 0:
+            return future, np.zeros((len(future), n_series))
+
+        step = pd.Timedelta(weeks=1) if freq == 'W' else pd.Timedelta(days=1)
+        origin = pd.Timestamp(ds.min())
+        t = ((pd.to_datetime(ds) - origin) / step).to_numpy(dtype=float)
+        t_future = ((future - origin) / step).to_numpy(dtype=float)
+
+        # Trend: one lstsq solve for all series, [intercept, slope] x n_series
+        if n_points > 1 and np.ptp(t) > 0:
+            design = np.column_stack([np.ones_like(t), t])
+            coef, *_ = np.linalg.lstsq(design, values, rcond=None)
+        else:
+            coef = np.vstack([values.mean(axis=0), np.zeros(n_series)])
+        fitted = coef[0] + np.outer(t, coef[1])
+        yhat = coef[0] + np.outer(t_future, coef[1])
+
+        # Seasonality: mean residual per position in the season, only with enough full seasons
+        season = self.SEASON_LENGTH.get(freq, 0)
+        if season and n_points >= self.min_seasons * season:
+            phase = np.mod(np.rint(t), season).astype(int)
+            residuals = values - fitted
+            counts = np.bincount(phase, minlength=season).astype(float)
+            profile = np.zeros((season, n_series))
+            np.add.at(profile, phase, residuals)
+            profile = np.divide(profile, counts[:, None], out=np.zeros_like(profile), where=counts[:, None] > 0)
+            yhat = yhat + profile[np.mod(np.rint(t_future), season).astype(int)]
+
+        return future, yhat
+
+
+class ProphetForecaster(Forecaster):
+    """
+    Fits one Prophet model per series. Accurate but each fit is a Stan optimisation (seconds).
+    """
+
+    def forecast(self, ds, values, horizon, freq):
+        future, yhat, _ = self.fit_predict(ds, values, horizon, freq)
+        return future, yhat
+
+    def fit_predict(self, ds, values, horizon, freq, warm_start=None):
+        values = np.asarray(values, dtype=float).reshape(len(ds), -1)
+        warm_start = warm_start or [None] * values.shape[1]
+        future = None
+        yhat = np.zeros((horizon, values.shape[1]))
+        states = []
+        for col in range(values.shape[1]):
+            fcast, state = self._forecast_single_series(ds, values[:, col], horizon, freq, warm_start[col])
+            yhat[:, col] = fcast["yhat"].values
+            future = pd.DatetimeIndex(fcast["ds"].values)
+            states.append(state)
+        return future, yhat, states
+
+    def _forecast_single_series(self, ds, y, horizon, freq, init=None):
+        from prophet import Prophet
+
+        prophet_df = pd.DataFrame({"ds": pd.to_datetime(ds).values, "y": y})
+
+        model = Prophet()
+        if init:
+            # Warm start: Stan starts from the previous fit's parameters instead of its defaults
+            try:
+                model.fit(prophet_df, init=init)
+            except Exception as e:
+                # e.g. the longer history moved the number of changepoints, so delta no longer fits
+                logger.info(f'Prophet warm start failed, refitting cold: {e}')
+                model = Prophet()
+                model.fit(prophet_df)
+        else:
+            model.fit(prophet_df)
+
+        future = model.make_future_dataframe(periods=horizon, freq=freq)
+        forecast = model.predict(future)
+
+        return forecast.tail(horizon), self._stan_init(model)
+
+    @staticmethod
+    def _stan_init(model) -> Dict[str, Any]:
+        """
+        Fitted parameters in the shape Prophet.fit(init=...) expects.
+        """
+        # params are (draws x ...) arrays, but a fit on very few points can come back squeezed
+        res = {}
+        for pname in ['k', 'm', 'sigma_obs']:
+            res[pname] = float(np.ravel(model.params[pname])[0])
+        for pname in ['delta', 'beta']:
+            res[pname] = np.atleast_2d(model.params[pname])[0]
+        return res
+
+
+def naive_forecast(ds: pd.Series, y: np.ndarray, horizon: int, freq: str) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    Seasonal naive forecast (repeats the last week for daily data, else the last value).
+    Used when a fit fails or runs out of time.
+    """
+    future = Forecaster.future_dates(ds, horizon, freq)
+    y = np.asarray(y, dtype=float)
+    if len(y) == 0:
+        return future, np.zeros(len(future))
+    season = SeasonalTrendForecaster.SEASON_LENGTH.get(freq, 1)
+    if len(y) < season:
+        season = 1
+    return future, np.resize(y[-season:], len(future))
+
+
+def _fit_series(backend: str, dates: np.ndarray, y: np.ndarray, horizon: int, freq: str, init: Any):
+    """
+    Runs in a worker process: fits one series with a fresh backend instance.
+    """
+    forecaster = ForecasterFactory().get_forecaster(backend)
+    future, yhat, states = forecaster.fit_predict(pd.Series(dates), y.reshape(-1, 1), horizon, freq, warm_start=[init])
+    return future, yhat[:, 0], states[0]
+
+
+_PROCESS_POOL = None
+_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def get_process_pool(max_workers: int, start_method: str = 'spawn') -> ProcessPoolExecutor:
+    """
+    Process pool shared by every ParallelForecaster (and so every request), created on first use.
+    The first caller's settings win; a pool broken by a crashed worker is replaced.
+    """
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is None or getattr(_PROCESS_POOL, '_broken', False):
+            _PROCESS_POOL = ProcessPoolExecutor(max_workers=max_workers,
+                                                mp_context=multiprocessing.get_context(start_method))
+        return _PROCESS_POOL
+
+
+def shutdown_process_pool() -> None:
+    global _PROCESS_POOL
+    with _PROCESS_POOL_LOCK:
+        if _PROCESS_POOL is not None:
+            _PROCESS_POOL.shutdown(wait=False, cancel_futures=True)
+            _PROCESS_POOL = None
+
+
+class ParallelForecaster(Forecaster):
+    """
+    Fits each series with `backend` in its own task on the shared process pool, so independent
+    series (income, expense, per category, per account) use all cores. A fit that fails or is not
+    done within `fit_timeout` seconds falls back to naive_forecast.
+    Worth it for Prophet; the NumPy backend is faster inline than the round trip to a worker.
+    """
+
+    def __init__(self, backend: str, max_workers: Optional[int] = None, fit_timeout: float = 30.0,
+                 start_method: str = 'spawn') -> None:
+        self.backend = backend
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self.fit_timeout = fit_timeout
+        self.start_method = start_method
+        self._name = ForecasterFactory().get_forecaster(backend).name
+
+    @property
+    def name(self) -> str:
+        # Same results as the wrapped backend, so they share cache entries
+        return self._name
+
+    def forecast(self, ds, values, horizon, freq):
+        future, yhat, _ = self.fit_predict(ds, values, horizon, freq)
+        return future, yhat
+
+    def fit_predict(self, ds, values, horizon, freq, warm_start=None):
+        values = np.asarray(values, dtype=float).reshape(len(ds), -1)
+        warm_start = warm_start or [None] * values.shape[1]
+        tasks = [(ds, values[:, col], warm_start[col]) for col in range(values.shape[1])]
+        results = self._run(tasks, horizon, freq)
+        future = self.future_dates(ds, horizon, freq)
+        yhat = np.zeros((len(future), values.shape[1]))
+        for col, (_, series_yhat, _) in enumerate(results):
+            yhat[:, col] = series_yhat
+        return future, yhat, [state for _, _, state in results]
+
+    def forecast_batch(self, series, horizon, freq):
+        names = list(series)
+        results = self._run([(ds, np.asarray(y, dtype=float), None) for ds, y in series.values()], horizon, freq)
+        return {name: (future, yhat) for name, (future, yhat, _) in zip(names, results)}
+
+    def _run(self, tasks, horizon, freq) -> List[Tuple[pd.DatetimeIndex, np.ndarray, Any]]:
+        """
+        Submits every (ds, y, init) task, then collects them in order. Each fit gets `fit_timeout`
+        seconds of the batch deadline for each round of `max_workers` tasks.
+        """
+        try:
+            pool = get_process_pool(self.max_workers, self.start_method)
+            futures = [pool.submit(_fit_series, self.backend, pd.to_datetime(ds).to_numpy(), y, horizon, freq, init)
+                       for ds, y, init in tasks]
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.error(f'Forecast process pool unavailable, using naive forecasts: {e}')
+            return [(*naive_forecast(ds, y, horizon, freq), None) for ds, y, _ in tasks]
+
+        deadline = time.monotonic() + self.fit_timeout * math.ceil(len(tasks) / self.max_workers)
+        results = []
+        for (ds, y, _), future in zip(tasks, futures):
+            try:
+                results.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+            except Exception as e:
+                # A timed out fit keeps its worker until it finishes; cancel() only drops queued fits
+                future.cancel()
+                reason = 'timed out' if not future.done() or future.cancelled() else e
+                logger.warning(f'{self.backend} fit {reason}, using naive forecast')
+                results.append((*naive_forecast(ds, y, horizon, freq), None))
+        return results
+
+
+class ForecasterFactory:
+    """
+    Initializes the forecasting backend from the provided configuration
+    """
+
+    FORECASTING = 'forecasting'
+    BACKEND = 'backend'
+    BACKEND_NUMPY = 'numpy'
+    BACKEND_PROPHET = 'prophet'
+    EXECUTOR = 'executor'
+    MODE_INLINE = 'inline'
+    MODE_PROCESS = 'process'
+
+    def get_forecaster(self, backend: str) -> Forecaster:
+        if backend == self.BACKEND_NUMPY:
+            return SeasonalTrendForecaster()
+        if backend == self.BACKEND_PROPHET:
+            if importlib.util.find_spec('prophet') is None:
+                logger.warning('Forecasting backend: prophet is not installed, using numpy')
+                return SeasonalTrendForecaster()
+            return ProphetForecaster()
+        logger.error(f'Forecasting backend: {backend} not supported')
+        raise ForecasterNotSupportedError(backend)
+
+    def get_configured_forecaster(self, cfg: Optional[Dict[str, Any]] = None) -> Forecaster:
+        cfg = cfg if cfg is not None else load_app_config()
+        forecasting_cfg = cfg.get(self.FORECASTING, {})
+        backend = forecasting_cfg.get(self.BACKEND, self.BACKEND_NUMPY)
+        executor_cfg = dict(forecasting_cfg.get(self.EXECUTOR) or {})
+        mode = executor_cfg.pop('mode', self.MODE_INLINE)
+        if mode == self.MODE_PROCESS:
+            return ParallelForecaster(backend, **executor_cfg)
+        if mode != self.MODE_INLINE:
+            logger.error(f'Forecasting executor mode: {mode} not supported')
+            raise ForecasterNotSupportedError(mode)
+        return self.get_forecaster(backend)
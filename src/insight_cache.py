@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class InsightCache:
+    """
+    Chart insights keyed by a hash of everything the prompt is built from (title, SQL, params and output),
+    so an insight is never served for data it wasn't written for.
+
+    Memory tier: LRU bounded by `max_entries` and by `max_bytes` of insight text, entries expire after `ttl_seconds`.
+    SQLite tier (`db_path`, optional): WAL database shared by every gunicorn worker and kept across restarts,
+    pruned to the `max_db_entries` most recently used rows and expired on read.
+    stats() reports hits (per tier), misses, writes and evictions (per reason).
+    """
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS insight_cache (
+            key TEXT PRIMARY KEY,
+            insight TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_insight_cache_accessed ON insight_cache(accessed_at)",
+    ]
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024, ttl_seconds: float = 86400.0,
+                 db_path: str = None, max_db_entries: int = 5000) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_db_entries = max_db_entries
+        self.db_path = None
+        if db_path:
+            self.db_path = Path(db_path) if Path(db_path).is_absolute() else PROJECT_ROOT / db_path
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # key -> (insight, created_at, size in bytes)
+        self._entries: 'OrderedDict[str, Tuple[str, float, int]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._db_lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0,
+                       'evicted_lru': 0, 'evicted_size': 0, 'evicted_ttl': 0, 'evicted_disk': 0}
+
+    @staticmethod
+    def key(chart_title: str, sql_query: str, query_params: Any, query_output: Any) -> str:
+        payload = json.dumps([chart_title, sql_query, query_params, query_output], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[1]):
+                    self._drop(key)
+                    self._stats['evicted_ttl'] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return entry[0]
+
+        entry = self._read_db(key)
+        with self._lock:
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['disk_hits'] += 1
+            self._remember(key, *entry)
+        return entry[0]
+
+    def peek(self, key: str) -> Optional[str]:
+        """Memory tier only, without counting a hit or miss or refreshing the LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None and not self._expired(entry[1]) else None
+
+    def put(self, key: str, insight: str) -> None:
+        if self.max_entries <= 0:
+            return
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, insight, created_at)
+            self._stats['writes'] += 1
+        self._write_db(key, insight, created_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self._execute_db(lambda conn: conn.execute("DELETE FROM insight_cache"))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        stats['hits'] = stats['memory_hits'] + stats['disk_hits']
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['db_entries'] = self._execute_db(
+            lambda conn: conn.execute("SELECT COUNT(*) FROM insight_cache").fetchone()[0]
+        )
+        return stats
+
+    def _remember(self, key: str, insight: str, created_at: float) -> None:
+        # Caller holds self._lock
+        if key in self._entries:
+            self._drop(key)
+        size = len(insight.encode('utf-8'))
+        self._entries[key] = (insight, created_at, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self._stats['evicted_lru'] += 1
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self._stats['evicted_size'] += 1
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key)[2]
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created_at > self.ttl_seconds
+
+    def _read_db(self, key: str) -> Optional[Tuple[str, float]]:
+        def read(conn):
+            row = conn.execute("SELECT insight, created_at FROM insight_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                conn.execute("DELETE FROM insight_cache WHERE key = ?", (key,))
+                with self._lock:
+                    self._stats['evicted_ttl'] += 1
+                return None
+            conn.execute("UPDATE insight_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return row
+        return self._execute_db(read)
+
+    def _write_db(self, key: str, insight: str, created_at: float) -> None:
+        def write(conn):
+            conn.execute("INSERT OR REPLACE INTO insight_cache (key, insight, created_at, accessed_at) "
+                         "VALUES (?, ?, ?, ?)", (key, insight, created_at, created_at))
+            evicted = 0
+            if self.ttl_seconds:
+                evicted += conn.execute("DELETE FROM insight_cache WHERE created_at < ?",
+                                        (created_at - self.ttl_seconds,)).rowcount
+            if self.max_db_entries:
+                evicted += conn.execute("DELETE FROM insight_cache WHERE key IN (SELECT key FROM insight_cache "
+                                        "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                                        (self.max_db_entries,)).rowcount
+            with self._lock:
+                self._stats['evicted_disk'] += evicted
+        self._execute_db(write)
+
+    def _execute_db(self, fn):
+        if self.db_path is None:
+            return None
+        with self._db_lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    return fn(conn)
+            except sqlite3.Error as e:
+                logger.warning(f'Insight cache database {self.db_path} unavailable, using memory only: {e}')
+                return None
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process, gunicorn workers each open their own
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=10.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
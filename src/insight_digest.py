@@ -0,0 +1,166 @@
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+# Characters per token of JSON text, close enough for budgeting (Gemini and GPT tokenizers both land near 4)
+CHARS_PER_TOKEN = 4
+
+DATE_KEYS = ('date', 'month', 'day', 'week')
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class PayloadDigester:
+    """
+    Shrinks a chart's query_output to a bounded statistical digest before it goes into the insight prompt.
+
+    - dated rows (enrich_with_forecast_and_anomalies output): per-series totals, extremes and
+      first-half vs second-half change, the flagged anomalies, a forecast summary and the series
+      downsampled to at most `max_points` buckets
+    - other rows (categories, descriptions): the `top_k` largest plus one "others" row and the total
+    - dicts: each value digested the same way
+    Payloads already within `max_tokens` are only rounded. Otherwise the digest is rebuilt with fewer
+    points and rows until it fits the budget.
+    """
+
+    def __init__(self, max_tokens: int = 400, top_k: int = 5, max_points: int = 12, round_digits: int = 2) -> None:
+        self.max_tokens = max_tokens
+        self.top_k = top_k
+        self.max_points = max_points
+        self.round_digits = round_digits
+
+    def serialize(self, query_output: Any) -> str:
+        """
+        JSON for the prompt, at most about `max_tokens` tokens where the data allows it.
+        """
+        text = json.dumps(self._round(query_output), default=str)
+        if estimate_tokens(text) <= self.max_tokens:
+            return text
+
+        # Digested from the unrounded values, so totals and means don't add up rounding errors
+        top_k, max_points = self.top_k, self.max_points
+        while True:
+            text = json.dumps(self._round(self._digest(query_output, top_k, max_points)), default=str)
+            if estimate_tokens(text) <= self.max_tokens or (top_k <= 1 and max_points <= 2):
+                return text
+            top_k, max_points = max(1, top_k // 2), max(2, max_points // 2)
+
+    def digest(self, query_output: Any) -> Any:
+        return json.loads(self.serialize(query_output))
+
+    def _digest(self, value: Any, top_k: int, max_points: int) -> Any:
+        if isinstance(value, dict):
+            return {key: self._digest(item, top_k, max_points) for key, item in value.items()}
+        if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+            date_key = next((key for key in DATE_KEYS if key in value[0]), None)
+            if date_key is not None and len(value) > max_points:
+                return self._series_digest(value, date_key, top_k, max_points)
+            if len(value) > top_k:
+                return self._top_k_digest(value, top_k)
+        return value
+
+    def _series_digest(self, rows: List[Dict[str, Any]], date_key: str, top_k: int, max_points: int) -> Dict[str, Any]:
+        actual = [row for row in rows if not row.get('isForecast')]
+        forecast = [row for row in rows if row.get('isForecast')]
+        keys = self._numeric_keys(rows, exclude=(date_key,))
+
+        digest = {
+            'points': len(actual),
+            'period': [actual[0][date_key], actual[-1][date_key]] if actual else None,
+            'series': {key: self._series_stats(actual, date_key, key) for key in keys},
+        }
+
+        anomalies = [row for row in actual if row.get('anomaly')]
+        if anomalies:
+            # Largest flagged values first
+            anomalies.sort(key=lambda row: -max(abs(row.get(key) or 0) for key in row['anomaly']))
+            digest['anomalies'] = [
+                {date_key: row[date_key], **{key: row.get(key) for key in row['anomaly']}}
+                for row in anomalies[:top_k]
+            ]
+            digest['anomaly_count'] = len(anomalies)
+
+        if forecast:
+            digest['forecast'] = {
+                'points': len(forecast),
+                'period': [forecast[0][date_key], forecast[-1][date_key]],
+                **{key: {'total': self._r(sum(row.get(key) or 0 for row in forecast)),
+                         'mean': self._r(sum(row.get(key) or 0 for row in forecast) / len(forecast))}
+                   for key in keys}
+            }
+
+        digest['downsampled'] = self._downsample(actual, date_key, keys, max_points)
+        return digest
+
+    def _series_stats(self, rows: List[Dict[str, Any]], date_key: str, key: str) -> Dict[str, Any]:
+        values = [row.get(key) or 0 for row in rows]
+        if not values:
+            return {}
+        low, high = min(range(len(values)), key=values.__getitem__), max(range(len(values)), key=values.__getitem__)
+        half = len(values) // 2
+        first, second = values[:half], values[half:]
+        first_mean = sum(first) / len(first) if first else 0
+        second_mean = sum(second) / len(second) if second else 0
+        stats = {
+            'total': self._r(sum(values)),
+            'mean': self._r(sum(values) / len(values)),
+            'min': [rows[low][date_key], self._r(values[low])],
+            'max': [rows[high][date_key], self._r(values[high])],
+            'first_half_mean': self._r(first_mean),
+            'second_half_mean': self._r(second_mean),
+        }
+        if first_mean:
+            stats['change_pct'] = self._r((second_mean - first_mean) / abs(first_mean) * 100)
+        return stats
+
+    def _downsample(self, rows: List[Dict[str, Any]], date_key: str, keys: List[str],
+                    max_points: int) -> List[Dict[str, Any]]:
+        # Consecutive buckets of equal size, each summed and labelled with its first date
+        size = max(1, math.ceil(len(rows) / max_points))
+        buckets = []
+        for start in range(0, len(rows), size):
+            bucket = rows[start:start + size]
+            buckets.append({date_key: bucket[0][date_key],
+                            **{key: self._r(sum(row.get(key) or 0 for row in bucket)) for key in keys}})
+        return buckets
+
+    def _top_k_digest(self, rows: List[Dict[str, Any]], top_k: int) -> Dict[str, Any]:
+        keys = self._numeric_keys(rows)
+        if not keys:
+            return {'rows': len(rows), 'top': rows[:top_k]}
+        key = keys[0]
+        ordered = sorted(rows, key=lambda row: -(row.get(key) or 0))
+        total = sum(row.get(key) or 0 for row in rows)
+        rest = ordered[top_k:]
+        digest = {'rows': len(rows), 'total': {key: self._r(total)}, 'top': ordered[:top_k]}
+        if rest:
+            digest['others'] = {'rows': len(rest), key: self._r(sum(row.get(key) or 0 for row in rest))}
+        if total:
+            digest['top_share_pct'] = self._r(sum(row.get(key) or 0 for row in ordered[:top_k]) / total * 100)
+        return digest
+
+    @staticmethod
+    def _numeric_keys(rows: List[Dict[str, Any]], exclude=()) -> List[str]:
+        keys = []
+        for row in rows[:50]:
+            for key, value in row.items():
+                if key not in exclude and key not in keys and isinstance(value, (int, float)) \
+                        and not isinstance(value, bool):
+                    keys.append(key)
+        return keys
+
+    def _round(self, value: Any) -> Any:
+        if isinstance(value, float):
+            return self._r(value)
+        if isinstance(value, dict):
+            return {key: self._round(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._round(item) for item in value]
+        return value
+
+    def _r(self, value: float) -> Optional[float]:
+        if value is None or (isinstance(value, float) and not math.isfinite(value)):
+            return None
+        return round(value, self.round_digits)
@@ -0,0 +1,174 @@
+import queue
+import logging
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.chart_insights import ChartInsightService
+from src.dashboard import expense_summary_panel, income_vs_expenses_panel, goal_forecast_panel
+from src.datamodel.finance_db import FinanceDB, FinanceQueryName, ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+def _expense_summary_inputs(db: FinanceDB, period: str) -> List[Dict[str, Any]]:
+    return list(expense_summary_panel(db, period)['insight_inputs'].values())
+
+
+def _income_vs_expenses_inputs(db: FinanceDB, period: str) -> List[Dict[str, Any]]:
+    return [income_vs_expenses_panel(db, period)['insight_input']]
+
+
+def _goal_forecast_inputs(db: FinanceDB, period: str) -> List[Dict[str, Any]]:
+    # The goal forecast has no period, the dashboard shows the first goal by default
+    forecast = goal_forecast_panel(db)
+    return [forecast['insight_input']] if forecast else []
+
+
+# Panel name -> the insight_input payloads its endpoint returns for a period
+PANELS: Dict[str, Callable[[FinanceDB, str], List[Dict[str, Any]]]] = {
+    'expense_summary': _expense_summary_inputs,
+    'income_vs_expenses': _income_vs_expenses_inputs,
+    'goal_forecast': _goal_forecast_inputs,
+}
+
+
+class InsightPrecomputer:
+    """
+    Regenerates the dashboard's chart insights in the background whenever the data changes,
+    so the next /api/insights request is a cache hit instead of an LLM round trip.
+
+    A watcher thread polls the data version (the transactions change counter, or the max
+    transaction id without change tracking, plus today's date since the panels cover the last
+    7 / 30 days). On a change it queues one job per (panel, period); a job that is already
+    queued is not queued again. Worker threads run a job by building the panel's insight_input
+    payloads and passing them to the ChartInsightService, which caches them and shares in-flight
+    LLM calls with the request path.
+    """
+
+    def __init__(self, pool: ConnectionPool, insights: ChartInsightService, engine_provider: Callable[[], Any],
+                 poll_interval: float = 30.0, max_workers: int = 2, periods: Tuple[str, ...] = ('month', 'week')) -> None:
+        self.pool = pool
+        self.insights = insights
+        self.engine_provider = engine_provider
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        self.periods = tuple(periods)
+        self._queue: 'queue.Queue[Optional[Tuple[str, str]]]' = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._version = None
+        self._stats = {'data_changes': 0, 'jobs_queued': 0, 'jobs_deduplicated': 0,
+                       'jobs_done': 0, 'jobs_failed': 0, 'insights': 0}
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._watch, name='insight-watcher', daemon=True)]
+        self._threads += [threading.Thread(target=self._work, name=f'insight-worker-{i}', daemon=True)
+                          for i in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for _ in range(self.max_workers):
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def data_version(self) -> Tuple[Any, str]:
+        with FinanceDB(self.pool.db_path, pool=self.pool) as db:
+            version = db.get_table_version('transactions')
+            if version is None:
+                version = db.run_named_query(FinanceQueryName.GET_MAX_TRANSACTION_ID)[0]['max_id']
+        return version, date.today().isoformat()
+
+    def check(self) -> bool:
+        """
+        Queues every job if the data version moved since the last check. Returns whether it did.
+        """
+        with self._check_lock:
+            version = self.data_version()
+            if version == self._version:
+                return False
+            self._version = version
+        with self._lock:
+            self._stats['data_changes'] += 1
+        self.enqueue_all()
+        return True
+
+    def enqueue_all(self) -> None:
+        for panel in PANELS:
+            for period in (self.periods if panel != 'goal_forecast' else self.periods[:1]):
+                self.enqueue(panel, period)
+
+    def enqueue(self, panel: str, period: str) -> bool:
+        job = (panel, period)
+        with self._lock:
+            if job in self._pending:
+                self._stats['jobs_deduplicated'] += 1
+                return False
+            self._pending.add(job)
+            self._stats['jobs_queued'] += 1
+        self._queue.put(job)
+        return True
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until every queued job has finished (for scripts and tests).
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        stats['data_version'] = self._version
+        return stats
+
+    def run_job(self, panel: str, period: str) -> int:
+        """
+        Generates (or finds cached) the insights of one panel. Returns how many it produced.
+        """
+        with FinanceDB(self.pool.db_path, pool=self.pool) as db:
+            inputs = PANELS[panel](db, period)
+        engine = self.engine_provider()
+        for payload in inputs:
+            self.insights.get(engine, payload['chart_title'], payload['sql_query'],
+                              payload['query_params'], payload['query_output'])
+        return len(inputs)
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception('Insight precompute: data version check failed')
+            self._stop.wait(self.poll_interval)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                with self._lock:
+                    # Taken off the pending set first, so a change during the job queues it again
+                    self._pending.discard(job)
+                produced = self.run_job(*job)
+                with self._lock:
+                    self._stats['jobs_done'] += 1
+                    self._stats['insights'] += produced
+            except Exception as e:
+                logger.warning(f'Insight precompute job {job} failed: {e}')
+                with self._lock:
+                    self._stats['jobs_failed'] += 1
+            finally:
+                self._queue.task_done()
@@ -1,6 +1,177 @@
+import os
+import time
+import pickle
+import hashlib
+import logging
+import threading
+import numpy as np
 import pandas as pd
-from prophet import Prophet
-from copy import deepcopy
+from collections import OrderedDict
+from pathlib import Path
+from src.anomalies import AnomalyDetector, get_default_detector
+from src.config import load_app_config
+from src.forecasting import Forecaster, ForecasterFactory
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_FORECASTER = None
+_DEFAULT_FORECASTER_LOCK = threading.Lock()
+_FORECAST_CACHE = None
+_DEFAULT_DETECTOR = None
+_DEFAULT_DETECTOR_LOCK = threading.Lock()
+
+
+def get_default_forecaster() -> Forecaster:
+    """Backend from app_config.yaml (forecasting.backend), built once per process."""
+    global _DEFAULT_FORECASTER
+    with _DEFAULT_FORECASTER_LOCK:
+        if _DEFAULT_FORECASTER is None:
+            _DEFAULT_FORECASTER = ForecasterFactory().get_configured_forecaster()
+        return _DEFAULT_FORECASTER
+
+
+def get_anomaly_detector() -> AnomalyDetector:
+    """Detector from app_config.yaml (anomalies), built once per process."""
+    global _DEFAULT_DETECTOR
+    with _DEFAULT_DETECTOR_LOCK:
+        if _DEFAULT_DETECTOR is None:
+            _DEFAULT_DETECTOR = get_default_detector()
+        return _DEFAULT_DETECTOR
+
+
+class ForecastEntry:
+    """
+    A cached forecast of one series, with the history it was fitted on and the backend state.
+    """
+
+    def __init__(self, dates, values, future, yhat, state) -> None:
+        self.dates = dates
+        self.values = values
+        self.future = future
+        self.yhat = yhat
+        self.state = state
+        self.created_at = time.time()
+
+    def is_extended_by(self, dates, values) -> bool:
+        """
+        True if (dates, values) is this history plus new points at the end (the oldest
+        points may have slid out of the window). Only then is the old fit a good warm start.
+        """
+        if len(dates) == 0 or len(self.dates) == 0 or dates[-1] <= self.dates[-1]:
+            return False
+        overlap = dates <= self.dates[-1]
+        old = self.dates >= dates[0]
+        if overlap.sum() != old.sum() or overlap.sum() == 0:
+            return False
+        return bool(np.array_equal(dates[overlap], self.dates[old]) and np.allclose(values[overlap], self.values[old]))
+
+
+class ForecastCache:
+    """
+    LRU + TTL cache of forecasts keyed by (series fingerprint, value key, granularity, horizon, backend),
+    with an optional on-disk tier (one pickle per key) that survives restarts.
+    It also remembers the latest fit per (value key, granularity, horizon, backend) to warm start refits.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600.0, disk_dir: str = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(dates, values) -> str:
+        digest = hashlib.sha1(np.ascontiguousarray(dates, dtype='datetime64[ns]').view(np.int64).tobytes())
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry):
+                    del self._entries[key]
+                    return None
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry: ForecastEntry) -> None:
+        if self.max_entries <= 0:
+            return
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def warm_start_state(self, series_key, dates, values):
+        """
+        State of the previous fit of this series if the new history only appends to it.
+        """
+        with self._lock:
+            entry = self._latest.get(series_key)
+        if entry is not None and entry.state is not None and entry.is_extended_by(dates, values):
+            return entry.state
+        return None
+
+    def _remember(self, key, entry: ForecastEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._latest[key[1:]] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _expired(self, entry: ForecastEntry) -> bool:
+        return bool(self.ttl_seconds) and time.time() - entry.created_at > self.ttl_seconds
+
+    def _disk_path(self, key) -> Path:
+        return self.disk_dir / (hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.pkl')
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f'Ignoring unreadable forecast cache file {path}: {e}')
+            return None
+        if self._expired(entry):
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def _write_disk(self, key, entry: ForecastEntry) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(entry, file)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f'Failed to write forecast cache file {path}: {e}')
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Process-wide cache configured by forecasting.cache in app_config.yaml."""
+    global _FORECAST_CACHE
+    with _DEFAULT_FORECASTER_LOCK:
+        if _FORECAST_CACHE is None:
+            cfg = load_app_config().get('forecasting', {}).get('cache', {})
+            _FORECAST_CACHE = ForecastCache(**cfg)
+        return _FORECAST_CACHE
 
 
 def enrich_with_forecast_and_anomalies(
@@ -8,40 +179,46 @@ def enrich_with_forecast_and_anomalies(
     date_key="date",
     value_keys=("income", "expense"),
     granularity="daily",
-    horizon=7
+    horizon=7,
+    forecaster=None,
+    cache=None,
+    detector=None
 ):
-
-    base_df = pd.DataFrame(data)
+    """
+    `data` is a list of row dicts or a DataFrame (the analytics snapshot's), which goes to the detector and
+    forecaster as is. Returns the rows plus the forecast points as dicts, ready for JSON.
+    """
+    if isinstance(data, pd.DataFrame):
+        base_df = data.reset_index(drop=True)
+        data = base_df.to_dict('records')
+        base_df = base_df.copy()
+    else:
+        base_df = pd.DataFrame(data)
     base_df = _parse_dates(base_df, date_key, granularity)
 
     freq = "D" if granularity == "daily" else "W"
-    enriched = deepcopy(data)
 
-    # Anomaly detection (historical only)
-    for key in value_keys:
-        anomaly_mask = _detect_anomalies(base_df, key)
+    # Anomaly detection (historical only, all metrics at once)
+    detector = detector or get_anomaly_detector()
+    anomalies = detector.detect(
+        base_df["ds"].to_numpy(dtype="datetime64[ns]"), base_df[list(value_keys)].to_numpy(dtype=float), freq
+    )
+    enriched = _with_anomalies(data, value_keys, anomalies)
 
-        for i, is_anomaly in enumerate(anomaly_mask):
-            if is_anomaly:
-                enriched[i].setdefault("anomaly", {})[key] = True
-
-    # Forecasting (per metric)
-    forecasts = {}
-    forecast_dates = None
-
-    for key in value_keys:
-        fcast = _forecast_single_series(base_df, key, horizon, freq)
-        forecasts[key] = fcast["yhat"].values
-        forecast_dates = fcast["ds"].values
+    # Forecasting (all metrics in one call, cached per series)
+    forecaster = forecaster or get_default_forecaster()
+    forecast_dates, yhat = _cached_forecast(
+        base_df, value_keys, granularity, horizon, freq, forecaster, cache or get_forecast_cache()
+    )
 
     # Append forecast points
-    for i in range(horizon):
+    for i in range(len(forecast_dates)):
         point = {
             date_key: pd.to_datetime(forecast_dates[i]).strftime("%Y-%m-%d"),
             "isForecast": True
         }
-        for key in value_keys:
-            point[key] = round(float(forecasts[key][i]), 2)
+        for j, key in enumerate(value_keys):
+            point[key] = round(float(yhat[i, j]), 2)
 
         enriched.append(point)
 
@@ -60,24 +237,52 @@ def _parse_dates(df, date_key, granularity):
     return df
 
 
-def _forecast_single_series(df, value_key, horizon, freq):
-    prophet_df = df[["ds", value_key]].rename(columns={value_key: "y"})
-
-    model = Prophet()
-    model.fit(prophet_df)
+def _cached_forecast(df, value_keys, granularity, horizon, freq, forecaster, cache):
+    """
+    Reuses cached forecasts for unchanged series and fits only the rest, in one forecaster call,
+    warm starting from the previous fit where the history only gained new points.
+    """
+    dates = df["ds"].to_numpy(dtype='datetime64[ns]')
+    values = df[list(value_keys)].to_numpy(dtype=float)
+    backend = forecaster.name
 
-    future = model.make_future_dataframe(periods=horizon, freq=freq)
-    forecast = model.predict(future)
-
-    return forecast.tail(horizon)
+    keys = [(cache.fingerprint(dates, values[:, j]), key, granularity, horizon, backend)
+            for j, key in enumerate(value_keys)]
+    yhat = np.zeros((horizon, len(value_keys)))
+    forecast_dates = None
+    misses = []
+    for j, cache_key in enumerate(keys):
+        entry = cache.get(cache_key)
+        if entry is None:
+            misses.append(j)
+        else:
+            yhat[:, j] = entry.yhat
+            forecast_dates = entry.future
 
+    if misses:
+        warm_start = [cache.warm_start_state(keys[j][1:], dates, values[:, j]) for j in misses]
+        forecast_dates, miss_yhat, states = forecaster.fit_predict(
+            df["ds"], values[:, misses], horizon, freq, warm_start=warm_start
+        )
+        for col, j in enumerate(misses):
+            yhat[:, j] = miss_yhat[:, col]
+            cache.put(keys[j], ForecastEntry(dates, values[:, j].copy(), forecast_dates, miss_yhat[:, col].copy(), states[col]))
 
-def _detect_anomalies(df, value_key, z_thresh=3.0):
-    mean = df[value_key].mean()
-    std = df[value_key].std()
+    return forecast_dates, yhat
 
-    if std == 0 or pd.isna(std):
-        return [False] * len(df)
 
-    z = (df[value_key] - mean) / std
-    return z.abs() > z_thresh
+def _with_anomalies(data, value_keys, anomalies):
+    """
+    Copies of the input points (the caller's list is left untouched), with an
+    "anomaly" dict of the flagged keys on the flagged points.
+    """
+    enriched = []
+    for row, flags in zip(data, anomalies.tolist()):
+        point = dict(row)
+        if any(flags):
+            point["anomaly"] = {
+                **row.get("anomaly", {}),
+                **{key: True for key, flag in zip(value_keys, flags) if flag}
+            }
+        enriched.append(point)
+    return enriched
@@ -1,4 +1,5 @@
 import json
+import threading
 from pathlib import Path
 
 from abc import ABC, abstractmethod
@@ -73,13 +74,28 @@ class PromptRepository:
     This is a Singleton Class.
     """
     _instance = None
+    _instance_lock = threading.Lock()
+    PROMPT_FOLDER = Path(__file__).resolve().parent / 'prompts'
 
     def __new__(cls, prompts_file: str = None):
         if cls._instance is None:
-            cls._instance = super(PromptRepository, cls).__new__(cls)
-            cls._instance._initialize(prompts_file)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(PromptRepository, cls).__new__(cls)
+                    instance._initialize(prompts_file)
+                    cls._instance = instance
         return cls._instance
 
+    @classmethod
+    def reload(cls, prompts_file: str) -> 'PromptRepository':
+        """
+        Re-reads the prompts file into the singleton, e.g. after it was edited.
+        """
+        instance = cls(prompts_file)
+        with cls._instance_lock:
+            instance._initialize(prompts_file)
+        return instance
+
     def _initialize(self, prompts_file: str = None) -> None:
         if prompts_file is None:
             raise ValueError("Prompts File should be passed the first time to initialize the PromptRepository")
@@ -110,7 +126,7 @@ class PromptRepository:
         return self._prepare_prompt('chartInsight')
 
     def _load_prompts(self, prompts_file: str = None) -> Dict[str, Any]:
-        file_path = Path(__file__).resolve().parent / 'prompts' / prompts_file
+        file_path = self.PROMPT_FOLDER / prompts_file
         with open(file_path, 'r') as file:
             return json.load(file)
 
@@ -0,0 +1,187 @@
+import re
+import math
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import load_app_config
+
+logger = logging.getLogger(__name__)
+
+# This Module has the following:
+# QuestionCache: question -> generated SQL, so a repeated (or reworded) chat question skips
+# the NER, entity mapping and SQL generation LLM calls and only re-runs the SQL
+# get_question_cache: the process-wide cache configured by app_config.yaml
+
+# Words that can differ between two phrasings of the same question. Anything else
+# (categories, merchants, accounts, numbers, "last" vs "this") must match exactly, and so must
+# words that change the meaning: direction ("to" / "from"), aggregate ("much" / "many",
+# "total" / "amount") and tense ("is" / "was").
+FILLER_WORDS = frozenset({
+    'a', 'an', 'the', 'i', 'me', 'my', 'mine', 'we', 'our', 'you', 'your', 'please', 'can', 'could', 'would',
+    'will', 'do', 'does', 'did', 'have', 'has', 'had', 'are', 'were', 'be', 'been', 'on', 'in',
+    'at', 'for', 'of', 'with', 'about', 'what', 'whats', 'how', 'tell', 'show', 'give', 'list',
+    'there', 'that', 'this', 'it', 'so', 'far'
+})
+# "this" is filler in "how much was that" but not in "this month"
+PERIOD_WORDS = frozenset({'day', 'week', 'month', 'quarter', 'year', 'today', 'yesterday'})
+# Word forms compared as one term
+WORD_FORMS = {
+    'spent': 'spend', 'spending': 'spend', 'spends': 'spend', 'paid': 'pay', 'paying': 'pay', 'pays': 'pay',
+    'earned': 'earn', 'earning': 'earn', 'earnings': 'earn', 'costs': 'cost', 'costing': 'cost',
+    'months': 'month', 'weeks': 'week', 'years': 'year', 'days': 'day', 'expenses': 'expense',
+    'transactions': 'transaction', 'categories': 'category', 'accounts': 'account', 'budgets': 'budget'
+}
+
+
+class QuestionCache:
+    """
+    Bounded LRU of normalized question -> SQL with two lookup tiers:
+    1. exact match on the normalized text
+    2. (optional) TF-IDF cosine similarity >= `similarity_threshold` among cached questions with the
+       same key terms in the same order, i.e. rewordings that only differ in filler words
+       ("transfer from savings to checking" and "from checking to savings" stay apart)
+
+    Entries belong to a schema version; the first lookup with a different version drops them all.
+    """
+
+    def __init__(self, max_entries: int = 512, use_similarity: bool = True,
+                 similarity_threshold: float = 0.65) -> None:
+        self.max_entries = max_entries
+        self.use_similarity = use_similarity
+        self.similarity_threshold = similarity_threshold
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._by_key_terms: Dict[Tuple[str, ...], set] = {}
+        self._doc_freq: Counter = Counter()
+        self._schema_version = None
+        self._lock = threading.Lock()
+        self.hits = {'exact': 0, 'similar': 0}
+        self.misses = 0
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        return ' '.join(re.findall(r"[a-z0-9&$.]+", question.lower().replace("'", ''))).strip(' .')
+
+    @staticmethod
+    def terms(normalized: str) -> List[str]:
+        return [WORD_FORMS.get(token, token) for token in normalized.split()]
+
+    @classmethod
+    def key_terms(cls, normalized: str) -> Tuple[str, ...]:
+        tokens = cls.terms(normalized)
+        terms = []
+        for i, token in enumerate(tokens):
+            if token not in FILLER_WORDS:
+                terms.append(token)
+            elif token == 'this' and i + 1 < len(tokens) and tokens[i + 1] in PERIOD_WORDS:
+                terms.append(token)
+        return tuple(terms)
+
+    def get(self, question: str, schema_version: Any) -> Optional[str]:
+        normalized = self.normalize(question)
+        with self._lock:
+            self._check_schema(schema_version)
+            sql = self._entries.get(normalized)
+            if sql is not None:
+                self._entries.move_to_end(normalized)
+                self.hits['exact'] += 1
+                return sql
+
+            if self.use_similarity:
+                match, score = self._most_similar(normalized)
+                if match is not None and score >= self.similarity_threshold:
+                    logger.info(f"Question cache: '{question}' reuses SQL of '{match}' (similarity {score:.2f})")
+                    self._entries.move_to_end(match)
+                    self.hits['similar'] += 1
+                    return self._entries[match]
+
+            self.misses += 1
+            return None
+
+    def put(self, question: str, sql: str, schema_version: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        normalized = self.normalize(question)
+        with self._lock:
+            self._check_schema(schema_version)
+            if normalized not in self._entries:
+                self._doc_freq.update(set(self.terms(normalized)))
+                self._by_key_terms.setdefault(self.key_terms(normalized), set()).add(normalized)
+            self._entries[normalized] = sql
+            self._entries.move_to_end(normalized)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, question: str) -> None:
+        """Drops the entry a question resolved to, e.g. when its SQL no longer runs."""
+        normalized = self.normalize(question)
+        with self._lock:
+            if normalized not in self._entries and self.use_similarity:
+                normalized, _ = self._most_similar(normalized)
+            if normalized in self._entries:
+                self._remove(normalized)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_key_terms.clear()
+            self._doc_freq.clear()
+
+    def _check_schema(self, schema_version: Any) -> None:
+        if schema_version != self._schema_version:
+            if self._entries:
+                logger.info('Question cache: schema changed, dropping cached SQL')
+            self._entries.clear()
+            self._by_key_terms.clear()
+            self._doc_freq.clear()
+            self._schema_version = schema_version
+
+    def _remove(self, normalized: str) -> None:
+        del self._entries[normalized]
+        for term in set(self.terms(normalized)):
+            self._doc_freq[term] -= 1
+            if self._doc_freq[term] <= 0:
+                del self._doc_freq[term]
+        key = self.key_terms(normalized)
+        self._by_key_terms[key].discard(normalized)
+        if not self._by_key_terms[key]:
+            del self._by_key_terms[key]
+
+    def _most_similar(self, normalized: str) -> Tuple[Optional[str], float]:
+        candidates = self._by_key_terms.get(self.key_terms(normalized), ())
+        best, best_score = None, 0.0
+        if not candidates:
+            return best, best_score
+        query = self._tfidf(normalized)
+        for candidate in candidates:
+            score = self._cosine(query, self._tfidf(candidate))
+            if score > best_score:
+                best, best_score = candidate, score
+        return best, best_score
+
+    def _tfidf(self, normalized: str) -> Dict[str, float]:
+        n_docs = len(self._entries) + 1
+        return {term: count * (math.log(n_docs / (1 + self._doc_freq.get(term, 0))) + 1)
+                for term, count in Counter(self.terms(normalized)).items()}
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+        dot = sum(weight * b.get(term, 0.0) for term, weight in a.items())
+        norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+        return dot / norm if norm else 0.0
+
+
+_DISABLED = object()
+_QUESTION_CACHE = None
+_QUESTION_CACHE_LOCK = threading.Lock()
+
+
+def get_question_cache() -> Optional[QuestionCache]:
+    """Process-wide cache from the question_cache section of app_config.yaml, None if disabled."""
+    global _QUESTION_CACHE
+    with _QUESTION_CACHE_LOCK:
+        if _QUESTION_CACHE is None:
+            cfg = dict(load_app_config().get('question_cache', {}))
+            _QUESTION_CACHE = QuestionCache(**cfg) if cfg.pop('enabled', True) else _DISABLED
+        return None if _QUESTION_CACHE is _DISABLED else _QUESTION_CACHE